@@ -3,33 +3,39 @@
 from models.amenity import Amenity
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.cache import cached, response_cache
+from api.v1.views.responses import object_response, objects_response
+from api.v1.views.responses import page_response, requested_page
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
 
 
 @app_views.route('/amenities', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/amenity/all_amenities.yml')
+@cached("Amenity")
 def get_amenities():
     """
     Retrieves a list of all amenities
     """
-    all_amenities = storage.all(Amenity).values()
-    list_amenities = []
-    for amenity in all_amenities:
-        list_amenities.append(amenity.to_dict())
-    return jsonify(list_amenities)
+    page = requested_page()
+    if page:
+        limit, after = page
+        return page_response(storage.page(Amenity, limit + 1, after), limit,
+                             classes=(Amenity,))
+    return objects_response(storage.iter_all(Amenity), classes=(Amenity,))
 
 
 @app_views.route('/amenities/<amenity_id>/', methods=['GET'],
                  strict_slashes=False)
 @swag_from('documentation/amenity/get_amenity.yml', methods=['GET'])
+@cached("Amenity.{amenity_id}")
 def get_amenity(amenity_id):
     """ Retrieves an amenity """
     amenity = storage.get(Amenity, amenity_id)
     if not amenity:
         abort(404)
 
-    return jsonify(amenity.to_dict())
+    return object_response(amenity)
 
 
 @app_views.route('/amenities/<amenity_id>', methods=['DELETE'],
@@ -47,6 +53,7 @@ def delete_amenity(amenity_id):
 
     storage.delete(amenity)
     storage.save()
+    response_cache.forget(amenity)
 
     return make_response(jsonify({}), 200)
 
@@ -66,6 +73,7 @@ def post_amenity():
     data = request.get_json()
     instance = Amenity(**data)
     instance.save()
+    response_cache.forget(instance)
     return make_response(jsonify(instance.to_dict()), 201)
 
 
@@ -90,5 +98,6 @@ def put_amenity(amenity_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(amenity, key, value)
-    storage.save()
+    amenity.save()
+    response_cache.forget(amenity)
     return make_response(jsonify(amenity.to_dict()), 200)
@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+""" helpers of the batch endpoints, that write many objects in one save """
+from api.v1.views.cache import response_cache
+from datetime import datetime
+from flask import abort, jsonify, make_response, request
+from models import storage
+from os import getenv
+
+# the most objects a batch request holds
+batch_max = int(getenv("HBNB_API_BATCH_MAX", "100000"))
+# attributes the storage sets, dropped from the objects to create
+generated = ("id", "created_at", "updated_at", "__class__")
+
+
+def requested_batch():
+    """
+    Returns the JSON list of the body of the request, aborting if it is
+    not one or holds more than batch_max items
+    """
+    items = request.get_json(silent=True)
+    if not items or not isinstance(items, list):
+        abort(400, description="Not a JSON list")
+    if len(items) > batch_max:
+        abort(400, description="Too many objects")
+    return items
+
+
+def existing(cls, ids):
+    """
+    Returns {id: object} for the objects of cls with the IDs in ids,
+    fetched in one lookup
+    """
+    ids = list({id for id in ids if isinstance(id, str)})
+    return {id: obj for id, obj in zip(ids, storage.get_many(cls, ids))
+            if obj is not None}
+
+
+def batch_response(results):
+    """
+    Returns the response of a batch, holding the result of each item in
+    order, its status and the id of its object or an error: 201 if all
+    were created, 200 if all were written, 207 if some failed
+    """
+    statuses = {result["status"] for result in results}
+    status = statuses.pop() if len(statuses) == 1 else 207
+    return make_response(jsonify(results), status if status < 300 else 207)
+
+
+def batch_row(item, references, required):
+    """
+    Returns the attributes of the object to create from item, but those
+    in generated and those null, left to their defaults, raising
+    ValueError if item is not a dictionary of scalars holding the strings
+    of required and the string IDs of references
+    """
+    if not isinstance(item, dict):
+        raise ValueError("Not a JSON")
+    for attribute in list(references) + list(required):
+        if attribute not in item:
+            raise ValueError("Missing " + attribute)
+    row = {}
+    for attribute, value in item.items():
+        if attribute in generated:
+            continue
+        if isinstance(value, (dict, list)) or (
+                (attribute in references or attribute in required) and
+                not isinstance(value, str)):
+            raise ValueError("Invalid " + attribute)
+        if value is not None:
+            row[attribute] = value
+    return row
+
+
+def create_batch(cls, references, required):
+    """
+    Creates an object of cls for each dictionary of the request, saved
+    at once by storage.bulk_save; references is {attribute: class} of the
+    IDs each must hold of existing objects, required the other attributes
+    it must hold. The ids and dates are the storage's to set.
+    """
+    items = requested_batch()
+    found = {attribute: existing(ref, [item.get(attribute) for item in items
+                                       if isinstance(item, dict)])
+             for attribute, ref in references.items()}
+    results, rows, created = [], [], []
+    for index, item in enumerate(items):
+        try:
+            row = batch_row(item, references, required)
+        except ValueError as e:
+            results.append({"status": 400, "error": str(e), "index": index})
+            continue
+        if any(row[attribute] not in found[attribute]
+               for attribute in references):
+            results.append({"status": 404, "error": "Not found",
+                            "index": index})
+            continue
+        rows.append(row)
+        created.append({"status": 201})
+        results.append(created[-1])
+    if rows:
+        storage.bulk_save(cls, rows)
+        response_cache.forget_rows(cls, rows)
+        for result, row in zip(created, rows):
+            result["id"] = row["id"]
+    return batch_response(results)
+
+
+def update_batch(cls, ignore):
+    """
+    Updates the objects of cls whose IDs the dictionaries of the request
+    hold with their other attributes but those in ignore, in a single
+    save
+    """
+    items = requested_batch()
+    objs = existing(cls, [item.get("id") for item in items
+                          if isinstance(item, dict)])
+    results, updated = [], []
+    now = datetime.utcnow()
+    for item in items:
+        if not isinstance(item, dict):
+            results.append({"status": 400, "error": "Not a JSON"})
+        elif "id" not in item:
+            results.append({"status": 400, "error": "Missing id"})
+        elif not isinstance(item["id"], str):
+            results.append({"status": 400, "error": "Invalid id"})
+        elif item["id"] not in objs:
+            results.append({"status": 404, "error": "Not found"})
+        else:
+            obj = objs[item["id"]]
+            for key, value in item.items():
+                if key not in ignore:
+                    setattr(obj, key, value)
+            obj.updated_at = now
+            updated.append(obj)
+            results.append({"status": 200, "id": obj.id})
+    if updated:
+        storage.new_many(updated)
+        storage.save()
+        response_cache.forget(*updated)
+    return batch_response(results)
+
+
+def delete_batch(cls):
+    """
+    Deletes the objects of cls whose IDs the request lists, in a single
+    save
+    """
+    ids = requested_batch()
+    objs = existing(cls, ids)
+    results, deleted = [], []
+    for id in ids:
+        obj = objs.pop(id, None) if isinstance(id, str) else None
+        if obj is None:
+            results.append({"status": 404, "error": "Not found"})
+        else:
+            storage.delete(obj)
+            deleted.append(obj)
+            results.append({"status": 200})
+    if deleted:
+        storage.save()
+        response_cache.forget(*deleted)
+    return batch_response(results)
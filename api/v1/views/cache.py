@@ -0,0 +1,267 @@
+#!/usr/bin/python3
+""" cache of the responses of the read endpoints, emptied by the writes """
+from api.v1.views.responses import conditional_response, list_types
+from collections import OrderedDict
+from flask import current_app, request
+from functools import wraps
+import hashlib
+from importlib import import_module
+import json
+from os import getenv
+import threading
+import time
+import uuid
+
+
+class MemoryBackend:
+    """
+    Dictionary of at most size entries, dropping the least recently used
+    one when full, whose entries expire ttl seconds after being stored
+
+    Any class with the same constructor and get, set, delete and clear
+    methods can stand in for it, to share the entries between processes.
+    """
+
+    def __init__(self, size, ttl):
+        """Initialization of an empty backend"""
+        self.__size = size
+        self.__ttl = ttl
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key):
+        """returns the value stored under key, None if none or expired"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self.__entries[key]
+                return None
+            self.__entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """stores value under key"""
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + self.__ttl, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__size:
+                self.__entries.popitem(last=False)
+
+    def delete(self, keys):
+        """drops the entries of keys"""
+        with self.__lock:
+            for key in keys:
+                self.__entries.pop(key, None)
+
+    def clear(self):
+        """drops every entry"""
+        with self.__lock:
+            self.__entries.clear()
+
+
+class ResponseCache:
+    """
+    Cache of the 200 responses of the views decorated by cached(), keyed
+    by their method, URL, media type and body, and tagged by what they
+    are read from: "Class" for the lists of a class, "Class.id" for an
+    object, "Class.attribute=value" for the objects of a class having
+    value; forget(obj) drops the responses that are tagged by obj
+
+    Each tag has a generation, a token kept in the backend next to the
+    responses and replaced by each invalidation of the tag. A response
+    is stored with the generations its tags had before the view ran, and
+    served only while they are unchanged, so that processes sharing a
+    backend share their invalidations too. Writes made outside of the
+    views, by the console or another program, are only seen once the
+    responses expire.
+    """
+
+    def __init__(self, size=0, ttl=60, backend=MemoryBackend,
+                 max_body=1 << 20):
+        """Initialization of a cache of size responses, 0 to cache none,
+        of at most max_body bytes each"""
+        self.size = size
+        self.max_body = max_body
+        self.backend = backend(size, ttl) if size else None
+        self.__lock = threading.Lock()
+        self.__counters = dict.fromkeys(
+            ("hits", "misses", "stores", "skipped", "invalidations"), 0)
+
+    def __count(self, counter, n=1):
+        """adds n to counter"""
+        with self.__lock:
+            self.__counters[counter] += n
+
+    def metrics(self):
+        """returns the counters of the cache"""
+        with self.__lock:
+            metrics = dict(self.__counters)
+        metrics.update(size=self.size, max_body=self.max_body)
+        return metrics
+
+    def generations(self, tags):
+        """returns {tag: generation} of tags, starting those without one,
+        such as the tags whose generation the backend evicted"""
+        generations = {}
+        for tag in tags:
+            generation = self.backend.get("tag:" + tag)
+            if generation is None:
+                generation = uuid.uuid4().hex
+                self.backend.set("tag:" + tag, generation)
+            generations[tag] = generation
+        return generations
+
+    def __current(self, generations):
+        """tells if the tags still have the generations of generations"""
+        return all(self.backend.get("tag:" + tag) == generation
+                   for tag, generation in generations.items())
+
+    def get(self, key):
+        """returns the response entry stored under key, None if none or
+        if one of its tags was invalidated since"""
+        entry = self.backend.get(key)
+        if entry is not None and not self.__current(entry["generations"]):
+            entry = None
+        self.__count("misses" if entry is None else "hits")
+        return entry
+
+    def set(self, key, entry):
+        """stores the response entry under key, unless one of the tags of
+        its generations was invalidated meanwhile, its body is larger than
+        max_body, or it is None for a response too large to keep"""
+        if entry is None or len(entry["body"]) > self.max_body or \
+                not self.__current(entry["generations"]):
+            self.__count("skipped")
+            return
+        self.backend.set(key, entry)
+        self.__count("stores")
+
+    def invalidate(self, tags):
+        """drops the responses tagged by any of tags"""
+        if self.backend is None:
+            return
+        tags = set(tags)
+        for tag in tags:
+            self.backend.set("tag:" + tag, uuid.uuid4().hex)
+        self.__count("invalidations", len(tags))
+
+    def forget(self, *objs):
+        """drops the responses read from objs, that were written"""
+        self.invalidate(self.__tagged((obj.__class__.__name__,
+                                       obj.to_dict()) for obj in objs))
+
+    def forget_rows(self, cls, rows):
+        """drops the responses read from the objects of cls written from
+        rows, the dictionaries of their attributes"""
+        self.invalidate(self.__tagged((cls.__name__, row) for row in rows))
+
+    @staticmethod
+    def __tagged(objects):
+        """returns the tags of the (class name, attributes) of objects"""
+        tags = []
+        for name, attributes in objects:
+            tags.extend((name, "{}.{}".format(name, attributes.get("id"))))
+            tags.extend("{}.{}={}".format(name, attribute, value)
+                        for attribute, value in attributes.items()
+                        if attribute.endswith("_id"))
+        return tags
+
+    def clear(self):
+        """drops every response"""
+        if self.backend is not None:
+            self.backend.clear()
+
+
+def backend_class(path):
+    """returns the class named by path, as package.module.Class"""
+    module, _, name = path.rpartition(".")
+    return getattr(import_module(module), name)
+
+
+response_cache = ResponseCache(
+    int(getenv("HBNB_API_CACHE_SIZE", "0")),
+    float(getenv("HBNB_API_CACHE_TTL", "60")),
+    backend_class(getenv("HBNB_API_CACHE_BACKEND",
+                         "api.v1.views.cache.MemoryBackend")),
+    int(getenv("HBNB_API_CACHE_MAX_BODY", str(1 << 20))))
+
+
+def cached(*tags):
+    """
+    Decorator caching the 200 responses of a view in response_cache,
+    tagged by tags formatted with the arguments of the view
+    """
+    def decorator(view):
+        """returns view caching its responses"""
+        @wraps(view)
+        def wrapper(**kwargs):
+            """returns the cached response, or the one view returns"""
+            if response_cache.backend is None:
+                return view(**kwargs)
+            mimetype = request.accept_mimetypes.best_match(
+                list_types, list_types[0])
+            key = hashlib.sha1(json.dumps([
+                request.method, request.full_path, mimetype,
+                request.get_data(as_text=True)]).encode()).hexdigest()
+            entry = response_cache.get(key)
+            if entry is not None:
+                return cached_response(entry)
+            # read before the view, so that writes made while it runs or
+            # streams keep its response from being stored
+            generations = response_cache.generations(
+                [tag.format(**kwargs) for tag in tags])
+            response = current_app.make_response(view(**kwargs))
+            if response.status_code == 200:
+                store(response, key, generations)
+            return response
+        return wrapper
+    return decorator
+
+
+def store(response, key, generations):
+    """
+    Stores the body and headers of response in response_cache once sent,
+    with the generations of its tags, streamed responses being kept
+    streamed and no longer kept once larger than max_body
+    """
+    entry = {"mimetype": response.mimetype, "generations": generations,
+             "headers": [(name, value) for name, value in response.headers
+                         if name in ("ETag", "Last-Modified", "Link",
+                                     "Vary")]}
+    if not response.is_streamed:
+        entry["body"] = response.get_data()
+        response_cache.set(key, entry)
+        return
+
+    def body(chunks):
+        """yields chunks, then stores them all unless too large"""
+        sent, size = [], 0
+        for chunk in chunks:
+            if sent is not None:
+                sent.append(chunk)
+                size += len(chunk)
+                if size > response_cache.max_body:
+                    sent = None
+            yield chunk
+        if sent is not None:
+            entry["body"] = b"".join(sent)
+        response_cache.set(key, entry if sent is not None else None)
+    response.response = body(response.response)
+
+
+def cached_response(entry):
+    """
+    Returns the response stored in entry, or a 304 response if the client
+    has it already
+    """
+    headers = dict(entry["headers"])
+    etag = headers.get("ETag", "").strip('"') or None
+    response = conditional_response(etag, headers.get("Last-Modified"))
+    if response is None:
+        response = current_app.response_class(
+            entry["body"], mimetype=entry["mimetype"])
+    response.headers.extend(entry["headers"])
+    return response
@@ -4,6 +4,9 @@ from models.city import City
 from models.state import State
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.cache import cached, response_cache
+from api.v1.views.responses import object_response, objects_response
+from api.v1.views.responses import page_response, requested_page
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
 
@@ -11,23 +14,29 @@ from flasgger.utils import swag_from
 @app_views.route('/states/<state_id>/cities', methods=['GET'],
                  strict_slashes=False)
 @swag_from('documentation/city/cities_by_state.yml', methods=['GET'])
+@cached("State.{state_id}", "City.state_id={state_id}")
 def get_cities(state_id):
     """
     Retrieves the list of all cities objects
     of a specific State, or a specific city
     """
-    list_cities = []
+    page = requested_page()
     state = storage.get(State, state_id)
     if not state:
         abort(404)
-    for city in state.cities:
-        list_cities.append(city.to_dict())
 
-    return jsonify(list_cities)
+    if page:
+        limit, after = page
+        return page_response(storage.page(City, limit + 1, after,
+                                          state_id=state_id), limit,
+                             classes=(City,))
+    return objects_response(storage.iter_filter(City, state_id=state_id),
+                            classes=(City,))
 
 
 @app_views.route('/cities/<city_id>/', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/city/get_city.yml', methods=['GET'])
+@cached("City.{city_id}")
 def get_city(city_id):
     """
     Retrieves a specific city based on id
@@ -35,7 +44,7 @@ def get_city(city_id):
     city = storage.get(City, city_id)
     if not city:
         abort(404)
-    return jsonify(city.to_dict())
+    return object_response(city)
 
 
 @app_views.route('/cities/<city_id>', methods=['DELETE'], strict_slashes=False)
@@ -50,6 +59,7 @@ def delete_city(city_id):
         abort(404)
     storage.delete(city)
     storage.save()
+    response_cache.forget(city)
 
     return make_response(jsonify({}), 200)
 
@@ -73,6 +83,7 @@ def post_city(state_id):
     instance = City(**data)
     instance.state_id = state.id
     instance.save()
+    response_cache.forget(instance)
     return make_response(jsonify(instance.to_dict()), 201)
 
 
@@ -95,5 +106,6 @@ def put_city(city_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(city, key, value)
-    storage.save()
+    city.save()
+    response_cache.forget(city)
     return make_response(jsonify(city.to_dict()), 200)
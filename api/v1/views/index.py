@@ -8,7 +8,8 @@ from models.state import State
 from models.user import User
 from models import storage
 from api.v1.views import app_views
-from flask import jsonify
+from api.v1.views.cache import response_cache
+from flask import abort, jsonify, request
 
 
 @app_views.route('/status', methods=['GET'], strict_slashes=False)
@@ -17,14 +18,42 @@ def status():
     return jsonify({"status": "OK"})
 
 
+@app_views.route('/status/pool', methods=['GET'], strict_slashes=False)
+def pool_status():
+    """ Connection pool metrics of the database storage """
+    if not hasattr(storage, "pool_metrics"):
+        abort(404)
+    return jsonify(storage.pool_metrics())
+
+
+@app_views.route('/status/cache', methods=['GET'], strict_slashes=False)
+def cache_status():
+    """ Hits, misses and invalidations of the response cache """
+    if response_cache.backend is None:
+        abort(404)
+    return jsonify(response_cache.metrics())
+
+
 @app_views.route('/stats', methods=['GET'], strict_slashes=False)
 def number_objects():
     """ Retrieves the number of each objects by type """
     classes = [Amenity, City, Place, Review, State, User]
     names = ["amenities", "cities", "places", "reviews", "states", "users"]
 
+    # the counts the storage keeps, read at once
+    counts = storage.counts()
     num_objs = {}
     for i in range(len(classes)):
-        num_objs[names[i]] = storage.count(classes[i])
+        num_objs[names[i]] = counts[classes[i].__name__]
 
     return jsonify(num_objs)
+
+
+@app_views.route('/status/counts', methods=['GET', 'POST'],
+                 strict_slashes=False)
+def counts_status():
+    """ Recounts the objects, reporting the counts kept that drifted,
+    which a POST replaces by those found """
+    drift = storage.check_counts(repair=request.method == 'POST')
+    return jsonify({name: {"kept": kept, "found": found}
+                    for name, (kept, found) in drift.items()})
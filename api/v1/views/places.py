@@ -1,35 +1,49 @@
 #!/usr/bin/python3
 """ objects that handle all default RestFul API actions for Places """
-from models.state import State
+from models.amenity import Amenity
 from models.city import City
 from models.place import Place
+from models.state import State
 from models.user import User
-from models.amenity import Amenity
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.batch import create_batch, delete_batch, update_batch
+from api.v1.views.cache import cached, response_cache
+from api.v1.views.responses import object_response, objects_response
+from api.v1.views.responses import page_response, requested_page
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
 
+# the classes places_search reads, whose versions tag its results
+searched = (Place, City, State, Amenity)
+
 
 @app_views.route('/cities/<city_id>/places', methods=['GET'],
                  strict_slashes=False)
 @swag_from('documentation/place/get_places.yml', methods=['GET'])
+@cached("City.{city_id}", "Place.city_id={city_id}")
 def get_places(city_id):
     """
     Retrieves the list of all Place objects of a City
     """
+    page = requested_page()
     city = storage.get(City, city_id)
 
     if not city:
         abort(404)
 
-    places = [place.to_dict() for place in city.places]
-
-    return jsonify(places)
+    if page:
+        limit, after = page
+        return page_response(storage.page(Place, limit + 1, after,
+                                          city_id=city_id), limit,
+                             classes=(Place,))
+    return objects_response(storage.iter_filter(Place, city_id=city_id),
+                            classes=(Place,))
 
 
 @app_views.route('/places/<place_id>', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/place/get_place.yml', methods=['GET'])
+@cached("Place.{place_id}")
 def get_place(place_id):
     """
     Retrieves a Place object
@@ -38,7 +52,7 @@ def get_place(place_id):
     if not place:
         abort(404)
 
-    return jsonify(place.to_dict())
+    return object_response(place)
 
 
 @app_views.route('/places/<place_id>', methods=['DELETE'],
@@ -56,6 +70,7 @@ def delete_place(place_id):
 
     storage.delete(place)
     storage.save()
+    response_cache.forget(place)
 
     return make_response(jsonify({}), 200)
 
@@ -90,6 +105,7 @@ def post_place(city_id):
     data["city_id"] = city_id
     instance = Place(**data)
     instance.save()
+    response_cache.forget(instance)
     return make_response(jsonify(instance.to_dict()), 201)
 
 
@@ -113,12 +129,42 @@ def put_place(place_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(place, key, value)
-    storage.save()
+    place.save()
+    response_cache.forget(place)
     return make_response(jsonify(place.to_dict()), 200)
 
 
+@app_views.route('/places/batch', methods=['POST'], strict_slashes=False)
+@swag_from('documentation/place/post_batch.yml', methods=['POST'])
+def post_places():
+    """
+    Creates a Place for each object of a JSON list, in a single save
+    """
+    return create_batch(Place, {'city_id': City, 'user_id': User}, ('name',))
+
+
+@app_views.route('/places/batch', methods=['PUT'], strict_slashes=False)
+@swag_from('documentation/place/put_batch.yml', methods=['PUT'])
+def put_places():
+    """
+    Updates the Places of the ids of a JSON list, in a single save
+    """
+    return update_batch(Place, ['id', 'user_id', 'city_id', 'created_at',
+                                'updated_at'])
+
+
+@app_views.route('/places/batch', methods=['DELETE'], strict_slashes=False)
+@swag_from('documentation/place/delete_batch.yml', methods=['DELETE'])
+def delete_places():
+    """
+    Deletes the Places of a JSON list of ids, in a single save
+    """
+    return delete_batch(Place)
+
+
 @app_views.route('/places_search', methods=['POST'], strict_slashes=False)
 @swag_from('documentation/place/post_search.yml', methods=['POST'])
+@cached("Place", "City", "State", "Amenity")
 def places_search():
     """
     Retrieves all Place objects depending of the JSON in the body
@@ -130,51 +176,21 @@ def places_search():
 
     data = request.get_json()
 
-    if data and len(data):
-        states = data.get('states', None)
-        cities = data.get('cities', None)
-        amenities = data.get('amenities', None)
-
-    if not data or not len(data) or (
-            not states and
-            not cities and
-            not amenities):
-        places = storage.all(Place).values()
-        list_places = []
-        for place in places:
-            list_places.append(place.to_dict())
-        return jsonify(list_places)
-
-    list_places = []
-    if states:
-        states_obj = [storage.get(State, s_id) for s_id in states]
-        for state in states_obj:
-            if state:
-                for city in state.cities:
-                    if city:
-                        for place in city.places:
-                            list_places.append(place)
-
-    if cities:
-        city_obj = [storage.get(City, c_id) for c_id in cities]
-        for city in city_obj:
-            if city:
-                for place in city.places:
-                    if place not in list_places:
-                        list_places.append(place)
-
-    if amenities:
-        if not list_places:
-            list_places = storage.all(Place).values()
-        amenities_obj = [storage.get(Amenity, a_id) for a_id in amenities]
-        list_places = [place for place in list_places
-                       if all([am in place.amenities
-                               for am in amenities_obj])]
-
-    places = []
-    for p in list_places:
-        d = p.to_dict()
-        d.pop('amenities', None)
-        places.append(d)
-
-    return jsonify(places)
+    page = requested_page()
+    if page:
+        limit, after = page
+        places = storage.search_places(data.get('states', None),
+                                       data.get('cities', None),
+                                       data.get('amenities', None),
+                                       limit=limit + 1, after=after)
+        return page_response(places, limit, classes=searched)
+
+    if not data or not len(data):
+        return objects_response(storage.iter_all(Place), classes=searched)
+
+    def places():
+        """yields the places found, searched only if sent"""
+        yield from storage.search_places(data.get('states', None),
+                                         data.get('cities', None),
+                                         data.get('amenities', None))
+    return objects_response(places(), classes=searched)
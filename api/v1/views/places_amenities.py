@@ -4,6 +4,8 @@ from models.place import Place
 from models.amenity import Amenity
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.cache import cached, response_cache
+from api.v1.views.responses import objects_response
 from os import environ
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
@@ -13,22 +15,17 @@ from flasgger.utils import swag_from
                  strict_slashes=False)
 @swag_from('documentation/place_amenity/get_places_amenities.yml',
            methods=['GET'])
+@cached("Place.{place_id}", "Amenity")
 def get_place_amenities(place_id):
     """
     Retrieves the list of all Amenity objects of a Place
     """
-    place = storage.get(Place, place_id)
+    place = storage.get(Place, place_id, load=("amenities",))
 
     if not place:
         abort(404)
 
-    if environ.get('HBNB_TYPE_STORAGE') == "db":
-        amenities = [amenity.to_dict() for amenity in place.amenities]
-    else:
-        amenities = [storage.get(Amenity, amenity_id).to_dict()
-                     for amenity_id in place.amenity_ids]
-
-    return jsonify(amenities)
+    return objects_response(place.amenities, classes=(Place, Amenity))
 
 
 @app_views.route('/places/<place_id>/amenities/<amenity_id>',
@@ -56,9 +53,12 @@ def delete_place_amenity(place_id, amenity_id):
     else:
         if amenity_id not in place.amenity_ids:
             abort(404)
-        place.amenity_ids.remove(amenity_id)
+        # reassigned, not mutated in place, so the change is tracked
+        place.amenity_ids = [a_id for a_id in place.amenity_ids
+                             if a_id != amenity_id]
 
-    storage.save()
+    place.save()
+    response_cache.forget(place)
     return make_response(jsonify({}), 200)
 
 
@@ -89,7 +89,8 @@ def post_place_amenity(place_id, amenity_id):
         if amenity_id in place.amenity_ids:
             return make_response(jsonify(amenity.to_dict()), 200)
         else:
-            place.amenity_ids.append(amenity_id)
+            place.amenity_ids = place.amenity_ids + [amenity_id]
 
-    storage.save()
+    place.save()
+    response_cache.forget(place)
     return make_response(jsonify(amenity.to_dict()), 201)
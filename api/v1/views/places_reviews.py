@@ -5,6 +5,10 @@ from models.place import Place
 from models.user import User
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.batch import create_batch, delete_batch, update_batch
+from api.v1.views.cache import cached, response_cache
+from api.v1.views.responses import object_response, objects_response
+from api.v1.views.responses import page_response, requested_page
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
 
@@ -12,22 +16,29 @@ from flasgger.utils import swag_from
 @app_views.route('/places/<place_id>/reviews', methods=['GET'],
                  strict_slashes=False)
 @swag_from('documentation/reviews/get_reviews.yml', methods=['GET'])
+@cached("Place.{place_id}", "Review.place_id={place_id}")
 def get_reviews(place_id):
     """
     Retrieves the list of all Review objects of a Place
     """
+    page = requested_page()
     place = storage.get(Place, place_id)
 
     if not place:
         abort(404)
 
-    reviews = [review.to_dict() for review in place.reviews]
-
-    return jsonify(reviews)
+    if page:
+        limit, after = page
+        return page_response(storage.page(Review, limit + 1, after,
+                                          place_id=place_id), limit,
+                             classes=(Review,))
+    return objects_response(storage.iter_filter(Review, place_id=place_id),
+                            classes=(Review,))
 
 
 @app_views.route('/reviews/<review_id>', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/reviews/get_review.yml', methods=['GET'])
+@cached("Review.{review_id}")
 def get_review(review_id):
     """
     Retrieves a Review object
@@ -36,7 +47,7 @@ def get_review(review_id):
     if not review:
         abort(404)
 
-    return jsonify(review.to_dict())
+    return object_response(review)
 
 
 @app_views.route('/reviews/<review_id>', methods=['DELETE'],
@@ -54,6 +65,7 @@ def delete_review(review_id):
 
     storage.delete(review)
     storage.save()
+    response_cache.forget(review)
 
     return make_response(jsonify({}), 200)
 
@@ -88,6 +100,7 @@ def post_review(place_id):
     data['place_id'] = place_id
     instance = Review(**data)
     instance.save()
+    response_cache.forget(instance)
     return make_response(jsonify(instance.to_dict()), 201)
 
 
@@ -111,5 +124,35 @@ def put_review(review_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(review, key, value)
-    storage.save()
+    review.save()
+    response_cache.forget(review)
     return make_response(jsonify(review.to_dict()), 200)
+
+
+@app_views.route('/reviews/batch', methods=['POST'], strict_slashes=False)
+@swag_from('documentation/reviews/post_batch.yml', methods=['POST'])
+def post_reviews():
+    """
+    Creates a Review for each object of a JSON list, in a single save
+    """
+    return create_batch(Review, {'place_id': Place, 'user_id': User},
+                        ('text',))
+
+
+@app_views.route('/reviews/batch', methods=['PUT'], strict_slashes=False)
+@swag_from('documentation/reviews/put_batch.yml', methods=['PUT'])
+def put_reviews():
+    """
+    Updates the Reviews of the ids of a JSON list, in a single save
+    """
+    return update_batch(Review, ['id', 'user_id', 'place_id', 'created_at',
+                                 'updated_at'])
+
+
+@app_views.route('/reviews/batch', methods=['DELETE'], strict_slashes=False)
+@swag_from('documentation/reviews/delete_batch.yml', methods=['DELETE'])
+def delete_reviews():
+    """
+    Deletes the Reviews of a JSON list of ids, in a single save
+    """
+    return delete_batch(Review)
@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+""" helpers that build the JSON responses of the views """
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import binascii
+from datetime import datetime
+from flask import abort, current_app, request, stream_with_context
+import hashlib
+import json
+from models import storage
+from os import getenv
+from urllib.parse import urlencode
+from werkzeug.http import is_resource_modified
+
+# the most objects a page holds, and the size of a page given a cursor only
+page_max = int(getenv("HBNB_API_PAGE_MAX", "1000"))
+# media types the lists are sent as, the first one unless asked otherwise
+list_types = ('application/json', 'application/x-ndjson')
+
+
+def object_response(obj, status=200):
+    """
+    Returns a JSON response holding obj.to_dict(), tagged from its id and
+    updated_at, or a 304 response if the client has it already
+    """
+    etag = hashlib.sha1("{}.{} {}".format(
+        obj.__class__.__name__, obj.id,
+        obj.updated_at.isoformat()).encode()).hexdigest()
+    response = conditional_response(etag, obj.updated_at)
+    if response is None:
+        response = current_app.response_class(obj.to_json(), status=status,
+                                              mimetype='application/json')
+    response.set_etag(etag)
+    if obj.updated_at is not None:
+        response.last_modified = obj.updated_at
+    return response
+
+
+def objects_response(objs, status=200, classes=()):
+    """
+    Returns a response streaming the list of obj.to_dict() for objs, as a
+    compact JSON array, or as one JSON object per line when the client
+    prefers application/x-ndjson; each object is only encoded, or taken
+    from the JSON it caches, when its turn to be sent comes
+
+    With the classes the list is read from, the response is tagged from
+    their storage versions and the request, and is a 304 response, with
+    objs left unread, if the client has it already.
+    """
+    mimetype = request.accept_mimetypes.best_match(list_types, list_types[0])
+    etag = modified = response = None
+    if classes:
+        versions = [storage.version(cls) for cls in classes]
+        etag = hashlib.sha1(json.dumps([
+            [tag for tag, date in versions], request.method,
+            request.full_path, mimetype,
+            request.get_data(as_text=True)]).encode()).hexdigest()
+        dates = [date for tag, date in versions]
+        if None not in dates:
+            modified = max(dates)
+        response = conditional_response(etag, modified)
+    if response is None:
+        if mimetype == 'application/x-ndjson':
+            body = (obj.to_json() + b"\n" for obj in objs)
+        else:
+            body = json_array(objs)
+        response = current_app.response_class(
+            stream_with_context(body), status=status, mimetype=mimetype)
+    if etag is not None:
+        response.set_etag(etag)
+    if modified is not None:
+        response.last_modified = modified
+    response.vary.add('Accept')
+    return response
+
+
+def conditional_response(etag, modified=None):
+    """
+    Returns an empty 304 response if the If-None-Match or
+    If-Modified-Since header of the request matches etag or modified,
+    None otherwise
+    """
+    if is_resource_modified(request.environ, etag=etag,
+                            last_modified=modified):
+        return None
+    return current_app.response_class(status=304)
+
+
+def json_array(objs):
+    """
+    Yields the JSON array of obj.to_dict() for objs, one object at a time
+    """
+    yield b"["
+    separator = b""
+    for obj in objs:
+        yield separator + obj.to_json()
+        separator = b", "
+    yield b"]"
+
+
+def requested_page():
+    """
+    Returns the (limit, after) of the page asked for by the limit and
+    cursor parameters of the request, or None for every object
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    if limit is None and cursor is None:
+        return None
+    try:
+        limit = page_max if limit is None else int(limit)
+    except ValueError:
+        abort(400, description="Invalid limit")
+    if not 0 < limit <= page_max:
+        abort(400, description="Invalid limit")
+    after = None
+    if cursor:
+        try:
+            created_at, id = json.loads(urlsafe_b64decode(cursor.encode()))
+            after = (datetime.fromisoformat(created_at), str(id))
+        except (binascii.Error, TypeError, ValueError):
+            abort(400, description="Invalid cursor")
+    return limit, after
+
+
+def page_response(objs, limit, classes=()):
+    """
+    Returns the JSON response of a page of at most limit of objs, fetched
+    with one more to tell whether a next page follows, in which case its
+    URL is given in the Link header; classes are as for objects_response
+    """
+    objs = list(objs)
+    response = objects_response(objs[:limit], classes=classes)
+    if len(objs) > limit:
+        last = objs[limit - 1]
+        cursor = urlsafe_b64encode(json.dumps(
+            [last.created_at.isoformat(timespec="microseconds"),
+             last.id]).encode()).decode()
+        args = request.args.to_dict()
+        args.update(limit=limit, cursor=cursor)
+        response.headers['Link'] = '<{}?{}>; rel="next"'.format(
+            request.base_url, urlencode(args))
+    return response
@@ -3,32 +3,38 @@
 from models.state import State
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.cache import cached, response_cache
+from api.v1.views.responses import object_response, objects_response
+from api.v1.views.responses import page_response, requested_page
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
 
 
 @app_views.route('/states', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/state/get_state.yml', methods=['GET'])
+@cached("State")
 def get_states():
     """
     Retrieves the list of all State objects
     """
-    all_states = storage.all(State).values()
-    list_states = []
-    for state in all_states:
-        list_states.append(state.to_dict())
-    return jsonify(list_states)
+    page = requested_page()
+    if page:
+        limit, after = page
+        return page_response(storage.page(State, limit + 1, after), limit,
+                             classes=(State,))
+    return objects_response(storage.iter_all(State), classes=(State,))
 
 
 @app_views.route('/states/<state_id>', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/state/get_id_state.yml', methods=['get'])
+@cached("State.{state_id}")
 def get_state(state_id):
     """ Retrieves a specific State """
     state = storage.get(State, state_id)
     if not state:
         abort(404)
 
-    return jsonify(state.to_dict())
+    return object_response(state)
 
 
 @app_views.route('/states/<state_id>', methods=['DELETE'],
@@ -46,6 +52,7 @@ def delete_state(state_id):
 
     storage.delete(state)
     storage.save()
+    response_cache.forget(state)
 
     return make_response(jsonify({}), 200)
 
@@ -65,6 +72,7 @@ def post_state():
     data = request.get_json()
     instance = State(**data)
     instance.save()
+    response_cache.forget(instance)
     return make_response(jsonify(instance.to_dict()), 201)
 
 
@@ -88,5 +96,6 @@ def put_state(state_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(state, key, value)
-    storage.save()
+    state.save()
+    response_cache.forget(state)
     return make_response(jsonify(state.to_dict()), 200)
@@ -3,33 +3,39 @@
 from models.user import User
 from models import storage
 from api.v1.views import app_views
+from api.v1.views.cache import cached, response_cache
+from api.v1.views.responses import object_response, objects_response
+from api.v1.views.responses import page_response, requested_page
 from flask import abort, jsonify, make_response, request
 from flasgger.utils import swag_from
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/user/all_users.yml')
+@cached("User")
 def get_users():
     """
     Retrieves the list of all user objects
     or a specific user
     """
-    all_users = storage.all(User).values()
-    list_users = []
-    for user in all_users:
-        list_users.append(user.to_dict())
-    return jsonify(list_users)
+    page = requested_page()
+    if page:
+        limit, after = page
+        return page_response(storage.page(User, limit + 1, after), limit,
+                             classes=(User,))
+    return objects_response(storage.iter_all(User), classes=(User,))
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
 @swag_from('documentation/user/get_user.yml', methods=['GET'])
+@cached("User.{user_id}")
 def get_user(user_id):
     """ Retrieves an user """
     user = storage.get(User, user_id)
     if not user:
         abort(404)
 
-    return jsonify(user.to_dict())
+    return object_response(user)
 
 
 @app_views.route('/users/<user_id>', methods=['DELETE'],
@@ -47,6 +53,7 @@ def delete_user(user_id):
 
     storage.delete(user)
     storage.save()
+    response_cache.forget(user)
 
     return make_response(jsonify({}), 200)
 
@@ -68,6 +75,7 @@ def post_user():
     data = request.get_json()
     instance = User(**data)
     instance.save()
+    response_cache.forget(instance)
     return make_response(jsonify(instance.to_dict()), 201)
 
 
@@ -91,5 +99,6 @@ def put_user(user_id):
     for key, value in data.items():
         if key not in ignore:
             setattr(user, key, value)
-    storage.save()
+    user.save()
+    response_cache.forget(user)
     return make_response(jsonify(user.to_dict()), 200)
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""
+Compares the ways to find the places having all of some amenities: a scan
+of every amenity list, an intersection of sets of places, and the AND of
+the compressed bitmaps of a BitmapIndex
+
+usage: python3 -m benchmarks.amenity_bitmaps [places] [amenities] [share]
+
+The sizes are measured on the first 100000 places only, as tracing the
+allocations slows the builds down many times.
+"""
+
+from models.engine.bitmap import BitmapIndex
+import random
+import sys
+import time
+import tracemalloc
+
+
+def timed(function):
+    """returns the result of function() and the seconds it took"""
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def allocated(function):
+    """returns the bytes the result of function() keeps allocated"""
+    tracemalloc.start()
+    result = function()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    m = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    share = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+    rng = random.Random(0)
+    amenities = ["amenity-{}".format(i) for i in range(m)]
+    keys = ["Place.{}".format(i) for i in range(n)]
+    # each place has each amenity with probability share
+    lists = [[a for a in amenities if rng.random() < share]
+             for i in range(n)]
+    print("{} places, {} amenities, {:.1f} amenities per place".format(
+        n, m, sum(map(len, lists)) / n))
+
+    def build_sets(sample=None):
+        """returns {amenity: set of place keys}"""
+        sets = {}
+        for key, ids in zip(keys[:sample], lists):
+            for a in ids:
+                sets.setdefault(a, set()).add(key)
+        return sets
+
+    def build_bitmaps(sample=None):
+        """returns a BitmapIndex of the amenities of the places"""
+        index = BitmapIndex()
+        for key, ids in zip(keys[:sample], lists):
+            index.update(key, key, (), ids)
+        return index
+
+    sample = min(n, 100000)
+    sets, sets_build = timed(build_sets)
+    index, bits_build = timed(build_bitmaps)
+    sets_size = allocated(lambda: build_sets(sample))
+    bits_size = allocated(lambda: build_bitmaps(sample))
+    print("{:8} {:>10} {:>13}".format("index", "build (s)", "bytes/place"))
+    print("{:8} {:10.2f} {:13.1f}".format("sets", sets_build,
+                                          sets_size / sample))
+    print("{:8} {:10.2f} {:13.1f}".format("bitmaps", bits_build,
+                                          bits_size / sample))
+
+    print("{:>9} {:>9} {:>10} {:>10} {:>11}".format(
+        "amenities", "places", "scan (ms)", "sets (ms)", "bitmap (ms)"))
+    for k in (1, 2, 3, 5):
+        query = rng.sample(amenities, k)
+        found, scan = timed(lambda: [key for key, ids in zip(keys, lists)
+                                     if all(a in ids for a in query)])
+        common, inter = timed(lambda: set.intersection(
+            *sorted((sets.get(a, set()) for a in query), key=len)))
+        matching, bits = timed(lambda: index.find(query))
+        assert set(found) == common == set(matching)
+        print("{:9} {:9} {:10.1f} {:10.1f} {:11.1f}".format(
+            k, len(found), scan * 1000, inter * 1000, bits * 1000))
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Compares the ways to insert many places into a DBStorage: one object
+each through new_many and save, and the rows sent by bulk_save
+
+usage: python3 -m benchmarks.bulk_insert [places] [chunk size]
+
+The database is a SQLite file in a temporary directory unless
+HBNB_DB_URL names another one, whose tables are dropped.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+
+def timed(function):
+    """returns the result of function() and the seconds it took"""
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    chunk = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    directory = tempfile.TemporaryDirectory()
+    # the models are defined for the storage chosen when first imported
+    os.environ["HBNB_TYPE_STORAGE"] = "db"
+    os.environ["HBNB_ENV"] = "test"
+    os.environ.setdefault("HBNB_DB_URL", "sqlite:///{}".format(
+        os.path.join(directory.name, "bulk.db")))
+    from models import storage
+    from models.city import City
+    from models.place import Place
+    from models.state import State
+    from models.user import User
+    user = User(email="bulk@hbnb.io", password="pwd")
+    state = State(name="Bulk")
+    city = City(name="Bulk", state_id=state.id)
+    storage.new_many([user, state, city])
+    storage.save()
+
+    def rows():
+        """yields the attributes of n places"""
+        for i in range(n):
+            yield {"name": "Place {}".format(i), "city_id": city.id,
+                   "user_id": user.id, "number_rooms": i % 5,
+                   "price_by_night": 100 + i % 50}
+
+    def objects():
+        """saves n places built one by one"""
+        storage.new_many(Place(**row) for row in rows())
+        storage.save()
+
+    _, seconds = timed(objects)
+    stats = storage.bulk_save(Place, rows(), chunk)
+    assert storage.count(Place) == 2 * n
+    print("{:10} {:>8} {:>10} {:>10}".format("insert", "places", "time (s)",
+                                             "places/s"))
+    print("{:10} {:8} {:10.2f} {:10.0f}".format("objects", n, seconds,
+                                                n / seconds))
+    print("{:10} {:8} {:10.2f} {:10.0f}".format(
+        "bulk_save", stats["rows"], stats["seconds"],
+        stats["rows_per_second"]))
+    storage.close()
+    directory.cleanup()
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""
+Compares the memory FileStorage takes once reloaded, with and without
+HBNB_FILE_COMPACT
+
+usage: python3 -m benchmarks.model_memory [number of places]
+"""
+
+from benchmarks.snapshot_formats import records
+from models.engine.snapshot import formats
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def measure(snapshot):
+    """prints the bytes per object and the seconds FileStorage.reload()
+    takes on a copy of snapshot, made in the current directory"""
+    import models
+
+    shutil.copy(snapshot, "file.json")
+    start = time.perf_counter()
+    models.storage.reload()
+    seconds = time.perf_counter() - start
+    # the objects of the first reload are freed by the second one
+    tracemalloc.start()
+    models.storage.reload()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print("{:.1f} {:.3f}".format(used / models.storage.count(), seconds))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--measure":
+        measure(sys.argv[2])
+        sys.exit(0)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, "snapshot.json")
+        with open(snapshot, 'w') as f:
+            formats["json"].dump(records(n), f)
+        print("{} objects".format(2 * n))
+        print("{:8} {:>14} {:>11}".format(
+            "models", "bytes/object", "reload (s)"))
+        for name, compact in (("dict", "0"), ("compact", "1")):
+            # the representation is chosen when models is imported
+            env = dict(os.environ, HBNB_FILE_COMPACT=compact,
+                       PYTHONPATH=os.getcwd())
+            for key in ("HBNB_TYPE_STORAGE", "HBNB_FILE_FORMAT",
+                        "HBNB_FILE_LAYOUT", "HBNB_FILE_LAZY"):
+                env.pop(key, None)
+            workdir = os.path.join(tmp, name)
+            os.mkdir(workdir)
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.model_memory",
+                 "--measure", snapshot], env=env, cwd=workdir, check=True,
+                stdout=subprocess.PIPE, universal_newlines=True)
+            size, seconds = out.stdout.split()
+            print("{:8} {:>14} {:>11}".format(name, size, seconds))
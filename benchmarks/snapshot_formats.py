@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+"""
+Compares the save and load times of the FileStorage snapshot formats
+
+usage: python3 -m benchmarks.snapshot_formats [number of objects]
+"""
+
+from models.engine.file_storage import classes
+from models.engine.snapshot import formats
+from models.place import Place
+from models.review import Review
+import os
+import sys
+import tempfile
+import time
+
+
+def records(n):
+    """returns the to_dict() records of n places and n reviews"""
+    result = []
+    for i in range(n):
+        place = Place(name="Place {}".format(i), city_id="c", user_id="u",
+                      number_rooms=i % 5, price_by_night=100 + i % 50,
+                      latitude=37.77, longitude=-122.41)
+        review = Review(text="Review {}".format(i), place_id=place.id,
+                        user_id="u")
+        for obj in (place, review):
+            result.append((obj.__class__.__name__ + "." + obj.id,
+                           obj.to_dict()))
+    return result
+
+
+def timed(function):
+    """returns the seconds taken by function()"""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def bench(fmt, data, path):
+    """returns the save, load and build times and the size of a file"""
+    def save():
+        """writes data to path"""
+        with open(path, 'w' + fmt.mode) as f:
+            fmt.dump(iter(data), f)
+
+    def load():
+        """reads every record of path"""
+        with open(path, 'r' + fmt.mode) as f:
+            for key, value in fmt.load(f):
+                pass
+
+    def build():
+        """reads path and builds every object"""
+        with open(path, 'r' + fmt.mode) as f:
+            for key, value in fmt.load(f):
+                classes[value["__class__"]](**value)
+    return timed(save), timed(load), timed(build), os.path.getsize(path)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    data = records(n)
+    print("{} objects".format(len(data)))
+    print("{:8} {:>9} {:>9} {:>9} {:>12}".format(
+        "format", "save (s)", "load (s)", "build (s)", "size (B)"))
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fmt in formats.items():
+            path = os.path.join(tmp, "file" + fmt.extension)
+            print("{:8} {:9.3f} {:9.3f} {:9.3f} {:12d}".format(
+                name, *bench(fmt, data, path)))
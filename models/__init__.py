@@ -7,6 +7,8 @@ from os import getenv
 
 
 storage_t = getenv("HBNB_TYPE_STORAGE")
+# file storage keeps attributes in __slots__ when HBNB_FILE_COMPACT is 1
+compact = storage_t != "db" and getenv("HBNB_FILE_COMPACT") == "1"
 
 if storage_t == "db":
     from models.engine.db_storage import DBStorage
@@ -4,29 +4,81 @@ Contains class BaseModel
 """
 
 from datetime import datetime
+import json
 import models
 from os import getenv
 import sqlalchemy
 from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.declarative import declarative_base
+import sys
 import uuid
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
 
+
+class Compact(type):
+    """metaclass turning the attribute defaults of a model into __slots__
+
+    The defaults move to the _defaults dictionary of the class, and the
+    names of every slot holding an attribute are listed in _columns, so
+    instances store their attributes without a __dict__ of their own.
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        """creates the class with a slot for each of its defaults"""
+        defaults = {}
+        columns = []
+        for base in bases:
+            defaults.update(getattr(base, "_defaults", {}))
+            columns.extend(getattr(base, "_columns", ()))
+        for key, value in list(namespace.items()):
+            if not key.startswith("_") and not callable(value) and \
+                    not hasattr(value, "__get__"):
+                defaults[key] = namespace.pop(key)
+        namespace.setdefault("__slots__", tuple(
+            key for key in defaults if key not in columns))
+        columns.extend(namespace["__slots__"])
+        namespace["_defaults"] = defaults
+        namespace["_columns"] = tuple(columns)
+        return super().__new__(mcs, name, bases, namespace)
+
+
 if models.storage_t == "db":
     Base = declarative_base()
+elif models.compact:
+    class Base(metaclass=Compact):
+        """base of the models compacted into __slots__"""
+        __slots__ = ()
 else:
     Base = object
 
 
 class BaseModel:
     """The BaseModel class from which future classes will be derived"""
+    if models.compact:
+        # attributes missing from the slots are kept in the __extra dict
+        __slots__ = ("__cache", "__extra", "__weakref__",
+                     "id", "created_at", "updated_at")
+        _columns = ("id", "created_at", "updated_at")
+        _defaults = {}
+    else:
+        # __cache holds the serialized forms of the instance, outside
+        # __dict__
+        __slots__ = ("__cache", "__dict__", "__weakref__")
     include_password = False
 
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
-        created_at = Column(DateTime, default=datetime.utcnow)
-        updated_at = Column(DateTime, default=datetime.utcnow)
+        # pages are read in (created_at, id) order from the index, and
+        # MySQL keeps the microseconds the cursors hold only with fsp=6;
+        # the versions of the classes read the latest updated_at
+        created_at = Column(DateTime().with_variant(mysql.DATETIME(fsp=6),
+                                                    "mysql"),
+                            default=datetime.utcnow, index=True)
+        updated_at = Column(DateTime().with_variant(mysql.DATETIME(fsp=6),
+                                                    "mysql"),
+                            default=datetime.utcnow, index=True)
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
@@ -35,12 +87,12 @@ class BaseModel:
                 if key != "__class__":
                     setattr(self, key, value)
             if kwargs.get("created_at", None) and type(self.created_at) is str:
-                self.created_at = datetime.strptime(kwargs["created_at"], time)
-            else:
+                self.created_at = datetime.fromisoformat(kwargs["created_at"])
+            elif type(kwargs.get("created_at", None)) is not datetime:
                 self.created_at = datetime.utcnow()
             if kwargs.get("updated_at", None) and type(self.updated_at) is str:
-                self.updated_at = datetime.strptime(kwargs["updated_at"], time)
-            else:
+                self.updated_at = datetime.fromisoformat(kwargs["updated_at"])
+            elif type(kwargs.get("updated_at", None)) is not datetime:
                 self.updated_at = datetime.utcnow()
             if kwargs.get("id", None) is None:
                 self.id = str(uuid.uuid4())
@@ -49,6 +101,66 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    if models.compact:
+        def __new__(cls, *args, **kwargs):
+            """creates the instance with its private slots and id set, so
+            that reading them never falls back to __getattr__"""
+            self = super().__new__(cls)
+            object.__setattr__(self, "_BaseModel__cache", None)
+            object.__setattr__(self, "_BaseModel__extra", None)
+            object.__setattr__(self, "id", None)
+            return self
+
+        def __setattr__(self, name, value):
+            """sets an attribute in its slot, or in __extra when it has
+            none, then does what file storage does for any change"""
+            cls = type(self)
+            old = getattr(self, name, None)
+            object.__setattr__(self, "_BaseModel__cache", None)
+            if type(value) is str and (name == "id" or name[-3:] == "_id"):
+                # the many objects referencing one id share its string
+                value = sys.intern(value)
+            if name in cls._columns or \
+                    hasattr(getattr(cls, name, None), "__set__"):
+                object.__setattr__(self, name, value)
+            else:
+                if self.__extra is None:
+                    object.__setattr__(self, "_BaseModel__extra", {})
+                self.__extra[name] = value
+            models.storage.changed(self, name, old)
+
+        def __getattr__(self, name):
+            """returns the default of an unset slot, or an attribute kept
+            in __extra"""
+            defaults = type(self)._defaults
+            if name in defaults:
+                return defaults[name]
+            extra = object.__getattribute__(self, "_BaseModel__extra")
+            if extra is not None and name in extra:
+                return extra[name]
+            raise AttributeError(name)
+
+        @property
+        def __dict__(self):
+            """returns a copy of the attributes set on the instance"""
+            attributes = {}
+            for name in self._columns:
+                try:
+                    attributes[name] = object.__getattribute__(self, name)
+                except AttributeError:
+                    pass
+            attributes.update(self.__extra or {})
+            return attributes
+
+    elif models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets an attribute, marks the instance as changed since it
+            was persisted and updates the storage indexes"""
+            old = getattr(self, name, None)
+            object.__setattr__(self, "_BaseModel__cache", None)
+            super().__setattr__(name, value)
+            models.storage.changed(self, name, old)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
@@ -60,20 +172,74 @@ class BaseModel:
         models.storage.new(self)
         models.storage.save()
 
+    def __serialize(self):
+        """builds the dictionary of all keys/values of the instance"""
+        new_dict = {}
+        for key, value in self.__dict__.items():
+            if key == "_sa_instance_state":
+                continue
+            if type(value) is datetime:
+                # same text as strftime(time), several times faster
+                value = value.isoformat(timespec="microseconds")
+            elif isinstance(value, BaseModel) or (
+                    isinstance(value, list) and value and
+                    isinstance(value[0], BaseModel)):
+                # relationships loaded by SQLAlchemy are not attributes
+                continue
+            new_dict[key] = value
+        new_dict["__class__"] = self.__class__.__name__
+        return new_dict
+
+    def __cached(self):
+        """returns the serialization cache, emptied by any change
+
+        Only file storage sees every change through __setattr__, so with
+        DBStorage the cache lives for a single call. Compact models trade
+        the cache for memory, theirs lives for a single call too.
+        """
+        cache = getattr(self, "_BaseModel__cache", None)
+        if cache is None:
+            cache = {}
+            if models.storage_t != "db" and not models.compact:
+                object.__setattr__(self, "_BaseModel__cache", cache)
+        if "dict" not in cache:
+            cache["dict"] = self.__serialize()
+        return cache
+
     def to_dict(self):
         """returns a dictionary containing all keys/values of the instance"""
-        new_dict = self.__dict__.copy()
-        if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
-        if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
-        new_dict["__class__"] = self.__class__.__name__
-        if "_sa_instance_state" in new_dict:
-            del new_dict["_sa_instance_state"]
+        new_dict = dict(self.__cached()["dict"])
         if not BaseModel.include_password:
             new_dict.pop('password', None)
         return new_dict
 
+    def to_json(self):
+        """returns to_dict() encoded as JSON bytes, cached like it"""
+        if BaseModel.include_password:
+            return json.dumps(self.to_dict()).encode()
+        cache = self.__cached()
+        if "json" not in cache:
+            cache["json"] = json.dumps(self.to_dict()).encode()
+        return cache["json"]
+
+    def to_record(self):
+        """returns to_dict() as last persisted, rebuilt only if changed"""
+        record = (getattr(self, "_BaseModel__cache", None) or {}).get("record")
+        if record is None:
+            record = self.to_dict()
+            self.__cached()["record"] = record
+        return record
+
+    def set_record(self, record):
+        """marks the instance as unchanged since record was persisted"""
+        if models.compact:
+            return
+        cache = getattr(self, "_BaseModel__cache", None)
+        if cache is None:
+            cache = {}
+            object.__setattr__(self, "_BaseModel__cache", cache)
+        cache["record"] = record
+
     def delete(self):
         """delete the current instance from the storage"""
         models.storage.delete(self)
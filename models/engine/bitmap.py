@@ -0,0 +1,209 @@
+#!/usr/bin/python3
+"""
+Contains the Bitmap and BitmapIndex classes
+"""
+
+from array import array
+from bisect import bisect_left
+
+# offsets of the bits set in each byte value
+_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1)
+         for byte in range(256)]
+
+
+class Bitmap:
+    """compressed set of non negative integers
+
+    Integers are split in chunks of 2**16 by their high bits, and only the
+    chunks holding some are stored: as a sorted array of low bits while a
+    chunk holds at most sparse_max of them, as a bitmap of 8 KiB after.
+    """
+    chunk_bits = 16
+    sparse_max = 4096
+
+    def __init__(self):
+        """Initialization of an empty bitmap"""
+        self.__chunks = {}
+        self.__sizes = {}
+
+    def __len__(self):
+        """returns the number of integers in the bitmap"""
+        return sum(self.__sizes.values())
+
+    def __contains__(self, n):
+        """returns True if n is in the bitmap"""
+        chunk = self.__chunks.get(n >> self.chunk_bits)
+        return chunk is not None and self.__has(chunk, n & 0xFFFF)
+
+    def __iter__(self):
+        """yields the integers of the bitmap in increasing order"""
+        for high in sorted(self.__chunks):
+            yield from self.__expand(high, self.__chunks[high])
+
+    @staticmethod
+    def __has(chunk, low):
+        """returns True if low is in the chunk"""
+        if type(chunk) is bytearray:
+            return bool(chunk[low >> 3] >> (low & 7) & 1)
+        i = bisect_left(chunk, low)
+        return i < len(chunk) and chunk[i] == low
+
+    def __expand(self, high, chunk):
+        """returns the integers held by the chunk of high bits high"""
+        base = high << self.chunk_bits
+        if type(chunk) is not bytearray:
+            return [base + low for low in chunk]
+        return self.__bits(base, chunk)
+
+    @staticmethod
+    def __bits(base, data):
+        """returns base + the offsets of the bits set in data"""
+        found = []
+        for i, byte in enumerate(data):
+            if byte:
+                at = base + (i << 3)
+                found.extend(at + bit for bit in _BITS[byte])
+        return found
+
+    def add(self, n):
+        """adds n to the bitmap"""
+        high, low = n >> self.chunk_bits, n & 0xFFFF
+        chunk = self.__chunks.get(high)
+        if chunk is None:
+            self.__chunks[high] = array('H', (low,))
+            self.__sizes[high] = 1
+        elif type(chunk) is bytearray:
+            if not chunk[low >> 3] >> (low & 7) & 1:
+                chunk[low >> 3] |= 1 << (low & 7)
+                self.__sizes[high] += 1
+        else:
+            i = bisect_left(chunk, low)
+            if i == len(chunk) or chunk[i] != low:
+                chunk.insert(i, low)
+                self.__sizes[high] += 1
+                if len(chunk) > self.sparse_max:
+                    dense = bytearray(8192)
+                    for offset in chunk:
+                        dense[offset >> 3] |= 1 << (offset & 7)
+                    self.__chunks[high] = dense
+
+    def discard(self, n):
+        """removes n from the bitmap if it is there"""
+        high, low = n >> self.chunk_bits, n & 0xFFFF
+        chunk = self.__chunks.get(high)
+        if chunk is None or not self.__has(chunk, low):
+            return
+        self.__sizes[high] -= 1
+        if not self.__sizes[high]:
+            del self.__chunks[high]
+            del self.__sizes[high]
+        elif type(chunk) is bytearray:
+            chunk[low >> 3] &= ~(1 << (low & 7)) & 0xFF
+            if self.__sizes[high] <= self.sparse_max // 2:
+                self.__chunks[high] = array('H', self.__bits(0, chunk))
+        else:
+            chunk.pop(bisect_left(chunk, low))
+
+    @classmethod
+    def intersection(cls, bitmaps):
+        """returns the sorted list of the integers in all of bitmaps"""
+        if not bitmaps:
+            return []
+        chunks = [bitmap.__chunks for bitmap in bitmaps]
+        highs = set(chunks[0]).intersection(*chunks[1:])
+        found = []
+        for high in sorted(highs):
+            parts = sorted((c[high] for c in chunks),
+                           key=lambda chunk: type(chunk) is bytearray)
+            if type(parts[0]) is bytearray:
+                # dense AND dense: one machine-word AND over 8 KiB
+                value = int.from_bytes(parts[0], "little")
+                for part in parts[1:]:
+                    value &= int.from_bytes(part, "little")
+                found.extend(cls.__bits(high << cls.chunk_bits,
+                                        value.to_bytes(8192, "little")))
+                continue
+            lows = min((part for part in parts if type(part) is not
+                        bytearray), key=len)
+            base = high << cls.chunk_bits
+            found.extend(base + low for low in lows
+                         if all(cls.__has(part, low) for part in parts))
+        return found
+
+
+class BitmapIndex:
+    """inverted index from values to the Bitmap of the objects having them
+
+    Each object indexed gets an ordinal, the integer its bitmaps hold;
+    the ordinals of removed objects are reused.
+    """
+
+    def __init__(self):
+        """Initialization of an empty index"""
+        self.__ordinals = {}
+        self.__keys = []
+        self.__objects = []
+        self.__free = []
+        self.__bitmaps = {}
+
+    def __len__(self):
+        """returns the number of objects in the index"""
+        return len(self.__ordinals)
+
+    def bitmap(self, value):
+        """returns the Bitmap of the ordinals of the objects with value"""
+        return self.__bitmaps.get(value, Bitmap())
+
+    def update(self, key, obj, old, new):
+        """records that obj, stored under key, had the values old and now
+        has the values new"""
+        ordinal = self.__ordinals.get(key)
+        if ordinal is None:
+            if not new:
+                return
+            if self.__free:
+                ordinal = self.__free.pop()
+                self.__keys[ordinal] = key
+                self.__objects[ordinal] = obj
+            else:
+                ordinal = len(self.__keys)
+                self.__keys.append(key)
+                self.__objects.append(obj)
+            self.__ordinals[key] = ordinal
+        else:
+            self.__objects[ordinal] = obj
+        new = set(new)
+        for value in set(old) - new:
+            self.__discard(value, ordinal)
+        for value in new:
+            bitmap = self.__bitmaps.get(value)
+            if bitmap is None:
+                bitmap = self.__bitmaps[value] = Bitmap()
+            bitmap.add(ordinal)
+
+    def remove(self, key, values):
+        """forgets the object stored under key, that has values"""
+        ordinal = self.__ordinals.pop(key, None)
+        if ordinal is not None:
+            for value in set(values):
+                self.__discard(value, ordinal)
+            self.__keys[ordinal] = None
+            self.__objects[ordinal] = None
+            self.__free.append(ordinal)
+
+    def __discard(self, value, ordinal):
+        """removes ordinal from the bitmap of value"""
+        bitmap = self.__bitmaps.get(value)
+        if bitmap is not None:
+            bitmap.discard(ordinal)
+            if not len(bitmap):
+                del self.__bitmaps[value]
+
+    def find(self, values):
+        """returns {key: obj} of the objects having all of values"""
+        bitmaps = [self.__bitmaps.get(value) for value in set(values)]
+        if not bitmaps or None in bitmaps:
+            return {}
+        bitmaps.sort(key=len)
+        return {self.__keys[ordinal]: self.__objects[ordinal]
+                for ordinal in Bitmap.intersection(bitmaps)}
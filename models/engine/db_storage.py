@@ -3,18 +3,29 @@
 Contains the class DBStorage
 """
 
+from datetime import datetime
+from itertools import islice
 import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine.pool import PoolMetrics, TimedQueuePool
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
+from sqlalchemy import (and_, bindparam, create_engine, DateTime, event,
+                        func, insert, or_, select, Table, text, tuple_)
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.pool import StaticPool
+import threading
+import time
+import uuid
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -24,47 +35,526 @@ class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
     __session = None
+    # how count() counts, HBNB_MYSQL_COUNT is exact (default), cached to
+    # reuse a count for HBNB_MYSQL_COUNT_TTL seconds, estimate to read
+    # the row counts MySQL keeps in information_schema, or maintained to
+    # count once and then add the rows each commit inserts and deletes
+    __count_mode = getenv("HBNB_MYSQL_COUNT", "exact")
+    __count_ttl = float(getenv("HBNB_MYSQL_COUNT_TTL", "10"))
+    # dictionary - <class name> -> (count, time.monotonic() of the count)
+    __counts = None
+    # dictionary - <class name> -> rows committed, in maintained mode
+    __kept = None
+    # lock held while __kept or __versions is read or written
+    __kept_lock = None
+    # dictionary - <class name> -> (commits that changed its rows,
+    # datetime of the last), counted since __epoch, which differs between
+    # storages
+    __versions = None
+    __epoch = None
+    # PoolMetrics - counters of the connection pool of __engine
+    __metrics = None
+    # integer - rows the iterators fetch at a time
+    __batch_size = 1000
+    # integer - rows bulk_save() and bulk_upsert() send per statement
+    __bulk_chunk = int(getenv("HBNB_MYSQL_BULK_CHUNK", "1000"))
 
     def __init__(self):
-        """Instantiate a DBStorage object"""
+        """Instantiate a DBStorage object
+
+        HBNB_DB_URL, such as sqlite:///hbnb.db, replaces the MySQL
+        database built from the HBNB_MYSQL_* variables.
+        """
         HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
         HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        url = getenv('HBNB_DB_URL') or 'mysql+mysqldb://{}:{}@{}/{}'.format(
+            HBNB_MYSQL_USER, HBNB_MYSQL_PWD, HBNB_MYSQL_HOST, HBNB_MYSQL_DB)
+        self.__engine = create_engine(url, **self.__engine_options(url))
+        if self.__engine.dialect.name == "sqlite":
+            # enforce the foreign keys like MySQL does
+            event.listen(self.__engine, "connect",
+                         lambda dbapi_connection, record:
+                         dbapi_connection.execute("PRAGMA foreign_keys=ON"))
+        self.__metrics = PoolMetrics()
+        self.__metrics.listen(self.__engine)
+        self.__counts = {}
+        self.__kept = {}
+        self.__kept_lock = threading.Lock()
+        self.__versions = {}
+        self.__epoch = uuid.uuid4().hex
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    @staticmethod
+    def __engine_options(url):
+        """returns the create_engine() options for url, read from
+        HBNB_MYSQL_POOL_SIZE, HBNB_MYSQL_MAX_OVERFLOW,
+        HBNB_MYSQL_POOL_TIMEOUT, HBNB_MYSQL_POOL_RECYCLE (seconds),
+        HBNB_MYSQL_PRE_PING (1 to test connections on checkout) and
+        HBNB_MYSQL_ISOLATION (such as READ COMMITTED)"""
+        options = {}
+        url = make_url(url)
+        if url.get_backend_name() == "sqlite" and \
+                url.database in (None, "", ":memory:"):
+            # an in-memory database only lives in its single connection
+            options["poolclass"] = StaticPool
+            options["connect_args"] = {"check_same_thread": False}
+        else:
+            options["poolclass"] = TimedQueuePool
+            for option, var, kind in (
+                    ("pool_size", "HBNB_MYSQL_POOL_SIZE", int),
+                    ("max_overflow", "HBNB_MYSQL_MAX_OVERFLOW", int),
+                    ("pool_timeout", "HBNB_MYSQL_POOL_TIMEOUT", float),
+                    ("pool_recycle", "HBNB_MYSQL_POOL_RECYCLE", int)):
+                if getenv(var):
+                    options[option] = kind(getenv(var))
+        if getenv("HBNB_MYSQL_PRE_PING") == "1":
+            options["pool_pre_ping"] = True
+        if getenv("HBNB_MYSQL_ISOLATION"):
+            options["isolation_level"] = getenv("HBNB_MYSQL_ISOLATION")
+        return options
+
+    def pool_metrics(self):
+        """returns the checkout, connection and wait counters of the
+        connection pool, and its size and use"""
+        return self.__metrics.to_dict(self.__engine.pool)
+
+    def all(self, cls=None, *, load=(), strategy="selectin"):
+        """query on the current database session
+
+        load lists the relationship paths of cls to load eagerly, such as
+        "cities.places", with the selectin or joined strategy.
+        """
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
-                for obj in objs:
+                query = self.__session.query(classes[clss])
+                if cls is not None:
+                    query = query.options(
+                        *self.__options(classes[clss], load, strategy))
+                for obj in query.all():
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
 
-    def get(self, cls, id):
-        """retrieves an object of a class with ID"""
+    def iter_all(self, cls=None, batch_size=None):
+        """yields the objects of cls, or of every class, without building
+        the dictionary all() returns
+
+        Rows are fetched batch_size at a time with yield_per, from a
+        server-side cursor where the driver has them.
+        """
+        for clss in classes:
+            if cls is None or cls is classes[clss] or cls == clss:
+                yield from self.__session.scalars(
+                    select(classes[clss]).execution_options(
+                        yield_per=batch_size or self.__batch_size))
+
+    def iter_filter(self, cls, **eq):
+        """yields the objects of cls whose attributes equal the values of
+        eq, fetched like iter_all() does"""
+        yield from self.__session.scalars(
+            select(cls).filter_by(**eq).execution_options(
+                yield_per=self.__batch_size))
+
+    def iter_rows(self, cls, batch_size=None, skip=0):
+        """yields the rows of the table of cls, or of a table such as
+        place_amenity, as dictionaries of their columns, in primary key
+        order and after the first skip
+
+        Each batch of batch_size rows is a query of its own, reading the
+        rows whose primary key follows the last one of the batch before,
+        so that no cursor stays open in between.
+        """
+        table = cls if isinstance(cls, Table) else cls.__table__
+        key = list(table.primary_key)
+        query = select(table).order_by(*key).limit(
+            batch_size or self.__batch_size)
+        batch = self.__session.execute(query.offset(skip)).mappings().all()
+        while batch:
+            yield from (dict(row) for row in batch)
+            last = tuple_(*key) > tuple_(*[batch[-1][column.name]
+                                           for column in key])
+            batch = self.__session.execute(
+                query.where(last)).mappings().all()
+
+    def __options(self, cls, load, strategy):
+        """returns the loader options eagerly loading the relationship
+        paths of cls in load, such as cities.places.amenities"""
+        if strategy not in ("selectin", "joined"):
+            raise ValueError("unknown strategy: {}".format(strategy))
+        options = []
+        for path in load:
+            option = None
+            owner = cls
+            for name in path.split("."):
+                relationship = getattr(owner, name)
+                if option is None:
+                    option = getattr(sqlalchemy.orm, strategy + "load")(
+                        relationship)
+                else:
+                    option = getattr(option, strategy + "load")(relationship)
+                owner = relationship.property.mapper.class_
+            options.append(option)
+        return options
+
+    def get(self, cls, id, *, load=(), strategy="selectin"):
+        """retrieves an object of a class with ID, loading the
+        relationship paths in load like all() does"""
+        if load:
+            # session.get() would apply no option to an object loaded
+            # already, a query loads its relationships still unloaded
+            return self.get_many(cls, [id], load=load, strategy=strategy)[0]
         obj = None
         if cls is not None and issubclass(cls, BaseModel):
-            obj = self.__session.query(cls).filter(cls.id == id).first()
+            # the identity map answers without a query if obj is loaded
+            obj = self.__session.get(cls, id)
         return obj
 
+    def get_many(self, cls, ids, *, load=(), strategy="selectin"):
+        """retrieves the objects of a class with the IDs in ids, in order,
+        None standing for each ID without an object
+
+        The IDs not in the identity map are fetched in a single IN query,
+        all of them when relationships are to be loaded like all() does.
+        """
+        ids = [str(id) for id in ids]
+        if cls is None or not issubclass(cls, BaseModel):
+            return [None] * len(ids)
+        objs = {}
+        for id in ids:
+            obj = self.__session.identity_map.get(identity_key(cls, id))
+            if obj is not None and not load:
+                objs[id] = obj
+        missing = set(ids) - set(objs)
+        if missing:
+            query = self.__session.query(cls).options(
+                *self.__options(cls, load, strategy))
+            for obj in query.filter(cls.id.in_(missing)):
+                objs[obj.id] = obj
+        return [objs.get(id) for id in ids]
+
+    def page(self, cls, limit, after=None, **eq):
+        """returns the first limit objects of cls, in (created_at, id)
+        order, whose attributes equal the values of eq, and that come
+        after the pair after if given
+
+        The page is read with WHERE (created_at, id) > after ... LIMIT,
+        from the index on created_at.
+        """
+        query = self.__session.query(cls).filter_by(**eq)
+        return self.__page(query, cls, limit, after).all()
+
+    @staticmethod
+    def __page(query, cls, limit, after):
+        """returns query ordered by (created_at, id), with the rows after
+        the pair after only and at most limit of them"""
+        if after is not None:
+            created_at, id = after
+            query = query.filter(or_(
+                cls.created_at > created_at,
+                and_(cls.created_at == created_at, cls.id > id)))
+        return query.order_by(cls.created_at, cls.id).limit(limit)
+
+    def search_places(self, states=None, cities=None, amenities=None,
+                      limit=None, after=None):
+        """returns the places in the cities of the states of ids states and
+        in the cities of ids cities, or every place if these select none,
+        that have all the amenities of ids amenities
+
+        The selection and the amenities are compiled into one query, the
+        amenities as a GROUP BY place HAVING as many rows as ids. A limit
+        or after returns one page of them, as page() does.
+        """
+        query = self.__session.query(Place)
+        if amenities:
+            place_amenity = Base.metadata.tables["place_amenity"]
+            ids = set(str(id) for id in amenities)
+            query = query.filter(Place.id.in_(
+                select(place_amenity.c.place_id)
+                .where(place_amenity.c.amenity_id.in_(ids))
+                .group_by(place_amenity.c.place_id)
+                .having(func.count(place_amenity.c.amenity_id) == len(ids))))
+        paged = query
+        if limit is not None or after is not None:
+            paged = self.__page(query, Place, limit, after)
+        if not states and not cities:
+            return paged.all()
+        selected = (Place.city_id.in_(
+            select(City.id).where(City.state_id.in_(states or ()))) |
+            Place.city_id.in_(cities or ()))
+        if paged is query:
+            places = query.filter(selected).all()
+        else:
+            places = self.__page(query.filter(selected), Place, limit,
+                                 after).all()
+        if not places and amenities and self.__session.query(
+                Place.id).filter(selected).first() is None:
+            # as before, a selection without places falls back to all
+            return paged.all()
+        return places
+
+    def version(self, cls):
+        """returns a tag that changes whenever an object of cls is added,
+        changed or deleted, and the datetime of the last change: the
+        commits of this storage are counted, those of others seen from the
+        number of rows and their latest updated_at, read in one query.
+        The rows others delete leave no date behind."""
+        if isinstance(cls, str):
+            cls = classes[cls]
+        count, latest = self.__session.execute(
+            select(func.count(), func.max(cls.updated_at))
+            .select_from(cls)).one()
+        with self.__kept_lock:
+            changes, changed = self.__versions.get(cls.__name__, (0, None))
+        dates = [date for date in (latest, changed) if date is not None]
+        return "{}-{}-{}-{}".format(
+            self.__epoch, changes, count,
+            latest and latest.isoformat()), max(dates, default=None)
+
     def count(self, cls=None):
-        """retrieves the number of objects of a class"""
-        return len(self.all(cls))
+        """retrieves the number of objects of a class, or of all classes"""
+        names = [clss for clss in classes
+                 if cls is None or cls is classes[clss] or cls == clss]
+        return sum(self.__count(names).values())
+
+    def counts(self):
+        """returns {class name: number of objects} for every class"""
+        return self.__count(list(classes))
+
+    def check_counts(self, repair=True):
+        """recounts the rows of every class, and returns {class name:
+        (count kept, count found)} for the classes whose kept count drifted
+        from the table, such as when another process wrote to it; the
+        counts kept are replaced by those found, unless repair is False"""
+        found = self.__exact(list(classes))
+        if self.__count_mode == "maintained":
+            with self.__kept_lock:
+                kept = dict(self.__kept)
+            pending = self.__session.info.get("counted", {})
+            kept = {name: number + pending.get(name, 0)
+                    for name, number in kept.items()}
+        elif self.__count_mode != "exact":
+            kept = {name: cached[0]
+                    for name, cached in self.__counts.items()}
+        else:
+            kept = {}
+        if repair:
+            self.__keep(found)
+        return {name: (kept[name], number) for name, number in found.items()
+                if kept.get(name, number) != number}
+
+    def __count(self, names):
+        """returns {class name: number of rows} for names, counted in a
+        single round trip"""
+        now = time.monotonic()
+        counts = {}
+        if self.__count_mode == "maintained":
+            pending = self.__session.info.get("counted", {})
+            with self.__kept_lock:
+                kept = {name: self.__kept[name] for name in names
+                        if name in self.__kept}
+            missing = [name for name in names if name not in kept]
+            if missing:
+                kept.update(self.__keep(self.__exact(missing)))
+            # with the rows flushed but not committed yet
+            return {name: number + pending.get(name, 0)
+                    for name, number in kept.items()}
+        if self.__count_mode == "cached":
+            for name in names:
+                cached = self.__counts.get(name)
+                if cached is not None and now - cached[1] < self.__count_ttl:
+                    counts[name] = cached[0]
+        missing = [name for name in names if name not in counts]
+        if not missing:
+            return counts
+        if self.__count_mode == "estimate" and \
+                self.__engine.dialect.name == "mysql":
+            tables = {classes[name].__tablename__: name for name in missing}
+            query = text("SELECT TABLE_NAME, TABLE_ROWS "
+                         "FROM information_schema.TABLES "
+                         "WHERE TABLE_SCHEMA = DATABASE() "
+                         "AND TABLE_NAME IN :tables").bindparams(
+                bindparam("tables", expanding=True))
+            rows = self.__session.execute(query, {"tables": list(tables)})
+            for table, number in rows:
+                counts[tables[table]] = int(number or 0)
+        else:
+            counts.update(self.__exact(missing))
+        for name in missing:
+            counts.setdefault(name, 0)
+            self.__counts[name] = (counts[name], now)
+        return counts
+
+    def __exact(self, names):
+        """returns {class name: number of rows} for names, counted in a
+        single round trip"""
+        query = select(*[select(func.count()).select_from(classes[name])
+                         .scalar_subquery() for name in names])
+        return dict(zip(names, self.__session.execute(query).one()))
+
+    def __keep(self, counts):
+        """keeps counts, counted in the current session, as the rows
+        committed, or as the cached counts, and returns them"""
+        if self.__count_mode != "maintained":
+            now = time.monotonic()
+            self.__counts.update((name, (number, now))
+                                 for name, number in counts.items())
+            return counts
+        pending = self.__session.info.get("counted", {})
+        counts = {name: number - pending.get(name, 0)
+                  for name, number in counts.items()}
+        with self.__kept_lock:
+            self.__kept.update(counts)
+        return counts
+
+    def __flushed(self, session, context):
+        """adds the classes of the objects a flush wrote to the changes of
+        the session, and in maintained mode the rows it inserted and
+        deleted to its counts, kept until it commits"""
+        changed = session.info.setdefault("changed", set())
+        changed.update(obj.__class__.__name__ for objs in (
+            session.new, session.dirty, session.deleted) for obj in objs)
+        if self.__count_mode != "maintained":
+            return
+        counted = session.info.setdefault("counted", {})
+        for objs, sign in ((session.new, 1), (session.deleted, -1)):
+            for obj in objs:
+                name = obj.__class__.__name__
+                if name in classes:
+                    counted[name] = counted.get(name, 0) + sign
+
+    def __committed(self, session):
+        """adds the counts of the session to the rows committed, and
+        changes the versions of the classes it wrote"""
+        counted = session.info.pop("counted", {})
+        changed = session.info.pop("changed", ())
+        now = datetime.utcnow()
+        with self.__kept_lock:
+            for name in changed:
+                changes = self.__versions.get(name, (0, None))[0]
+                self.__versions[name] = (changes + 1, now)
+            for name, number in counted.items():
+                if name in self.__kept:
+                    self.__kept[name] += number
+
+    @staticmethod
+    def __rolled_back(session):
+        """drops the counts and changes of the session"""
+        session.info.pop("counted", None)
+        session.info.pop("changed", None)
 
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
+        self.__counts.pop(obj.__class__.__name__, None)
+
+    def new_many(self, objs):
+        """add the objects to the current database session, inserted in
+        batches of many rows by the next commit"""
+        objs = list(objs)
+        self.__session.add_all(objs)
+        for name in {obj.__class__.__name__ for obj in objs}:
+            self.__counts.pop(name, None)
+
+    def bulk_save(self, cls, rows, chunk_size=None):
+        """inserts rows, dictionaries of the attributes of objects of cls,
+        with Core INSERT statements sent chunk_size rows at a time, then
+        commits; returns {"rows", "seconds", "rows_per_second"}
+
+        cls may also be a table, such as place_amenity. No object is built:
+        values are stored as given, only the id and the timestamps rows
+        lack are generated, the id being set in the row itself.
+        """
+        return self.__bulk(cls, rows, chunk_size, False)
+
+    def bulk_upsert(self, cls, rows, chunk_size=None):
+        """inserts rows like bulk_save, but updates the rows whose primary
+        key exists already instead"""
+        return self.__bulk(cls, rows, chunk_size, True)
+
+    def __bulk(self, cls, rows, chunk_size, upsert):
+        """sends rows to the table of cls in chunks, see bulk_save"""
+        start = time.perf_counter()
+        table = cls if isinstance(cls, Table) else cls.__table__
+        statement = self.__upsert(table) if upsert else insert(table)
+        columns = [(column.name, column.default.arg
+                    if column.default is not None and
+                    column.default.is_scalar else None,
+                    isinstance(column.type, DateTime))
+                   for column in table.columns]
+        generated = "id" in table.columns
+        rows = iter(rows)
+        total = 0
+        while True:
+            chunk = list(islice(rows, chunk_size or self.__bulk_chunk))
+            if not chunk:
+                break
+            now = datetime.utcnow()
+            values = []
+            for row in chunk:
+                if generated and row.get("id") is None:
+                    row["id"] = str(uuid.uuid4())
+                value = {}
+                for name, default, date in columns:
+                    item = row.get(name, default)
+                    if date:
+                        if item is None:
+                            item = now
+                        elif isinstance(item, str):
+                            item = datetime.fromisoformat(item)
+                    value[name] = item
+                values.append(value)
+            self.__session.execute(statement, values)
+            total += len(values)
+        name = getattr(cls, "__name__", None)
+        if name in classes:
+            if upsert:
+                # inserted and updated rows are not told apart
+                with self.__kept_lock:
+                    self.__kept.pop(name, None)
+            else:
+                counted = self.__session.info.setdefault("counted", {})
+                counted[name] = counted.get(name, 0) + total
+            self.__counts.pop(name, None)
+        # the flush events do not see rows written by statements
+        changed = self.__session.info.setdefault("changed", set())
+        changed.update([name] if name in classes else
+                       [clss for clss in classes
+                        if any(key.references(classes[clss].__table__)
+                               for key in table.foreign_keys)])
+        self.__session.commit()
+        if upsert:
+            self.__session.expire_all()
+        seconds = time.perf_counter() - start
+        return {"rows": total, "seconds": seconds,
+                "rows_per_second": total / seconds if seconds else 0.0}
+
+    def __upsert(self, table):
+        """returns the INSERT of rows into table that updates the rows
+        whose primary key exists instead, but for their created_at, in the
+        SQL of the database"""
+        dialect = self.__engine.dialect.name
+        others = [column.name for column in table.columns
+                  if not column.primary_key and column.name != "created_at"]
+        if dialect in ("sqlite", "postgresql"):
+            module = sqlite if dialect == "sqlite" else postgresql
+            statement = module.insert(table)
+            if not others:
+                return statement.on_conflict_do_nothing()
+            return statement.on_conflict_do_update(
+                index_elements=[column.name for column in table.primary_key],
+                set_={name: statement.excluded[name] for name in others})
+        if dialect in ("mysql", "mariadb"):
+            statement = mysql.insert(table)
+            if not others:
+                return statement.prefix_with("IGNORE")
+            return statement.on_duplicate_key_update(
+                {name: statement.inserted[name] for name in others})
+        raise NotImplementedError("no upsert for " + dialect)
 
     def save(self):
         """commit all changes of the current database session"""
@@ -74,11 +564,15 @@ class DBStorage:
         """delete from the current database session obj if not None"""
         if obj is not None:
             self.__session.delete(obj)
+            self.__counts.pop(obj.__class__.__name__, None)
 
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        event.listen(sess_factory, "after_flush", self.__flushed)
+        event.listen(sess_factory, "after_commit", self.__committed)
+        event.listen(sess_factory, "after_rollback", self.__rolled_back)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
@@ -3,14 +3,26 @@
 Contains the FileStorage class
 """
 
-import json
+from bisect import bisect_right
+from datetime import datetime
+import heapq
+from itertools import chain
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
+from models.engine.bitmap import BitmapIndex
+from models.engine.journal import Journal
+from models.engine.snapshot import formats
+from models.engine.writer import atomic_write, GroupCommit
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from os import getenv
+import os
+import threading
+import time
+import uuid
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -19,69 +31,666 @@ classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
 class FileStorage:
     """serializes instances to a JSON file & deserializes back to instances"""
 
-    # string - path to the JSON file
-    __file_path = "file.json"
+    # snapshot format, HBNB_FILE_FORMAT is json (default) or binary
+    __format = formats[getenv("HBNB_FILE_FORMAT", "json")]
+    # string - path to the JSON file (file.bin in binary format)
+    __file_path = "file" + __format.extension
+    # boolean - one file per class (HBNB_FILE_LAYOUT=sharded), such as
+    # file.State.json, instead of __file_path
+    __sharded = getenv("HBNB_FILE_LAYOUT") == "sharded"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - <class name> -> {<class name>.id: obj}, mirrors __objects
+    __by_class = {}
+    # foreign keys kept in a reverse index, by class name
+    __foreign_keys = {"City": ("state_id",),
+                      "Place": ("city_id", "user_id"),
+                      "Review": ("place_id", "user_id")}
+    # dictionary - (<class name>, fk) -> {fk value: {<class name>.id: obj}}
+    __by_ref = {}
+    # lists of ids kept in a bitmap index, by class name
+    __id_lists = {"Place": ("amenity_ids",)}
+    # dictionary - (<class name>, attribute) -> BitmapIndex of the ids
+    __by_bits = {}
+    # dictionary - <class name> -> its objects sorted by (created_at, id),
+    # dropped when an object comes out of order and sorted again by page()
+    __ordered = {}
+    # dictionary - <class name> -> (changes, datetime of the last change),
+    # the changes counted since __epoch, which differs between processes
+    __versions = {}
+    __epoch = uuid.uuid4().hex
+    # dictionary - path -> (mtime, size) of the file when last read or
+    # written, so that reading it again unchanged counts no change
+    __stamps = {}
+    # the __objects dictionary the indexes were built from
+    __indexed = None
+    # dictionary - <class name>.id -> obj, or None if deleted, since save()
+    __pending = {}
+    # Journal - append-only log of changes, when HBNB_FILE_JOURNAL is 1
+    __journal = None
+    if getenv("HBNB_FILE_JOURNAL") == "1":
+        __journal = Journal(__file_path + ".log")
+    # integer - journal records that trigger a compaction into a snapshot
+    __journal_max = int(getenv("HBNB_FILE_JOURNAL_MAX", "1000"))
+    # GroupCommit - saves within HBNB_FILE_COMMIT_WINDOW seconds share a write
+    __group = GroupCommit(float(getenv("HBNB_FILE_COMMIT_WINDOW", "0")))
+    # lock held while the JSON file or the journal is read or written
+    __lock = threading.RLock()
+    # boolean - only build objects when first accessed (HBNB_FILE_LAZY=1)
+    __lazy = getenv("HBNB_FILE_LAZY") == "1"
+    # dictionary - <class name> -> {<class name>.id: dict} not built yet
+    __raw = {}
+    # set - names of the classes reload() marked to be read on access
+    __stale = set()
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    def __sync(self):
+        """rebuilds the indexes if __objects was replaced wholesale"""
+        if FileStorage.__indexed is not FileStorage.__objects:
+            FileStorage.__by_class = {}
+            FileStorage.__by_ref = {}
+            FileStorage.__by_bits = {}
+            FileStorage.__ordered = {}
+            FileStorage.__indexed = FileStorage.__objects
+            for key, obj in FileStorage.__objects.items():
+                self.__index(key, obj)
+            for name in classes:
+                self.__touch(name)
+
+    def __touch(self, name):
+        """counts a change to the objects of class name"""
+        changes = FileStorage.__versions.get(name, (0, None))[0]
+        FileStorage.__versions[name] = (changes + 1, datetime.utcnow())
+
+    def __index(self, key, obj):
+        """adds obj to the class index and to its foreign key indexes"""
+        name = obj.__class__.__name__
+        FileStorage.__by_class.setdefault(name, {})[key] = obj
+        for fk in self.__foreign_keys.get(name, ()):
+            self.__link(name, fk, getattr(obj, fk, None), key, obj)
+        for attr in self.__id_lists.get(name, ()):
+            self.__bits(name, attr).update(key, obj, (),
+                                           getattr(obj, attr, None) or ())
+        order = FileStorage.__ordered.get(name)
+        if order is not None:
+            if not order or self.__when(order[-1]) < self.__when(obj):
+                order.append(obj)
+            else:
+                del FileStorage.__ordered[name]
+
+    def __unindex(self, key, obj):
+        """removes obj from the class index and its foreign key indexes"""
+        name = obj.__class__.__name__
+        FileStorage.__by_class.get(name, {}).pop(key, None)
+        for fk in self.__foreign_keys.get(name, ()):
+            self.__unlink(name, fk, getattr(obj, fk, None), key)
+        for attr in self.__id_lists.get(name, ()):
+            self.__bits(name, attr).remove(key,
+                                           getattr(obj, attr, None) or ())
+        order = FileStorage.__ordered.get(name)
+        if order is not None:
+            i = bisect_right(order, self.__when(obj), key=self.__when) - 1
+            if i >= 0 and order[i] is obj:
+                del order[i]
+            else:
+                del FileStorage.__ordered[name]
+
+    @staticmethod
+    def __when(obj):
+        """returns the (created_at, id) pair pages are ordered by"""
+        return (obj.created_at, obj.id)
+
+    def __bits(self, name, attr):
+        """returns the BitmapIndex of the list of ids attr of class name"""
+        index = FileStorage.__by_bits.get((name, attr))
+        if index is None:
+            index = FileStorage.__by_bits[(name, attr)] = BitmapIndex()
+        return index
+
+    def __link(self, name, fk, value, key, obj):
+        """records that obj (stored under key) has fk == value"""
+        if value is not None:
+            refs = FileStorage.__by_ref.setdefault((name, fk), {})
+            refs.setdefault(value, {})[key] = obj
+
+    def __unlink(self, name, fk, value, key):
+        """forgets that the object stored under key has fk == value"""
+        refs = FileStorage.__by_ref.get((name, fk), {})
+        bucket = refs.get(value)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del refs[value]
+
+    def __add(self, key, obj, changed=True):
+        """stores obj under key in __objects and in the indexes, counting
+        a change to its class unless changed is False"""
+        self.__sync()
+        old = FileStorage.__objects.get(key)
+        if old is obj:
+            # changed() kept the indexes of obj up to date
+            return
+        if old is not None:
+            self.__unindex(key, old)
+        FileStorage.__objects[key] = obj
+        self.__index(key, obj)
+        if changed:
+            self.__touch(obj.__class__.__name__)
+
+    def __remove(self, key, changed=True):
+        """drops key from __objects and from the indexes, counting a change
+        to its class unless changed is False"""
+        self.__sync()
+        obj = FileStorage.__objects.pop(key, None)
+        if obj is not None:
+            self.__unindex(key, obj)
+            if changed:
+                self.__touch(obj.__class__.__name__)
+        return obj
+
+    def __build(self, record):
+        """returns the object persisted as record, unchanged since"""
+        obj = classes[record["__class__"]](**record)
+        obj.set_record(record)
+        return obj
+
+    def __names(self, cls):
+        """returns the class names of cls: None, a class, a name or a list"""
+        if cls is None:
+            return set(classes)
+        if isinstance(cls, (list, tuple, set)):
+            return set().union(*[self.__names(c) for c in cls])
+        if not isinstance(cls, str):
+            cls = getattr(cls, "__name__", None)
+        return {cls}
+
+    def __shard(self, name):
+        """returns the path of the file of class name, sharded layout"""
+        root, ext = os.path.splitext(self.__file_path)
+        return "{}.{}{}".format(root, name, ext)
+
+    def __load(self, names=None):
+        """reads the stale records of the classes in names into __raw"""
+        if not FileStorage.__stale:
+            return
+        with self.__lock:
+            stale = FileStorage.__stale
+            names = stale if names is None else stale & names
+            if not names:
+                return
+            FileStorage.__stale = stale - names
+            if any(FileStorage.__stamps.get(path) != self.__stamp(path)
+                   for path in self.__paths(names)):
+                # the classes read before are as outdated, and would be
+                # taken for unchanged once the new stamps are recorded
+                for name in set(classes) - stale:
+                    self.__touch(name)
+                FileStorage.__stale = set(classes) - names
+            unchanged = self.__unchanged(names)
+            for name in names - unchanged:
+                self.__touch(name)
+            for key, value in self.__read(names):
+                # the record on disk replaces the object built before
+                name = key.partition(".")[0]
+                self.__remove(key, name not in unchanged)
+                records = FileStorage.__raw.setdefault(name, {})
+                if value is None:
+                    records.pop(key, None)
+                else:
+                    records[key] = value
+
+    def __realize(self, name=None, key=None):
+        """builds the object of key, of class name or of every class"""
+        self.__load(None if name is None else {name})
+        if not FileStorage.__raw:
+            return
+        with self.__lock:
+            if key is not None:
+                value = FileStorage.__raw.get(name, {}).pop(key, None)
+                records = {key: value} if value is not None else {}
+            elif name is not None:
+                records = FileStorage.__raw.pop(name, {})
+            else:
+                records = {}
+                for name in list(FileStorage.__raw):
+                    records.update(FileStorage.__raw.pop(name))
+            for key, value in records.items():
+                # __load counted the change if the record is new
+                self.__add(key, self.__build(value), False)
+
+    def __forget(self, key):
+        """drops the record of key from __raw, it is superseded"""
+        name = key.partition(".")[0]
+        self.__load({name})
+        FileStorage.__raw.get(name, {}).pop(key, None)
+
+    def all(self, cls=None, *, load=(), strategy="selectin"):
+        """returns the dictionary __objects
+
+        load and strategy are accepted like DBStorage does: relationships
+        are read from the indexes and never need loading here.
+        """
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            if not isinstance(cls, str):
+                cls = getattr(cls, "__name__", None)
+            self.__realize(cls)
+            return dict(self.__by_class.get(cls, {}))
+        self.__realize()
         return self.__objects
 
-    def get(self, cls, id):
+    def get(self, cls, id, *, load=(), strategy="selectin"):
         """retrieves an object of a class with ID"""
-        if cls is not None:
-            result = list(
-                filter(
-                    lambda x: type(x) is cls and x.id == id,
-                    self.__objects.values()
-                )
-            )
-            if result:
-                return result[0]
+        if isinstance(cls, type):
+            key = cls.__name__ + "." + str(id)
+            self.__realize(cls.__name__, key)
+            obj = self.__objects.get(key)
+            if type(obj) is cls:
+                return obj
         return None
 
+    def get_many(self, cls, ids, *, load=(), strategy="selectin"):
+        """retrieves the objects of a class with the IDs in ids, in order,
+        None standing for each ID without an object"""
+        return [self.get(cls, id) for id in ids]
+
     def count(self, cls=None):
         """retrieves the number of objects of a class"""
-        return len(self.all(cls))
+        self.__load(self.__names(cls))
+        if cls is not None:
+            self.__sync()
+            if not isinstance(cls, str):
+                cls = getattr(cls, "__name__", None)
+            return (len(self.__by_class.get(cls, {})) +
+                    len(self.__raw.get(cls, {})))
+        return len(self.__objects) + sum(map(len, self.__raw.values()))
+
+    def counts(self):
+        """returns {class name: number of objects} for every class, the
+        sizes of the class index kept by new, delete and reload"""
+        self.__load(set(classes))
+        self.__sync()
+        return {name: (len(self.__by_class.get(name, {})) +
+                       len(self.__raw.get(name, {}))) for name in classes}
+
+    def check_counts(self, repair=True):
+        """recounts the objects of every class, and returns {class name:
+        (count kept, count found)} for the classes whose index drifted
+        from __objects, such as when it was written to directly; the
+        indexes are then built again, unless repair is False"""
+        kept = self.counts()
+        found = dict.fromkeys(classes, 0)
+        for key in chain(FileStorage.__objects, *self.__raw.values()):
+            name = key.partition(".")[0]
+            found[name] = found.get(name, 0) + 1
+        drift = {name: (kept.get(name, 0), number)
+                 for name, number in found.items()
+                 if kept.get(name, 0) != number}
+        if drift and repair:
+            FileStorage.__indexed = None
+            self.__sync()
+        return drift
+
+    def related(self, cls, fk, value):
+        """returns the objects of cls whose attribute fk equals value, or
+        contains it for a list of ids"""
+        if not isinstance(cls, str):
+            cls = getattr(cls, "__name__", None)
+        if fk in self.__id_lists.get(cls, ()):
+            self.__realize(cls)
+            self.__sync()
+            return list(self.__bits(cls, fk).find((value,)).values())
+        if fk not in self.__foreign_keys.get(cls, ()):
+            return [obj for obj in self.all(cls).values()
+                    if getattr(obj, fk, None) == value]
+        self.__realize(cls)
+        self.__sync()
+        return list(self.__by_ref.get((cls, fk), {}).get(value, {}).values())
+
+    def page(self, cls, limit, after=None, **eq):
+        """returns the first limit objects of cls, in (created_at, id)
+        order, whose attributes equal the values of eq, and that come
+        after the pair after if given
+
+        Without eq, the page is a slice of the objects of cls kept sorted;
+        otherwise the objects of the foreign key index, or of cls, are
+        filtered keeping only the limit first ones.
+        """
+        if not isinstance(cls, str):
+            cls = getattr(cls, "__name__", None)
+        self.__realize(cls)
+        self.__sync()
+        if eq:
+            return self.__first(self.__candidates(cls, eq), limit, after, eq)
+        order = FileStorage.__ordered.get(cls)
+        if order is None:
+            order = sorted(self.__by_class.get(cls, {}).values(),
+                           key=self.__when)
+            FileStorage.__ordered[cls] = order
+        start = 0
+        if after is not None:
+            start = bisect_right(order, tuple(after), key=self.__when)
+        return order[start:start + limit]
+
+    def __candidates(self, name, eq):
+        """returns the objects of class name that may have attributes equal
+        to eq: those of a foreign key bucket if eq holds a foreign key"""
+        for fk in self.__foreign_keys.get(name, ()):
+            if fk in eq:
+                refs = self.__by_ref.get((name, fk), {})
+                return refs.get(eq[fk], {}).values()
+        return self.__by_class.get(name, {}).values()
+
+    def iter_all(self, cls=None, batch_size=1000):
+        """yields the objects of cls, a class or a class name, or of every
+        class, without building the dictionary all() returns
+
+        The objects of each class are read from a copy of the references
+        of its index, so that the storage may change meanwhile;
+        batch_size is accepted like DBStorage does.
+        """
+        for name in classes:
+            if name in self.__names(cls):
+                self.__realize(name)
+                self.__sync()
+                yield from list(self.__by_class.get(name, {}).values())
+
+    def iter_filter(self, cls, **eq):
+        """yields the objects of cls whose attributes equal the values of
+        eq, reading a single foreign key bucket if eq holds a foreign key"""
+        if not isinstance(cls, str):
+            cls = getattr(cls, "__name__", None)
+        self.__realize(cls)
+        self.__sync()
+        for obj in list(self.__candidates(cls, eq)):
+            if all(getattr(obj, attr, None) == value
+                   for attr, value in eq.items()):
+                yield obj
+
+    def __first(self, objs, limit, after=None, eq=None):
+        """returns the limit first of objs in (created_at, id) order, after
+        the pair after if given, with their attributes equal to eq"""
+        if after is not None:
+            after = tuple(after)
+            objs = (obj for obj in objs if self.__when(obj) > after)
+        if eq:
+            objs = (obj for obj in objs
+                    if all(getattr(obj, attr, None) == value
+                           for attr, value in eq.items()))
+        if limit is None:
+            return sorted(objs, key=self.__when)
+        return heapq.nsmallest(limit, objs, key=self.__when)
+
+    def search_places(self, states=None, cities=None, amenities=None,
+                      limit=None, after=None):
+        """returns the places in the cities of the states of ids states and
+        in the cities of ids cities, or every place if these select none,
+        that have all the amenities of ids amenities
+
+        Places are gathered through the city index, then intersected with
+        the AND of the bitmaps of the amenities, without scanning every
+        place or its amenity list. A limit or after returns one page of
+        them, as page() does.
+        """
+        places = {}
+        city_ids = []
+        for state in self.get_many(State, states or ()):
+            if state is not None:
+                city_ids.extend(city.id for city in state.cities)
+        city_ids.extend(id for id in cities or () if self.get(City, id))
+        self.__realize("Place")
+        self.__sync()
+        by_city = self.__by_ref.get(("Place", "city_id"), {})
+        for city_id in city_ids:
+            places.update(by_city.get(city_id, {}))
+        if amenities:
+            if None in self.get_many(Amenity, amenities):
+                return []
+            # one bitmap AND across the amenities
+            matching = self.__bits("Place", "amenity_ids").find(amenities)
+            if not places:
+                # as before, a selection without places falls back to all
+                places = matching
+            else:
+                places = {key: obj for key, obj in places.items()
+                          if key in matching}
+        elif not states and not cities:
+            places = self.__by_class.get("Place", {})
+        if limit is None and after is None:
+            return list(places.values())
+        return self.__first(places.values(), limit, after)
+
+    def version(self, cls):
+        """returns a tag that changes whenever an object of cls is added,
+        changed or deleted, and the datetime of the last such change"""
+        if not isinstance(cls, str):
+            cls = getattr(cls, "__name__", None)
+        self.__load({cls})
+        self.__sync()
+        changes, modified = FileStorage.__versions.get(cls, (0, None))
+        return "{}-{}".format(self.__epoch, changes), modified
+
+    def changed(self, obj, attr, old):
+        """records that obj.attr was reassigned and updates the indexes"""
+        name = obj.__class__.__name__
+        key = name + "." + str(getattr(obj, "id", None))
+        if FileStorage.__objects.get(key) is not obj:
+            return
+        FileStorage.__pending[key] = obj
+        self.__touch(name)
+        if attr in self.__foreign_keys.get(name, ()):
+            self.__sync()
+            self.__unlink(name, attr, old, key)
+            self.__link(name, attr, getattr(obj, attr, None), key, obj)
+        elif attr in self.__id_lists.get(name, ()):
+            self.__sync()
+            self.__bits(name, attr).update(key, obj, old or (),
+                                           getattr(obj, attr, None) or ())
+        elif attr == "created_at":
+            FileStorage.__ordered.pop(name, None)
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            self.__forget(key)
+            self.__add(key, obj)
+            FileStorage.__pending[key] = obj
+
+    def new_many(self, objs):
+        """sets in __objects each of objs, as new() does"""
+        for obj in objs:
+            self.new(obj)
+
+    def bulk_save(self, cls, rows, chunk_size=None):
+        """builds an object of cls from each of rows, dictionaries of its
+        attributes, and saves them all at once; returns {"rows",
+        "seconds", "rows_per_second"} like DBStorage.bulk_save, and sets
+        in each row the id of its object
+
+        chunk_size is accepted like DBStorage does: the objects are
+        written to the file in a single save.
+        """
+        start = time.perf_counter()
+        if isinstance(cls, str):
+            cls = classes[cls]
+        objs = []
+        for row in rows:
+            obj = cls(**row)
+            row["id"] = obj.id
+            objs.append(obj)
+        self.new_many(objs)
+        self.save()
+        seconds = time.perf_counter() - start
+        return {"rows": len(objs), "seconds": seconds,
+                "rows_per_second": len(objs) / seconds if seconds else 0.0}
+
+    def bulk_upsert(self, cls, rows, chunk_size=None):
+        """saves rows like bulk_save: the objects replace those with their
+        ids"""
+        return self.bulk_save(cls, rows, chunk_size)
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
-
-    def reload(self):
-        """deserializes the JSON file to __objects"""
+        """serializes __objects to the JSON file (path: __file_path)
+
+        With a journal, only the objects changed since the last save are
+        appended to it, and the snapshot is rewritten by compact() once
+        the journal holds __journal_max records. Concurrent saves are
+        grouped into a single write by __group.
+        """
+        self.__group.commit(self.__flush)
+
+    def __flush(self):
+        """writes the pending changes, called once per group of saves"""
+        with self.__lock:
+            if self.__journal is None:
+                names = None
+                if self.__sharded:
+                    names = {key.partition(".")[0] for key in self.__pending}
+                self.__write(names)
+                return
+            pending = FileStorage.__pending
+            FileStorage.__pending = {}
+            self.__journal.append(
+                (key, obj.to_record() if obj is not None else None)
+                for key, obj in pending.items())
+            self.__stamped(self.__journal.path)
+            if self.__journal.records >= self.__journal_max:
+                self.compact()
+
+    def compact(self):
+        """writes every object to the snapshot and empties the journal"""
+        with self.__lock:
+            self.__write()
+            if self.__journal is not None:
+                self.__journal.truncate()
+                self.__stamped(self.__journal.path)
+
+    def __write(self, names=None):
+        """writes the snapshot, or the shards of names when sharded"""
+        with self.__lock:
+            FileStorage.__pending = {}
+            if not self.__sharded:
+                self.__load()
+                self.__dump(self.__file_path, None)
+                return
+            names = set(classes) if names is None else names
+            self.__load(names)
+            self.__sync()
+            for name in sorted(names):
+                self.__dump(self.__shard(name), name)
+
+    def __dump(self, path, name):
+        """atomically writes the objects of class name (all if None)"""
+        if name is None:
+            raw = [(key, value) for records in self.__raw.values()
+                   for key, value in records.items()]
+            objects = list(self.__objects.items())
+        else:
+            raw = list(self.__raw.get(name, {}).items())
+            objects = list(self.__by_class.get(name, {}).items())
+        records = chain(raw, ((key, obj.to_record()) for key, obj in objects))
+        atomic_write(path, lambda f: self.__format.dump(records, f),
+                     'w' + self.__format.mode)
+        self.__stamped(path)
+
+    def __paths(self, names):
+        """returns the paths of the files of the classes in names"""
+        if self.__sharded:
+            paths = [self.__shard(name) for name in sorted(names)]
+        else:
+            paths = [self.__file_path]
+        if self.__journal is not None:
+            paths.append(self.__journal.path)
+        return paths
+
+    @staticmethod
+    def __stamp(path):
+        """returns the (mtime, size) of the file at path, None if none"""
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
+            stat = os.stat(path)
         except FileNotFoundError:
-            pass
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def __stamped(self, *paths):
+        """records that the files at paths hold what memory does"""
+        for path in paths:
+            FileStorage.__stamps[path] = self.__stamp(path)
+
+    def __unchanged(self, names, reading=True):
+        """returns the classes of names that their files, about to be
+        read unless reading is False, hold as they are in memory: the
+        files are as last read or written, and the classes have no unsaved
+        changes"""
+        paths = self.__paths(names)
+        stamps = {path: self.__stamp(path) for path in paths}
+        same = all(FileStorage.__stamps.get(path) == stamp
+                   for path, stamp in stamps.items())
+        if reading:
+            FileStorage.__stamps.update(stamps)
+        if not same:
+            return set()
+        return set(names) - {key.partition(".")[0]
+                             for key in FileStorage.__pending}
+
+    def __read(self, names):
+        """yields the records of the classes in names, journal last"""
+        if self.__sharded:
+            paths = [self.__shard(name) for name in sorted(names)]
+        else:
+            paths = [self.__file_path]
+        for path in paths:
+            try:
+                with open(path, 'r' + self.__format.mode) as f:
+                    for key, value in self.__format.load(f):
+                        if key.partition(".")[0] in names:
+                            yield key, value
+            except FileNotFoundError:
+                pass
+        if self.__journal is not None:
+            for key, value in self.__journal.replay():
+                if key.partition(".")[0] in names:
+                    yield key, value
+
+    def reload(self, cls=None):
+        """deserializes the JSON file, then the journal, to __objects
+
+        cls limits the reload to a class, a class name or a list of them;
+        in a sharded layout only their files are read. With
+        HBNB_FILE_LAZY=1 the files are only read on the first access to
+        each class, and each object is only built from its record the
+        first time it is looked up.
+        """
+        names = self.__names(cls)
+        if self.__lazy:
+            FileStorage.__stale = FileStorage.__stale | names
+            return
+        with self.__lock:
+            # objects replaced by the records they were saved as keep the
+            # versions of their classes
+            unchanged = self.__unchanged(names)
+            for key, value in self.__read(names):
+                changed = key.partition(".")[0] not in unchanged
+                if value is None:
+                    self.__remove(key, changed)
+                else:
+                    self.__add(key, self.__build(value), changed)
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            self.__forget(key)
+            if self.__remove(key) is not None:
+                FileStorage.__pending[key] = None
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """call reload() method for deserializing the JSON file to objects,
+        unless __objects holds what the files do already of the classes
+        read: they are as last read or written, and no change is left
+        unsaved"""
+        with self.__lock:
+            names = set(classes) - FileStorage.__stale
+            if FileStorage.__indexed is FileStorage.__objects and \
+                    self.__unchanged(names, False) == names:
+                return
+            self.reload()
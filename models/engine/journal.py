@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Contains the Journal class
+"""
+
+import json
+from models.engine.snapshot import iso
+import os
+
+
+class Journal:
+    """append-only log of the objects FileStorage created, updated or deleted
+
+    Each line is a compact JSON array [<class name>.id, dict], where dict
+    is the to_dict() of the object, or null when the object was deleted.
+    """
+
+    def __init__(self, path):
+        """Initialization of a journal stored at path"""
+        self.path = path
+        self.records = 0
+
+    def append(self, records):
+        """appends the (key, dict or None) pairs of records to the log"""
+        # the records read from a binary snapshot hold datetimes
+        lines = [json.dumps([key, value], separators=(',', ':'),
+                            default=iso) + "\n"
+                 for key, value in records]
+        if lines:
+            with open(self.path, 'a') as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            self.records += len(lines)
+
+    def replay(self):
+        """yields the (key, dict or None) pairs of the log in order
+
+        A torn record left at the tail by a crash is cut off the log so
+        that the next append starts on a clean line.
+        """
+        self.records = 0
+        offset = 0
+        try:
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    record = None
+                    if line.endswith(b"\n"):
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            pass
+                    if record is None:
+                        f.close()
+                        with open(self.path, 'r+b') as torn:
+                            torn.truncate(offset)
+                        break
+                    offset += len(line)
+                    self.records += 1
+                    yield record[0], record[1]
+        except FileNotFoundError:
+            pass
+
+    def truncate(self):
+        """empties the log once its records are part of a snapshot"""
+        with open(self.path, 'w'):
+            pass
+        self.records = 0
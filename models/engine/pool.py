@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+Contains the PoolMetrics and TimedQueuePool classes
+"""
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+import threading
+import time
+
+
+class PoolMetrics:
+    """counts what happens in the connection pool of an engine, and the
+    statements the engine runs"""
+
+    def __init__(self):
+        """Initialization of the counters"""
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.statements = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.__lock = threading.Lock()
+
+    def listen(self, engine):
+        """starts counting the pool events of engine"""
+        event.listen(engine, "checkout", lambda *args: self.__add("checkouts"))
+        event.listen(engine, "checkin", lambda *args: self.__add("checkins"))
+        event.listen(engine, "connect", lambda *args: self.__add("connects"))
+        event.listen(engine, "invalidate",
+                     lambda *args: self.__add("invalidations"))
+        event.listen(engine, "before_cursor_execute",
+                     lambda *args: self.__add("statements"))
+        if isinstance(engine.pool, TimedQueuePool):
+            engine.pool.metrics = self
+
+    def __add(self, counter, value=1):
+        """adds value to the counter named counter"""
+        with self.__lock:
+            setattr(self, counter, getattr(self, counter) + value)
+
+    def waited(self, seconds, timed_out=False):
+        """records a checkout that waited seconds for a connection"""
+        with self.__lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def to_dict(self, pool):
+        """returns the counters, and the state of pool if it has one"""
+        metrics = {"checkouts": self.checkouts, "checkins": self.checkins,
+                   "connects": self.connects,
+                   "invalidations": self.invalidations,
+                   "timeouts": self.timeouts,
+                   "statements": self.statements,
+                   "wait_total": self.wait_total, "wait_max": self.wait_max}
+        if isinstance(pool, QueuePool):
+            metrics.update(size=pool.size(), checked_out=pool.checkedout(),
+                           overflow=pool.overflow())
+        return metrics
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool timing how long each checkout waits for a connection,
+    including the time to open a new one"""
+    metrics = None
+
+    def connect(self):
+        """checks out a connection, recording the wait in metrics"""
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.waited(time.perf_counter() - start, timed_out)
+
+    def recreate(self):
+        """returns a new pool like this one, counted by the same metrics"""
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
@@ -0,0 +1,217 @@
+#!/usr/bin/python3
+"""
+Contains the snapshot formats of FileStorage and a converter between them
+
+usage: python3 -m models.engine.snapshot <source> <destination>
+"""
+
+from datetime import datetime
+import json
+from models.base_model import time
+from models.engine.writer import atomic_write
+import pickle
+import re
+import sys
+
+_decoder = json.JSONDecoder()
+_blank = re.compile(r'[ \t\n\r]*')
+
+
+class _Stream:
+    """reads a JSON document from a file one chunk at a time"""
+
+    def __init__(self, f, chunk_size):
+        """Initialization of a stream over the file f"""
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """reads the next chunk, dropping what was consumed already"""
+        chunk = self.f.read(self.chunk_size)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+
+    def peek(self):
+        """returns the next non blank character, '' at the end of file"""
+        while True:
+            self.pos = _blank.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self.fill()
+
+    def expect(self, chars):
+        """consumes and returns the next character, one of chars"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError("Expecting one of {!r} at {!r}".format(
+                chars, self.buf[self.pos:self.pos + 20]))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """consumes and returns the next JSON value"""
+        if self.buf[self.pos:self.pos + 1] in " \t\n\r":
+            self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # a value ending the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self.fill()
+
+
+def iter_json(f, chunk_size=1 << 16):
+    """yields the (key, value) pairs of the JSON object in f one at a time
+
+    Unlike json.load, the file is parsed incrementally, so the whole
+    document is never held in memory at once.
+    """
+    stream = _Stream(f, chunk_size)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        if not isinstance(key, str):
+            raise ValueError("Expecting a string key, got {!r}".format(key))
+        # fast path for the separators json.dump writes
+        if stream.buf.startswith(": ", stream.pos):
+            stream.pos += 2
+        else:
+            stream.expect(":")
+        yield key, stream.value()
+        if stream.buf.startswith(", ", stream.pos):
+            stream.pos += 2
+        elif stream.expect(",}") == "}":
+            return
+
+
+def iso(value):
+    """JSON encoder hook for the datetimes of binary or lazy records"""
+    if isinstance(value, datetime):
+        return value.strftime(time)
+    raise TypeError("{!r} is not JSON serializable".format(value))
+
+
+class _Unpickler(pickle.Unpickler):
+    """unpickles the blocks of a binary snapshot, refusing every global
+    but datetime, so that loading a file runs no other code"""
+
+    def find_class(self, module, name):
+        """returns datetime, the only class blocks hold"""
+        if (module, name) == ("datetime", "datetime"):
+            return datetime
+        raise pickle.UnpicklingError(
+            "global '{}.{}' is forbidden".format(module, name))
+
+
+class JSONFormat:
+    """snapshot as one JSON object of <class name>.id -> to_dict()"""
+    extension = ".json"
+    mode = ""
+
+    def dump(self, records, f):
+        """writes the (key, dict) pairs of records to the text file f"""
+        f.write("{")
+        sep = ""
+        for key, value in records:
+            f.write(sep + json.dumps(key) + ": " +
+                    json.dumps(value, default=iso))
+            sep = ", "
+        f.write("}")
+
+    def load(self, f):
+        """yields the (key, dict) pairs of the text file f"""
+        return iter_json(f)
+
+
+class BinaryFormat:
+    """snapshot as pickled blocks of rows grouped by class
+
+    Each block is (<class name>, columns, rows): objects of one class
+    sharing the same attributes, stored as tuples in column order, so
+    key names are written once per block. created_at and updated_at are
+    stored as datetimes and need no parsing on load. Blocks are read one
+    at a time, with an unpickler that builds no object but datetimes.
+    """
+    extension = ".bin"
+    mode = "b"
+    magic = b"HBNB-SNAPSHOT-1\n"
+    block_size = 10000
+    dates = ("created_at", "updated_at")
+
+    def dump(self, records, f):
+        """writes the (key, dict) pairs of records to the binary file f"""
+        f.write(self.magic)
+        blocks = {}
+        for key, value in records:
+            value = dict(value)
+            name = value.pop("__class__")
+            for date in self.dates:
+                if isinstance(value.get(date), str):
+                    value[date] = datetime.fromisoformat(value[date])
+            shape = (name, tuple(value))
+            rows = blocks.setdefault(shape, [])
+            rows.append(tuple(value.values()))
+            if len(rows) >= self.block_size:
+                pickle.dump(shape + (rows,), f, pickle.HIGHEST_PROTOCOL)
+                del blocks[shape]
+        for shape, rows in blocks.items():
+            pickle.dump(shape + (rows,), f, pickle.HIGHEST_PROTOCOL)
+
+    def load(self, f):
+        """yields the (key, dict) pairs of the binary file f"""
+        if f.read(len(self.magic)) != self.magic:
+            raise ValueError("not a binary snapshot")
+        while True:
+            try:
+                block = _Unpickler(f).load()
+            except EOFError:
+                return
+            except pickle.UnpicklingError as e:
+                raise ValueError("not a binary snapshot: {}".format(e))
+            if not (isinstance(block, tuple) and len(block) == 3 and
+                    isinstance(block[0], str) and
+                    isinstance(block[1], tuple) and
+                    isinstance(block[2], list)):
+                raise ValueError("not a block of a binary snapshot")
+            name, columns, rows = block
+            for row in rows:
+                value = dict(zip(columns, row))
+                value["__class__"] = name
+                yield name + "." + value["id"], value
+
+
+formats = {"json": JSONFormat(), "binary": BinaryFormat()}
+
+
+def format_of(path):
+    """returns the format of the snapshot at path, from its extension"""
+    for fmt in formats.values():
+        if path.endswith(fmt.extension):
+            return fmt
+    raise ValueError("unknown snapshot format: {}".format(path))
+
+
+def convert(source, destination):
+    """rewrites the snapshot at source in the format of destination"""
+    src, dst = format_of(source), format_of(destination)
+    with open(source, 'r' + src.mode) as f:
+        atomic_write(destination, lambda out: dst.dump(src.load(f), out),
+                     'w' + dst.mode)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    convert(sys.argv[1], sys.argv[2])
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""
+Contains the atomic_write function and the GroupCommit class
+"""
+
+import os
+import threading
+import time
+import uuid
+
+
+def atomic_write(path, write, mode='w'):
+    """replaces the file at path with what write(f) writes to f
+
+    The data goes to a temporary file in the same directory, is fsynced,
+    then renamed over path, so readers and crashes only ever see the old
+    or the new file, never a truncated one.
+    """
+    directory = os.path.dirname(path) or "."
+    tmp = "{}.{}.tmp".format(path, uuid.uuid4().hex)
+    # created like open(path, 'w') would, with 0666 masked by the umask
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class GroupCommit:
+    """merges the flushes requested by concurrent threads into one
+
+    The first thread to commit waits window seconds, then flushes on
+    behalf of every commit requested up to that point; the others block
+    until a flush covering their request has completed.
+    """
+
+    def __init__(self, window=0):
+        """Initialization of a group commit of window seconds"""
+        self.window = window
+        self.flushes = 0
+        self.__cond = threading.Condition()
+        self.__requested = 0
+        self.__done = 0
+        self.__leading = False
+
+    def commit(self, flush):
+        """returns once flush() ran after this call was made"""
+        with self.__cond:
+            self.__requested += 1
+            ticket = self.__requested
+            while self.__leading and self.__done < ticket:
+                self.__cond.wait()
+            if self.__done >= ticket:
+                return
+            self.__leading = True
+        done = None
+        try:
+            if self.window > 0:
+                time.sleep(self.window)
+            with self.__cond:
+                upto = self.__requested
+            flush()
+            done = upto
+            self.flushes += 1
+        finally:
+            with self.__cond:
+                self.__leading = False
+                if done is not None:
+                    self.__done = done
+                self.__cond.notify_all()
@@ -0,0 +1,304 @@
+#!/usr/bin/python3
+"""
+Copies the objects of a storage into another, a class at a time in the
+order their foreign keys need, in batches, keeping a checkpoint to
+resume from when interrupted
+
+The command is python3 -m tools.migrate, which chooses the storage of
+the models package from its arguments before importing it.
+"""
+
+from datetime import datetime
+from itertools import islice
+import json
+from models.engine.journal import Journal
+from models.engine.snapshot import format_of
+from models.engine.writer import atomic_write
+import os
+import sys
+import time
+
+# tables in the order their foreign keys need them, place_amenity being
+# the amenity_ids of the places in a snapshot
+order = ("State", "City", "User", "Amenity", "Place", "Review",
+         "place_amenity")
+# the (attribute, class name) of the references of each table
+references = {"City": (("state_id", "State"),),
+              "Place": (("city_id", "City"), ("user_id", "User")),
+              "Review": (("place_id", "Place"), ("user_id", "User")),
+              "place_amenity": (("place_id", "Place"),
+                                ("amenity_id", "Amenity"))}
+
+
+class Snapshot:
+    """
+    FileStorage snapshot at path, read along with its shards and journal
+
+    As a target, the batches are appended to a staging journal, the
+    snapshot being written from it by finish(): the staging journal is
+    cut back to the checkpoint on resume, so that no batch is written
+    twice.
+    """
+
+    def __init__(self, path):
+        """Initialization of the snapshot at path"""
+        self.path = path
+        self.format = format_of(path)
+        self.journal = Journal(path + ".log")
+        self.staging = Journal(path + ".migrate")
+
+    def __str__(self):
+        """returns the path of the snapshot"""
+        return self.path
+
+    def rows(self, name, skip=0, batch_size=None):
+        """yields the records of class name after the first skip, or the
+        {"place_id", "amenity_id"} rows of place_amenity"""
+        if name != "place_amenity":
+            return islice(self.__records(name), skip, None)
+        return islice(({"place_id": record["id"], "amenity_id": id}
+                       for record in self.__records("Place")
+                       for id in record.get("amenity_ids") or ()),
+                      skip, None)
+
+    def __records(self, name):
+        """yields the records of class name, with the journal replayed"""
+        changes = {key: value for key, value in self.journal.replay()
+                   if key.partition(".")[0] == name}
+        root, ext = os.path.splitext(self.path)
+        shard = "{}.{}{}".format(root, name, ext)
+        path = shard if os.path.exists(shard) else self.path
+        try:
+            with open(path, 'r' + self.format.mode) as f:
+                for key, value in self.format.load(f):
+                    if key.partition(".")[0] != name:
+                        continue
+                    value = changes.pop(key, value)
+                    if value is not None:
+                        yield value
+        except FileNotFoundError:
+            pass
+        yield from (value for value in changes.values() if value is not None)
+
+    def resume(self, position):
+        """drops what was staged after position, the bytes checkpointed"""
+        if position or os.path.exists(self.staging.path):
+            with open(self.staging.path, 'a') as f:
+                f.truncate(position or 0)
+
+    def position(self):
+        """returns the bytes staged so far"""
+        try:
+            return os.path.getsize(self.staging.path)
+        except FileNotFoundError:
+            return 0
+
+    def write(self, name, rows, batch_size=None):
+        """stages rows of class name, returning 0 as the references
+        snapshots hold are kept, dangling or not"""
+        if name == "place_amenity":
+            self.staging.append(("place_amenity." + row["place_id"], row)
+                                for row in rows)
+            return 0
+        records = []
+        for row in rows:
+            record = {key: value.isoformat(timespec="microseconds")
+                      if isinstance(value, datetime) else value
+                      for key, value in row.items()
+                      if key != "amenity_ids"}
+            record["__class__"] = name
+            records.append((name + "." + record["id"], record))
+        self.staging.append(records)
+        return 0
+
+    def finish(self):
+        """writes the snapshot from the staging journal, then drops it"""
+        links = {}
+        for key, row in self.staging.replay():
+            if key.startswith("place_amenity."):
+                links.setdefault(row["place_id"], []).append(
+                    row["amenity_id"])
+
+        def records():
+            """yields the staged records, places with their amenity_ids"""
+            for key, record in self.staging.replay():
+                if key.startswith("place_amenity."):
+                    continue
+                if key.startswith("Place.") and record["id"] in links:
+                    record["amenity_ids"] = links[record["id"]]
+                yield key, record
+        atomic_write(self.path, lambda f: self.format.dump(records(), f),
+                     'w' + self.format.mode)
+        # the changes journaled before are not of this snapshot
+        if os.path.exists(self.journal.path):
+            self.journal.truncate()
+        if os.path.exists(self.staging.path):
+            os.remove(self.staging.path)
+
+
+class Database:
+    """
+    DBStorage, whose rows are read in primary key order and written with
+    bulk_upsert(), so that a batch written again changes nothing
+    """
+
+    def __init__(self, storage):
+        """Initialization of the database of storage"""
+        self.storage = storage
+
+    def __str__(self):
+        """returns db"""
+        return "db"
+
+    @staticmethod
+    def __table(name):
+        """returns the class of name, or the place_amenity table"""
+        from models.engine.db_storage import classes
+        from models.place import place_amenity
+        return place_amenity if name == "place_amenity" else classes[name]
+
+    def rows(self, name, skip=0, batch_size=None):
+        """yields the records of class name after the first skip, or the
+        {"place_id", "amenity_id"} rows of place_amenity"""
+        for row in self.storage.iter_rows(self.__table(name), batch_size,
+                                          skip):
+            if name != "place_amenity":
+                for key, value in row.items():
+                    if isinstance(value, datetime):
+                        row[key] = value.isoformat(timespec="microseconds")
+                row["__class__"] = name
+            yield row
+
+    def resume(self, position):
+        """does nothing, every batch being committed"""
+
+    def position(self):
+        """returns None, every batch being committed"""
+        return None
+
+    def write(self, name, rows, batch_size=None):
+        """inserts or updates the rows of class name whose references are
+        in the database, returning how many others were dropped, as
+        snapshots do not enforce their foreign keys"""
+        from models.engine.db_storage import classes
+        kept = rows
+        for attribute, ref in references.get(name, ()):
+            ids = list({row.get(attribute) for row in kept
+                        if isinstance(row.get(attribute), str)})
+            found = {id for id, obj in zip(ids, self.storage.get_many(
+                classes[ref], ids)) if obj is not None}
+            kept = [row for row in kept if row.get(attribute) in found]
+        if name == "User":
+            # snapshots leave the passwords out, the column needs one
+            for row in kept:
+                if row.get("password") is None:
+                    row["password"] = ""
+        if kept:
+            self.storage.bulk_upsert(self.__table(name), kept, batch_size)
+        return len(rows) - len(kept)
+
+    def finish(self):
+        """does nothing, every batch being committed"""
+
+
+def endpoint(spec):
+    """returns the Database of a new DBStorage for db, or the Snapshot at
+    the path spec"""
+    if spec != "db":
+        return Snapshot(spec)
+    from models import storage_t
+    if storage_t != "db":
+        raise ValueError("db needs HBNB_TYPE_STORAGE=db")
+    from models.engine.db_storage import DBStorage
+    storage = DBStorage()
+    storage.reload()
+    return Database(storage)
+
+
+class Checkpoint:
+    """
+    JSON file at path of the progress of a migration: the rows of each
+    class read and dropped, the classes done and the position of the
+    target
+    """
+
+    def __init__(self, path, source, target):
+        """Initialization of the checkpoint of source to target at path,
+        resuming the one saved if any"""
+        self.path = path
+        self.state = {"source": str(source), "target": str(target),
+                      "rows": {}, "dropped": {}, "done": [],
+                      "position": None}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            if (state["source"], state["target"]) != (str(source),
+                                                      str(target)):
+                raise ValueError("{} is the checkpoint of {} to {}".format(
+                    path, state["source"], state["target"]))
+            self.state = state
+
+    def save(self):
+        """writes the checkpoint"""
+        if self.path is not None:
+            atomic_write(self.path, lambda f: json.dump(self.state, f))
+
+    def remove(self):
+        """drops the checkpoint, the migration being done"""
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def report(name, rows, seconds, dropped=0):
+    """writes the rows of class name copied in seconds, their rate and
+    the rows dropped to stderr"""
+    print("{}: {} rows in {:.2f}s, {:.0f} rows/s{}".format(
+        name, rows, seconds, rows / seconds if seconds else 0,
+        ", {} dropped".format(dropped) if dropped else ""),
+        file=sys.stderr)
+
+
+def migrate(source, target, batch_size=1000, checkpoint=None,
+            progress=report):
+    """
+    Copies the rows of source into target in the order of order, in
+    batches of batch_size, resuming from the checkpoint at the path
+    checkpoint if any and saving it after each batch; progress, unless
+    None, is called after each batch with the class name, the rows this
+    run copied of it, the seconds they took and the rows the target
+    dropped, whose references it lacks. Returns ({class name: rows
+    copied}, {class name: rows dropped}) by this run.
+    """
+    if str(source) == str(target):
+        raise ValueError("the source is the target")
+    state = Checkpoint(checkpoint, source, target)
+    target.resume(state.state["position"])
+    copied, dropped = {}, {}
+    for name in order:
+        if name in state.state["done"]:
+            continue
+        start = time.perf_counter()
+        done = state.state["rows"].get(name, 0)
+        rows = source.rows(name, done, batch_size)
+        copied[name] = dropped[name] = read = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            lost = target.write(name, batch, batch_size)
+            read += len(batch)
+            copied[name] += len(batch) - lost
+            dropped[name] += lost
+            state.state["rows"][name] = done + read
+            state.state["dropped"][name] = state.state["dropped"].get(
+                name, 0) + lost
+            state.state["position"] = target.position()
+            state.save()
+            if progress is not None:
+                progress(name, copied[name], time.perf_counter() - start,
+                         dropped[name])
+        state.state["done"].append(name)
+        state.save()
+    target.finish()
+    state.remove()
+    return copied, dropped
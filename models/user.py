@@ -29,6 +29,19 @@ class User(BaseModel, Base):
         """initializes user"""
         super().__init__(*args, **kwargs)
 
+    if models.storage_t != 'db':
+        @property
+        def places(self):
+            """getter attribute returns the list of Place instances"""
+            from models.place import Place
+            return models.storage.related(Place, "user_id", self.id)
+
+        @property
+        def reviews(self):
+            """getter attribute returns the list of Review instances"""
+            from models.review import Review
+            return models.storage.related(Review, "user_id", self.id)
+
     def hash_password(self, password):
         """Hashes the password using MD5"""
         return hashlib.md5(password.encode()).hexdigest()
@@ -0,0 +1,194 @@
+#!/usr/bin/python3
+"""
+Contains the tests for the batch endpoints of the API
+"""
+
+from api.v1.views import batch
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+import models
+import pep8
+import unittest
+
+
+class TestBatchDocs(unittest.TestCase):
+    """Tests to check the documentation and style of batch.py"""
+    def test_pep8_conformance(self):
+        """Test that batch.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/batch.py',
+                                    'tests/test_api/test_v1/test_views/\
+test_batch.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_docstrings(self):
+        """Test for the module and function docstrings"""
+        self.assertTrue(len(batch.__doc__) >= 1)
+        for obj in (batch.requested_batch, batch.existing, batch.batch_row,
+                    batch.batch_response, batch.create_batch,
+                    batch.update_batch, batch.delete_batch):
+            self.assertTrue(len(obj.__doc__) >= 1)
+
+
+class TestBatchViews(unittest.TestCase):
+    """Test the places and reviews batch endpoints"""
+    def setUp(self):
+        """Creates a user, a state and a city"""
+        from api.v1.app import app
+        storage = models.storage
+        self.user = User(email="batch@hbnb.io", password="pwd")
+        self.state = State(name="Batch")
+        self.city = City(name="Batch", state_id=self.state.id)
+        for obj in (self.user, self.state, self.city):
+            storage.new(obj)
+        storage.save()
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """Deletes what the tests created"""
+        storage = models.storage
+        for cls in (Review, Place):
+            for obj in list(storage.iter_filter(cls, user_id=self.user.id)):
+                storage.delete(obj)
+        storage.save()
+        for obj in (self.city, self.state, self.user):
+            storage.delete(storage.get(type(obj), obj.id))
+        storage.save()
+        storage.close()
+
+    def test_places(self):
+        """Test that places are created, updated and deleted in batches"""
+        count = models.storage.count(Place)
+        items = [{"name": "Place {}".format(i), "city_id": self.city.id,
+                  "user_id": self.user.id} for i in range(5)]
+        response = self.client.post("/api/v1/places/batch", json=items)
+        self.assertEqual(response.status_code, 201)
+        ids = [result["id"] for result in response.get_json()]
+        self.assertEqual(models.storage.count(Place), count + 5)
+        self.assertEqual(models.storage.get(Place, ids[3]).name, "Place 3")
+
+        response = self.client.post("/api/v1/places/batch", json=[
+            {"name": "Good", "city_id": self.city.id,
+             "user_id": self.user.id},
+            {"name": "No city", "user_id": self.user.id},
+            {"name": "Bad city", "city_id": "nope",
+             "user_id": self.user.id},
+            {"city_id": self.city.id, "user_id": self.user.id},
+            "Not a place"])
+        self.assertEqual(response.status_code, 207)
+        results = response.get_json()
+        self.assertEqual([result["status"] for result in results],
+                         [201, 400, 404, 400, 400])
+        self.assertEqual([result.get("error") for result in results],
+                         [None, "Missing city_id", "Not found",
+                          "Missing name", "Not a JSON"])
+        self.assertEqual([result.get("index") for result in results],
+                         [None, 1, 2, 3, 4])
+        self.assertEqual(models.storage.count(Place), count + 6)
+
+        response = self.client.put("/api/v1/places/batch", json=[
+            {"id": ids[0], "name": "Renamed", "city_id": "ignored"},
+            {"id": "nope", "name": "Missing"}])
+        self.assertEqual(response.status_code, 207)
+        place = models.storage.get(Place, ids[0])
+        self.assertEqual((place.name, place.city_id),
+                         ("Renamed", self.city.id))
+
+        response = self.client.delete("/api/v1/places/batch",
+                                      json=ids[:2] + ["nope", ids[0]])
+        self.assertEqual([result["status"] for result in
+                          response.get_json()], [200, 200, 404, 404])
+        self.assertIsNone(models.storage.get(Place, ids[0]))
+        self.assertEqual(models.storage.count(Place), count + 4)
+
+    def test_reviews(self):
+        """Test that reviews need existing places and users"""
+        place = Place(name="Reviewed", city_id=self.city.id,
+                      user_id=self.user.id)
+        place.save()
+        response = self.client.post("/api/v1/reviews/batch", json=[
+            {"text": "Nice", "place_id": place.id, "user_id": self.user.id},
+            {"text": "Great", "place_id": place.id,
+             "user_id": self.user.id}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(list(models.storage.iter_filter(
+            Review, place_id=place.id))), 2)
+        response = self.client.post("/api/v1/reviews/batch", json=[
+            {"text": "Nice", "place_id": place.id, "user_id": "nope"}])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.get_json(),
+                         [{"status": 404, "error": "Not found", "index": 0}])
+
+    def test_generated_attributes(self):
+        """Test that the ids and dates of the items are not used"""
+        place = Place(name="Taken", city_id=self.city.id,
+                      user_id=self.user.id)
+        place.save()
+        response = self.client.post("/api/v1/places/batch", json=[
+            {"id": place.id, "name": "Copy", "city_id": self.city.id,
+             "user_id": self.user.id, "created_at": "not a date",
+             "updated_at": 12}])
+        self.assertEqual(response.status_code, 201)
+        id = response.get_json()[0]["id"]
+        self.assertNotEqual(id, place.id)
+        models.storage.close()
+        self.assertEqual(models.storage.get(Place, place.id).name, "Taken")
+        self.assertEqual(models.storage.get(Place, id).name, "Copy")
+
+    def test_invalid_values(self):
+        """Test that ids, references and required values that are not
+        strings, and values that are not scalars, make 400 results without
+        failing the batch"""
+        count = models.storage.count(Place)
+        response = self.client.post("/api/v1/places/batch", json=[
+            {"name": "Listed", "city_id": self.city.id, "user_id": []},
+            {"name": "Keyed", "city_id": {"id": self.city.id},
+             "user_id": self.user.id},
+            {"name": {"text": "Nested"}, "city_id": self.city.id,
+             "user_id": self.user.id},
+            {"name": None, "city_id": self.city.id,
+             "user_id": self.user.id},
+            {"name": 7, "city_id": self.city.id, "user_id": self.user.id},
+            {"name": "Good", "city_id": self.city.id,
+             "user_id": self.user.id, "number_rooms": None}])
+        self.assertEqual(response.status_code, 207)
+        results = response.get_json()
+        self.assertEqual([(result["status"], result.get("error"),
+                           result.get("index")) for result in results],
+                         [(400, "Invalid user_id", 0),
+                          (400, "Invalid city_id", 1),
+                          (400, "Invalid name", 2), (400, "Invalid name", 3),
+                          (400, "Invalid name", 4), (201, None, None)])
+        self.assertEqual(models.storage.count(Place), count + 1)
+        # a null attribute is left to its default
+        self.assertEqual(models.storage.get(
+            Place, results[-1]["id"]).number_rooms, 0)
+
+        response = self.client.put("/api/v1/places/batch", json=[
+            {"id": ["x"]}, {"id": results[-1]["id"], "name": "Better"}])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.get_json(),
+                         [{"status": 400, "error": "Invalid id"},
+                          {"status": 200, "id": results[-1]["id"]}])
+
+    def test_bad_requests(self):
+        """Test that the body must be a list of at most batch_max items"""
+        for body in ({"name": "Not a list"}, []):
+            response = self.client.post("/api/v1/places/batch", json=body)
+            self.assertEqual(response.status_code, 400)
+        batch_max = batch.batch_max
+        batch.batch_max = 2
+        try:
+            response = self.client.delete("/api/v1/places/batch",
+                                          json=["a", "b", "c"])
+            self.assertEqual(response.status_code, 400)
+        finally:
+            batch.batch_max = batch_max
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,241 @@
+#!/usr/bin/python3
+"""
+Contains the tests for the response cache of the API
+"""
+
+from api.v1.views import cache
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import models
+import pep8
+import unittest
+from unittest import mock
+MemoryBackend = cache.MemoryBackend
+ResponseCache = cache.ResponseCache
+
+
+class TestCacheDocs(unittest.TestCase):
+    """Tests to check the documentation and style of cache.py"""
+    def test_pep8_conformance(self):
+        """Test that cache.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/cache.py',
+                                    'tests/test_api/test_v1/test_views/\
+test_cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_docstrings(self):
+        """Test for the module, class and function docstrings"""
+        self.assertTrue(len(cache.__doc__) >= 1)
+        for obj in (MemoryBackend, MemoryBackend.get, MemoryBackend.set,
+                    MemoryBackend.delete, ResponseCache,
+                    ResponseCache.invalidate, ResponseCache.forget,
+                    ResponseCache.forget_rows, ResponseCache.generations,
+                    ResponseCache.metrics, cache.cached, cache.store,
+                    cache.cached_response):
+            self.assertTrue(len(obj.__doc__) >= 1)
+
+
+class TestMemoryBackend(unittest.TestCase):
+    """Test the MemoryBackend class"""
+    def test_lru(self):
+        """Test that the least recently used entry is dropped first"""
+        backend = MemoryBackend(2, 60)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        self.assertEqual(backend.get("a"), 1)
+        backend.set("c", 3)
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual((backend.get("a"), backend.get("c")), (1, 3))
+        backend.delete(["a", "d"])
+        self.assertIsNone(backend.get("a"))
+
+    def test_ttl(self):
+        """Test that entries expire ttl seconds after being stored"""
+        backend = MemoryBackend(2, 10)
+        with mock.patch("time.monotonic", return_value=100):
+            backend.set("a", 1)
+        with mock.patch("time.monotonic", return_value=109):
+            self.assertEqual(backend.get("a"), 1)
+        with mock.patch("time.monotonic", return_value=110):
+            self.assertIsNone(backend.get("a"))
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test the tags and counters of the ResponseCache class"""
+    def put(self, responses, key, tags, body=b"body"):
+        """stores body under key with the generations tags have now"""
+        responses.set(key, {"generations": responses.generations(tags),
+                            "body": body})
+
+    def test_invalidate(self):
+        """Test that only the responses tagged are dropped"""
+        responses = ResponseCache(10)
+        self.put(responses, "states", ["State"], b"1")
+        self.put(responses, "state", ["State.1"], b"2")
+        self.put(responses, "cities", ["State.1", "City.state_id=1"], b"3")
+        self.put(responses, "search", ["Place", "City", "State"], b"4")
+        self.assertEqual(responses.get("cities")["body"], b"3")
+        responses.invalidate(["State.1"])
+        self.assertIsNone(responses.get("state"))
+        self.assertIsNone(responses.get("cities"))
+        self.assertEqual(responses.get("states")["body"], b"1")
+        city = City(name="Paris", state_id="2")
+        responses.forget(city)
+        self.assertIsNone(responses.get("search"))
+        self.assertEqual(responses.get("states")["body"], b"1")
+        metrics = responses.metrics()
+        self.assertEqual((metrics["hits"], metrics["misses"],
+                          metrics["stores"], metrics["invalidations"]),
+                         (3, 3, 4, 4))
+
+    def test_written_meanwhile(self):
+        """Test that a response is not stored if its tags were invalidated
+        while it was built"""
+        responses = ResponseCache(10)
+        generations = responses.generations(["State"])
+        responses.invalidate(["State"])
+        responses.set("states", {"generations": generations, "body": b"1"})
+        self.assertIsNone(responses.get("states"))
+        self.assertEqual(responses.metrics()["skipped"], 1)
+
+    def test_shared_backend(self):
+        """Test that the invalidations of a cache reach the responses
+        another one stored in the same backend"""
+        backend = MemoryBackend(10, 60)
+        first, second = (ResponseCache(10, backend=lambda size, ttl: backend)
+                         for i in range(2))
+        self.put(first, "states", ["State"])
+        self.assertIsNotNone(second.get("states"))
+        second.invalidate(["State"])
+        self.assertIsNone(first.get("states"))
+
+    def test_max_body(self):
+        """Test that the responses larger than max_body are not kept"""
+        responses = ResponseCache(10, max_body=4)
+        self.put(responses, "small", ["State"], b"1234")
+        self.put(responses, "large", ["State"], b"12345")
+        responses.set("streamed", None)
+        self.assertIsNotNone(responses.get("small"))
+        self.assertIsNone(responses.get("large"))
+        self.assertEqual(responses.metrics()["skipped"], 2)
+
+    def test_disabled(self):
+        """Test that a cache of size 0 has no backend"""
+        responses = ResponseCache(0)
+        self.assertIsNone(responses.backend)
+        responses.invalidate(["State"])
+
+
+class TestCachedViews(unittest.TestCase):
+    """Test that the views answer from the cache until written"""
+    def setUp(self):
+        """Turns the cache of the views on"""
+        self.responses = cache.response_cache
+        for attribute, value in (("size", 50),
+                                 ("backend", MemoryBackend(50, 60))):
+            patch = mock.patch.object(self.responses, attribute, value)
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.responses.clear)
+        self.addCleanup(models.storage.close)
+        self.hits = self.responses.metrics()["hits"]
+
+    def test_reads_and_writes(self):
+        """Test that reads are cached and writes drop what they change"""
+        from api.v1.app import app
+        storage = models.storage
+        user = User(email="cache@hbnb.io", password="pwd")
+        state = State(name="Cached")
+        city = City(name="Cached", state_id=state.id)
+        place = Place(name="Cached", city_id=city.id, user_id=user.id)
+        amenity = Amenity(name="Cached")
+        for obj in (user, state, city, place, amenity):
+            storage.new(obj)
+        storage.save()
+        search = {"states": [state.id]}
+        with app.test_client() as client:
+            url = "/api/v1/states/{}/cities".format(state.id)
+            first = client.get(url)
+            self.assertEqual([c["id"] for c in first.get_json()], [city.id])
+            response = client.get(url)
+            self.assertEqual(response.get_json(), first.get_json())
+            self.assertEqual(response.headers["ETag"],
+                             first.headers["ETag"])
+            response = client.get(url, headers={
+                "If-None-Match": first.headers["ETag"]})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(client.post("/api/v1/places_search",
+                                         json=search).get_json()[0]["id"],
+                             place.id)
+            self.assertEqual(self.responses.metrics()["hits"] - self.hits, 2)
+
+            response = client.post("/api/v1/places/{}/amenities/{}".format(
+                place.id, amenity.id))
+            self.assertEqual(response.status_code, 201)
+            # the list of cities does not depend on the place
+            client.get(url).get_data()
+            self.assertEqual(self.responses.metrics()["hits"] - self.hits, 3)
+            # but the searches do
+            response = client.post("/api/v1/places_search", json=search)
+            self.assertEqual([p["id"] for p in response.get_json()],
+                             [place.id])
+            response = client.get("/api/v1/places/{}/amenities".format(
+                place.id))
+            self.assertEqual([a["id"] for a in response.get_json()],
+                             [amenity.id])
+            self.assertEqual(self.responses.metrics()["hits"] - self.hits, 3)
+
+            response = client.put("/api/v1/cities/{}".format(city.id),
+                                  json={"name": "Renamed"})
+            self.assertEqual(response.status_code, 200)
+            response = client.get(url)
+            self.assertEqual(response.get_json()[0]["name"], "Renamed")
+            self.assertNotEqual(response.headers["ETag"],
+                                first.headers["ETag"])
+            metrics = client.get("/api/v1/status/cache").get_json()
+            self.assertEqual(metrics["hits"] - self.hits, 3)
+            self.assertGreaterEqual(metrics["invalidations"], 3)
+        for obj in (place, city, state, amenity, user):
+            storage.delete(obj)
+        storage.save()
+
+    def test_streamed(self):
+        """Test that a streamed list is not stored if written while it is
+        sent, nor if larger than max_body"""
+        from api.v1.app import app
+        storage = models.storage
+        state = State(name="Streamed")
+        storage.new(state)
+        storage.save()
+        self.addCleanup(storage.save)
+        self.addCleanup(storage.delete, state)
+        with app.test_client() as client:
+            skipped = self.responses.metrics()["skipped"]
+            response = client.get("/api/v1/states", buffered=False)
+            self.assertTrue(response.is_streamed)
+            chunks = iter(response.response)
+            next(chunks)
+            # a write made by another request while the list is sent
+            state.name = "Renamed"
+            state.save()
+            self.responses.forget(state)
+            b"".join(chunks)
+            response.close()
+            self.assertEqual(self.responses.metrics()["skipped"], skipped + 1)
+            response = client.get("/api/v1/states")
+            self.assertIn(b"Renamed", response.get_data())
+            self.assertIn(b"Renamed", client.get("/api/v1/states").get_data())
+            self.assertEqual(self.responses.metrics()["hits"] - self.hits, 1)
+            with mock.patch.object(self.responses, "max_body", 10):
+                self.responses.clear()
+                for i in range(2):
+                    client.get("/api/v1/states").get_data()
+            self.assertEqual(self.responses.metrics()["hits"] - self.hits, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,8 +2,13 @@
 """Test BaseModel for expected behavior and documentation"""
 from datetime import datetime
 import inspect
+import json
 import models
+import os
 import pep8 as pycodestyle
+import subprocess
+import sys
+import tempfile
 import time
 import unittest
 from unittest import mock
@@ -158,3 +163,100 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(old_created_at, new_created_at)
         self.assertTrue(mock_storage.new.called)
         self.assertTrue(mock_storage.save.called)
+
+    @unittest.skipIf(models.storage_t == 'db' or models.compact,
+                     "compact models keep no record")
+    def test_to_record_tracks_changes(self):
+        """Test that to_record is rebuilt only after an attribute changed"""
+        inst = BaseModel()
+        record = inst.to_record()
+        self.assertEqual(record, inst.to_dict())
+        self.assertIs(inst.to_record(), record)
+        self.assertEqual(list(inst.to_dict()), list(inst.__dict__) +
+                         ["__class__"])
+        inst.name = "Holberton"
+        self.assertIsNot(inst.to_record(), record)
+        self.assertEqual(inst.to_record()["name"], "Holberton")
+        inst.set_record(record)
+        self.assertIs(inst.to_record(), record)
+
+    def test_to_dict_is_cached(self):
+        """Test that to_dict and to_json reuse their serialization"""
+        inst = BaseModel()
+        inst.name = "Holberton"
+        d = inst.to_dict()
+        d["name"] = "changed by the caller"
+        self.assertEqual(inst.to_dict()["name"], "Holberton")
+        self.assertIsNot(inst.to_dict(), inst.to_dict())
+        self.assertEqual(json.loads(inst.to_json()), inst.to_dict())
+        if models.storage_t != 'db' and not models.compact:
+            self.assertIs(inst.to_json(), inst.to_json())
+            inst.name = "School"
+            self.assertEqual(json.loads(inst.to_json())["name"], "School")
+
+
+class TestCompact(unittest.TestCase):
+    """Test the models compacted into __slots__ by HBNB_FILE_COMPACT"""
+
+    def test_metaclass_makes_slots(self):
+        """Test that Compact turns the attribute defaults into slots"""
+        class Model(metaclass=models.base_model.Compact):
+            """model with two attributes"""
+            name = ""
+            number = 0
+
+            def method(self):
+                """not an attribute"""
+
+        class Child(Model):
+            """model adding an attribute"""
+            text = ""
+
+        self.assertEqual(Model.__slots__, ("name", "number"))
+        self.assertEqual(Model._defaults, {"name": "", "number": 0})
+        self.assertEqual(Child.__slots__, ("text",))
+        self.assertEqual(Child._columns, ("name", "number", "text"))
+        self.assertEqual(Child._defaults["number"], 0)
+        self.assertTrue(callable(Child.method))
+        self.assertFalse(hasattr(Child(), "__dict__"))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_compact_models(self):
+        """Test the model API with HBNB_FILE_COMPACT=1"""
+        script = """if True:
+            import models
+            from models.place import Place
+            from models.review import Review
+            assert models.compact
+            place = Place(name="Loft", number_rooms=2)
+            assert place.city_id == "" and place.amenity_ids == []
+            assert not hasattr(place, "nickname")
+            place.nickname = "Lofty"
+            assert place.nickname == "Lofty"
+            d = place.to_dict()
+            assert d["name"] == "Loft" and d["nickname"] == "Lofty"
+            assert "city_id" not in d and d["__class__"] == "Place"
+            assert place.__dict__["number_rooms"] == 2
+            assert str(place).startswith("[Place] (" + place.id + ")")
+            place.save()
+            review = Review(place_id=str(place.id), text="Nice")
+            review.save()
+            assert review.place_id is place.id
+            assert place.reviews == [review]
+            models.storage.reload()
+            loaded = models.storage.get(Place, place.id)
+            assert loaded is not place
+            assert loaded.to_dict() == place.to_dict()
+            assert [r.text for r in loaded.reviews] == ["Nice"]
+            loaded.delete()
+            assert models.storage.get(Place, place.id) is None
+        """
+        env = dict(os.environ, HBNB_FILE_COMPACT="1")
+        env.pop("HBNB_TYPE_STORAGE", None)
+        env["PYTHONPATH"] = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            run = subprocess.run([sys.executable, "-c", script], env=env,
+                                 cwd=tmp, stdout=subprocess.PIPE,
+                                 stderr=subprocess.STDOUT,
+                                 universal_newlines=True)
+        self.assertEqual(run.returncode, 0, run.stdout)
@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+"""
+Contains the tests for the Bitmap and BitmapIndex classes
+"""
+
+from models.engine import bitmap
+import pep8
+import random
+import unittest
+Bitmap = bitmap.Bitmap
+BitmapIndex = bitmap.BitmapIndex
+
+
+class TestBitmapDocs(unittest.TestCase):
+    """Tests to check the documentation and style of bitmap.py"""
+    def test_pep8_conformance(self):
+        """Test that bitmap.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/bitmap.py',
+                                    'tests/test_models/test_engine/\
+test_bitmap.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_docstrings(self):
+        """Test for the module, class and method docstrings"""
+        self.assertTrue(len(bitmap.__doc__) >= 1)
+        for obj in (Bitmap, Bitmap.add, Bitmap.discard, Bitmap.intersection,
+                    BitmapIndex, BitmapIndex.update, BitmapIndex.remove,
+                    BitmapIndex.find, BitmapIndex.bitmap):
+            self.assertTrue(len(obj.__doc__) >= 1)
+
+
+class TestBitmap(unittest.TestCase):
+    """Test the Bitmap class"""
+    def build(self, numbers):
+        """returns a Bitmap of numbers"""
+        bits = Bitmap()
+        for n in numbers:
+            bits.add(n)
+        return bits
+
+    def test_add_discard(self):
+        """Test that a bitmap holds the set of numbers added to it"""
+        rng = random.Random(1)
+        bits = Bitmap()
+        expected = set()
+        # enough numbers in the first chunk to make it dense and back
+        for i in range(30000):
+            n = rng.randrange(1 << 18) if i % 3 else rng.randrange(8000)
+            if rng.random() < 0.7:
+                bits.add(n)
+                expected.add(n)
+            else:
+                bits.discard(n)
+                expected.discard(n)
+        self.assertEqual(len(bits), len(expected))
+        self.assertEqual(list(bits), sorted(expected))
+        for n in range(9000):
+            self.assertEqual(n in bits, n in expected)
+        for n in list(expected):
+            bits.discard(n)
+        self.assertEqual(len(bits), 0)
+        self.assertEqual(list(bits), [])
+
+    def test_intersection(self):
+        """Test the intersection of dense and sparse chunks"""
+        dense = set(range(0, 20000, 2)) | set(range(70000, 80000))
+        sparse = set(range(0, 100000, 7))
+        other = set(range(0, 20000, 3)) | {70001, 1 << 20}
+        bitmaps = [self.build(dense), self.build(sparse),
+                   self.build(other)]
+        self.assertEqual(Bitmap.intersection(bitmaps[:1]), sorted(dense))
+        self.assertEqual(Bitmap.intersection(bitmaps[:2]),
+                         sorted(dense & sparse))
+        self.assertEqual(Bitmap.intersection(bitmaps),
+                         sorted(dense & sparse & other))
+        self.assertEqual(Bitmap.intersection([bitmaps[0], bitmaps[0]]),
+                         sorted(dense))
+        self.assertEqual(Bitmap.intersection([]), [])
+
+
+class TestBitmapIndex(unittest.TestCase):
+    """Test the BitmapIndex class"""
+    def test_find(self):
+        """Test that find() returns the objects having all the values"""
+        index = BitmapIndex()
+        index.update("Place.1", 1, (), ["a", "b"])
+        index.update("Place.2", 2, (), ["b", "c"])
+        index.update("Place.3", 3, (), ["a", "b", "c"])
+        index.update("Place.4", 4, (), [])
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.find(["b"]),
+                         {"Place.1": 1, "Place.2": 2, "Place.3": 3})
+        self.assertEqual(index.find(["a", "c"]), {"Place.3": 3})
+        self.assertEqual(index.find(["a", "d"]), {})
+        self.assertEqual(index.find([]), {})
+
+    def test_update_remove(self):
+        """Test that changed and removed objects leave the bitmaps"""
+        index = BitmapIndex()
+        index.update("Place.1", 1, (), ["a", "b"])
+        index.update("Place.2", 2, (), ["a"])
+        index.update("Place.1", 1, ["a", "b"], ["b"])
+        self.assertEqual(index.find(["a"]), {"Place.2": 2})
+        self.assertEqual(index.find(["b"]), {"Place.1": 1})
+        index.remove("Place.2", ["a"])
+        self.assertEqual(index.find(["a"]), {})
+        self.assertEqual(len(index.bitmap("a")), 0)
+        self.assertEqual(len(index), 1)
+        # the ordinal of Place.2 is given to the next object
+        index.update("Place.3", 3, (), ["a"])
+        self.assertEqual(list(index.bitmap("a")), [1])
+        self.assertEqual(index.find(["a"]), {"Place.3": 3})
+        index.remove("Place.4", ["a"])
+        self.assertEqual(len(index), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,7 @@
 Contains the TestDBStorageDocs and TestDBStorage classes
 """
 
+import contextlib
 from datetime import datetime
 import inspect
 import models
@@ -17,7 +18,10 @@ from models.user import User
 import json
 import os
 import pep8
+from sqlalchemy import text
+from sqlalchemy.pool import StaticPool
 import unittest
+from unittest import mock
 DBStorage = db_storage.DBStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
            "Review": Review, "State": State, "User": User}
@@ -88,6 +92,40 @@ class TestFileStorage(unittest.TestCase):
         """Test that save properly saves objects to file.json"""
 
 
+class TestEngineOptions(unittest.TestCase):
+    """Test the engine options DBStorage reads from the environment"""
+    options = staticmethod(DBStorage._DBStorage__engine_options)
+
+    def test_pool_options(self):
+        """Test that the pool is configured by HBNB_MYSQL_* variables"""
+        env = {"HBNB_MYSQL_POOL_SIZE": "8", "HBNB_MYSQL_MAX_OVERFLOW": "2",
+               "HBNB_MYSQL_POOL_TIMEOUT": "1.5",
+               "HBNB_MYSQL_POOL_RECYCLE": "3600", "HBNB_MYSQL_PRE_PING": "1",
+               "HBNB_MYSQL_ISOLATION": "READ COMMITTED"}
+        with mock.patch.dict(os.environ, env):
+            options = self.options("mysql+mysqldb://u:p@localhost/db")
+        self.assertIs(options.pop("poolclass"),
+                      db_storage.TimedQueuePool)
+        self.assertEqual(options, {"pool_size": 8, "max_overflow": 2,
+                                   "pool_timeout": 1.5,
+                                   "pool_recycle": 3600,
+                                   "pool_pre_ping": True,
+                                   "isolation_level": "READ COMMITTED"})
+
+    def test_default_options(self):
+        """Test that unset variables keep the SQLAlchemy defaults"""
+        with mock.patch.dict(os.environ, {}, clear=True):
+            options = self.options("sqlite:///hbnb.db")
+        self.assertEqual(options, {"poolclass": db_storage.TimedQueuePool})
+
+    def test_sqlite_memory(self):
+        """Test that an in-memory database is shared by all threads"""
+        with mock.patch.dict(os.environ, {"HBNB_MYSQL_POOL_SIZE": "8"}):
+            options = self.options("sqlite://")
+        self.assertIs(options["poolclass"], StaticPool)
+        self.assertNotIn("pool_size", options)
+
+
 @unittest.skipIf(models.storage_t != 'db', "test for db storage only")
 class TestDBStorage(unittest.TestCase):
     """Test the DbStorage class"""
@@ -123,6 +161,268 @@ class TestDBStorage(unittest.TestCase):
         with self.assertRaises(TypeError):
             storage.get()
 
+    def test_search_places(self):
+        """test that search_places selects and filters in SQL"""
+        storage = models.storage
+        user = User(email="search@hbnb.io", password="pwd")
+        s1, s2 = State(name="S1"), State(name="S2")
+        c1 = City(name="C1", state_id=s1.id)
+        c2 = City(name="C2", state_id=s1.id)
+        c3 = City(name="C3", state_id=s2.id)
+        a1, a2 = Amenity(name="A1"), Amenity(name="A2")
+        p1, p2, p3, p4 = [Place(name="P", city_id=city.id, user_id=user.id)
+                          for city in (c1, c2, c3, c3)]
+        for obj in (user, s1, s2, c1, c2, c3, a1, a2, p1, p2, p3, p4):
+            storage.new(obj)
+        p1.amenities.extend([a1, a2])
+        p2.amenities.append(a1)
+        p3.amenities.append(a2)
+        storage.save()
+
+        def search(**kwargs):
+            """returns the ids of the places found"""
+            return sorted(place.id for place in storage.search_places(
+                **kwargs))
+        self.assertEqual(search(states=[s1.id]), sorted([p1.id, p2.id]))
+        self.assertEqual(search(states=[s1.id], cities=[c1.id, c3.id]),
+                         sorted([p1.id, p2.id, p3.id, p4.id]))
+        self.assertEqual(search(amenities=[a1.id]), sorted([p1.id, p2.id]))
+        self.assertEqual(search(amenities=[a1.id, a2.id]), [p1.id])
+        self.assertEqual(search(states=[s2.id], amenities=[a1.id]), [])
+        self.assertEqual(search(states=["nope"], amenities=[a2.id]),
+                         sorted([p1.id, p3.id]))
+        self.assertEqual(search(amenities=[a1.id, "nope"]), [])
+        self.assertEqual(search(states=["nope"]), [])
+
+    def test_page(self):
+        """test that page reads objects in (created_at, id) order"""
+        storage = models.storage
+        times = [datetime(2001, 1, 1, 0, 0, i, 5) for i in range(3)]
+        states = [State(name="S", created_at=times[i % 3]) for i in range(5)]
+        for state in states:
+            storage.new(state)
+        city = City(name="C", state_id=states[0].id, created_at=times[1])
+        storage.new(city)
+        storage.save()
+        order = sorted(states, key=lambda state: (state.created_at,
+                                                  state.id))
+        self.assertEqual(storage.page(State, 2), order[:2])
+        last = order[1].created_at, order[1].id
+        self.assertEqual(storage.page(State, 2, last), order[2:4])
+        self.assertEqual(storage.page(City, 5, state_id=states[0].id),
+                         [city])
+        self.assertEqual(storage.page(City, 5, (times[1], city.id),
+                                      state_id=states[0].id), [])
+        self.assertLessEqual(len(storage.search_places(limit=1)), 1)
+
+        from api.v1.app import app
+        with app.test_client() as client:
+            ids = []
+            url = "/api/v1/states?limit=2"
+            while url:
+                response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(len(response.get_json()), 2)
+                ids.extend(state["id"] for state in response.get_json())
+                link = response.headers.get("Link")
+                url = link and link[1:link.index('>; rel="next"')]
+            self.assertEqual(ids[:5], [state.id for state in order])
+            self.assertEqual(len(ids), storage.count(State))
+            for url in ("/api/v1/states?limit=0", "/api/v1/states?limit=a",
+                        "/api/v1/states?cursor=nope"):
+                self.assertEqual(client.get(url).status_code, 400)
+
+    def test_version(self):
+        """test that version changes with every change to a class"""
+        storage = models.storage
+        state = State(name="Ondo")
+        tags = [storage.version(State)[0]]
+        state.save()
+        tags.append(storage.version(State)[0])
+        state.name = "Osun"
+        state.save()
+        tags.append(storage.version(State)[0])
+        self.assertGreaterEqual(storage.version(State)[1], state.updated_at)
+        storage.delete(state)
+        storage.save()
+        tags.append(storage.version(State)[0])
+        # the rows are those of the first version again
+        self.assertEqual(len(set(tags[:3])), 3)
+        self.assertNotEqual(tags[3], tags[2])
+        # the deletion is dated by its commit
+        self.assertGreater(storage.version(State)[1], state.updated_at)
+        before = storage.version(City)
+        Amenity(name="Wifi").save()
+        self.assertEqual(storage.version(City), before)
+
+    def test_version_bulk(self):
+        """test that version changes when bulk_upsert rewrites rows, their
+        number and dates unchanged, and is read in one query"""
+        from models.place import place_amenity
+        storage = models.storage
+        state = State(name="Edo")
+        state.save()
+        row = {"id": state.id, "name": "Delta",
+               "created_at": state.created_at,
+               "updated_at": state.updated_at}
+        tag = storage.version(State)[0]
+        storage.bulk_upsert(State, [dict(row)])
+        self.assertNotEqual(storage.version(State)[0], tag)
+        self.assertEqual(storage.get(State, state.id).name, "Delta")
+        tags = [storage.version(cls)[0] for cls in (Place, City)]
+        storage.bulk_upsert(place_amenity, [])
+        self.assertNotEqual(storage.version(Place)[0], tags[0])
+        self.assertEqual(storage.version(City)[0], tags[1])
+        statements = storage.pool_metrics()["statements"]
+        storage.version(State)
+        self.assertEqual(storage.pool_metrics()["statements"],
+                         statements + 1)
+
+    def test_version_outside(self):
+        """test that version changes when rows are written around the
+        storage, such as by another process, dated by their updated_at"""
+        storage = models.storage
+        session = storage._DBStorage__session
+        tag = storage.version(State)[0]
+        session.execute(text(
+            "INSERT INTO states (id, name, created_at, updated_at) "
+            "VALUES ('outside', 'Outside', '2017-01-01', '2017-01-01')"))
+        session.commit()
+        self.assertNotEqual(storage.version(State)[0], tag)
+        tag = storage.version(State)[0]
+        session.execute(text(
+            "UPDATE states SET updated_at = '2100-01-01' "
+            "WHERE id = 'outside'"))
+        session.commit()
+        self.assertNotEqual(storage.version(State)[0], tag)
+        self.assertEqual(storage.version(State)[1], datetime(2100, 1, 1))
+        session.execute(text("DELETE FROM states WHERE id = 'outside'"))
+        session.commit()
+
+    def test_new_many(self):
+        """test that new_many adds every object, saved at once"""
+        storage = models.storage
+        count = storage.count(State)
+        states = [State(name="State {}".format(i)) for i in range(3)]
+        storage.new_many(iter(states))
+        storage.save()
+        self.assertEqual(storage.count(State), count + 3)
+        self.assertEqual(storage.get_many(State, [s.id for s in states]),
+                         states)
+        storage.new_many([])
+        self.assertEqual(storage.count(State), count + 3)
+
+    def test_bulk_save(self):
+        """test that bulk_save inserts rows without building objects"""
+        storage = models.storage
+        count = storage.count(City)
+        state = State(name="Delta")
+        state.save()
+        rows = [{"name": "City {}".format(i), "state_id": state.id}
+                for i in range(5)]
+        rows[0].update(id="bulk-0", created_at="2017-03-25T02:17:06.000001")
+        with mock.patch.object(City, "__init__") as init:
+            stats = storage.bulk_save(City, iter(rows), chunk_size=2)
+        init.assert_not_called()
+        self.assertEqual(stats["rows"], 5)
+        self.assertGreater(stats["rows_per_second"], 0)
+        self.assertEqual(storage.count(City), count + 5)
+        self.assertEqual(rows[0]["id"], "bulk-0")
+        city = storage.get(City, rows[4]["id"])
+        self.assertEqual((city.name, city.state_id), ("City 4", state.id))
+        city = storage.get(City, "bulk-0")
+        self.assertEqual(city.created_at,
+                         datetime(2017, 3, 25, 2, 17, 6, 1))
+        self.assertIsInstance(city.updated_at, datetime)
+
+        storage.bulk_upsert(City, [{"id": "bulk-0", "name": "Warri",
+                                    "state_id": state.id},
+                                   {"id": "bulk-5", "name": "Asaba",
+                                    "state_id": state.id}])
+        self.assertEqual(storage.get(City, "bulk-0").name, "Warri")
+        self.assertEqual(storage.count(City), count + 6)
+
+    def test_bulk_save_table(self):
+        """test that bulk_save inserts the rows of a table"""
+        from models.place import place_amenity
+        storage = models.storage
+        user = User(email="bulk@hbnb.io", password="pwd")
+        state = State(name="Imo")
+        city = City(name="Owerri", state_id=state.id)
+        place = Place(name="Hut", city_id=city.id, user_id=user.id)
+        amenities = [Amenity(name="Fan"), Amenity(name="Bed")]
+        for obj in [user, state, city, place] + amenities:
+            storage.new(obj)
+        storage.save()
+        ids = sorted(amenity.id for amenity in amenities)
+        rows = [{"place_id": place.id, "amenity_id": id} for id in ids]
+        self.assertEqual(storage.bulk_save(place_amenity, rows)["rows"], 2)
+        storage.bulk_upsert(place_amenity, rows)
+        storage.close()
+        place = storage.get(Place, rows[0]["place_id"])
+        self.assertEqual(sorted(a.id for a in place.amenities), ids)
+
+    def test_iter_rows(self):
+        """test that iter_rows reads the rows in primary key order, a batch
+        at a time"""
+        storage = models.storage
+        state = State(name="Rows")
+        storage.new(state)
+        storage.new_many(City(id="rows-{}".format(i), name=str(i),
+                              state_id=state.id) for i in range(5))
+        storage.save()
+        ids = sorted(row["id"] for row in storage.iter_rows(City, 2))
+        self.assertEqual([row["id"] for row in storage.iter_rows(City, 2)],
+                         ids)
+        row = next(row for row in storage.iter_rows(City)
+                   if row["id"] == "rows-3")
+        self.assertEqual((row["name"], row["state_id"]), ("3", state.id))
+        self.assertEqual([row["id"] for row in storage.iter_rows(City, 2, 1)],
+                         ids[1:])
+        for obj in list(storage.iter_filter(City, state_id=state.id)):
+            storage.delete(obj)
+        storage.delete(state)
+        storage.save()
+
+    def test_iter_all(self):
+        """test that iter_all yields the objects all() returns"""
+        storage = models.storage
+        State(name="Kwara").save()
+        for cls in (None, State, "State", City):
+            self.assertEqual(set(storage.iter_all(cls)),
+                             set(storage.all(cls).values()))
+        self.assertEqual(len(list(storage.iter_all(State, batch_size=1))),
+                         storage.count(State))
+
+    def test_iter_filter(self):
+        """test that iter_filter yields the objects with equal attributes"""
+        storage = models.storage
+        state = State(name="Edo")
+        city = City(name="Benin", state_id=state.id)
+        other = City(name="Auchi", state_id=state.id)
+        for obj in (state, city, other):
+            storage.new(obj)
+        storage.save()
+        self.assertEqual(set(storage.iter_filter(City, state_id=state.id)),
+                         {city, other})
+        self.assertEqual(list(storage.iter_filter(City, state_id=state.id,
+                                                  name="Benin")), [city])
+        self.assertEqual(list(storage.iter_filter(City, state_id="nope")), [])
+
+    def test_get_many(self):
+        """test that get_many returns the objects of ids, None if missing"""
+        storage = models.storage
+        first = State(name='Oyo')
+        first.save()
+        second = State(name='Ogun')
+        second.save()
+        self.assertEqual(storage.get_many(State, [second.id, 'nope', first.id,
+                                                  second.id]),
+                         [second, None, first, second])
+        self.assertEqual(storage.get_many(City, [first.id]), [None])
+        self.assertEqual(storage.get_many(None, [first.id]), [None])
+        self.assertEqual(storage.get_many(State, []), [])
+
     def test_count(self):
         """test that count returns the number of objects of a given class."""
         storage = models.storage
@@ -141,3 +441,271 @@ class TestDBStorage(unittest.TestCase):
         self.assertGreater(storage.count(), storage.count(State))
         with self.assertRaises(TypeError):
             storage.count(State, 'op')
+
+    def test_count_all_classes(self):
+        """test that count() is the sum of the counts of every class"""
+        storage = models.storage
+        State(name='Kano').save()
+        Amenity(name='Pool').save()
+        self.assertEqual(storage.count(),
+                         sum(storage.count(cls) for cls in classes.values()))
+        self.assertEqual(storage.count("State"), storage.count(State))
+        self.assertEqual(storage.count(int), 0)
+
+    def test_counts(self):
+        """test that counts returns the count of every class at once"""
+        storage = models.storage
+        State(name='Kebbi').save()
+        counts = storage.counts()
+        self.assertEqual(counts, {name: storage.count(cls)
+                                  for name, cls in classes.items()})
+        self.assertEqual(storage.check_counts(), {})
+
+    def test_pool_metrics(self):
+        """test that pool_metrics counts the checkouts of the pool"""
+        storage = models.storage
+        before = storage.pool_metrics()["checkouts"]
+        storage.close()
+        # a count may be kept, a lookup always reads the database
+        storage.get(State, "missing")
+        metrics = storage.pool_metrics()
+        self.assertGreater(metrics["checkouts"], before)
+        self.assertGreaterEqual(metrics["wait_max"], 0)
+        self.assertGreaterEqual(metrics["checkins"] + 1, metrics["checkouts"])
+
+
+@unittest.skipIf(models.storage_t != 'db', "test for db storage only")
+class TestMaintainedCounts(unittest.TestCase):
+    """Test the counts kept in maintained mode"""
+    def setUp(self):
+        """Opens a storage in maintained mode on a new database"""
+        patch = mock.patch.object(DBStorage, "_DBStorage__count_mode",
+                                  "maintained")
+        patch.start()
+        self.addCleanup(patch.stop)
+        with mock.patch.dict(os.environ, {"HBNB_DB_URL": "sqlite://"}):
+            self.storage = DBStorage()
+            self.storage.reload()
+        self.addCleanup(self.storage.close)
+
+    def test_commits(self):
+        """Test that commits are counted and rollbacks are not"""
+        storage = self.storage
+        self.assertEqual(storage.counts()["State"], 0)
+        states = [State(name="State {}".format(i)) for i in range(3)]
+        for state in states:
+            storage.new(state)
+        storage.save()
+        storage.new(City(name="Ikeja", state_id=states[0].id))
+        storage.save()
+        self.assertEqual((storage.count(State), storage.count(City)), (3, 1))
+        statements = storage.pool_metrics()["statements"]
+        self.assertEqual(storage.count(), 4)
+        self.assertEqual(storage.pool_metrics()["statements"], statements)
+        storage.delete(states[2])
+        storage.new(State(name="Flushed"))
+        storage._DBStorage__session.flush()
+        self.assertEqual(storage.count(State), 3)
+        storage._DBStorage__session.rollback()
+        self.assertEqual(storage.count(State), 3)
+        storage.delete(states[2])
+        storage.save()
+        self.assertEqual(storage.counts()["State"], 2)
+        self.assertEqual(storage.check_counts(), {})
+
+    def test_bulk_save(self):
+        """Test that bulk inserts are counted and upserts recounted"""
+        storage = self.storage
+        self.assertEqual(storage.count(State), 0)
+        storage.bulk_save(State, [{"name": "One"}, {"name": "Two"}])
+        self.assertEqual(storage.count(State), 2)
+        storage.bulk_upsert(State, [{"id": "three", "name": "Three"}])
+        self.assertEqual(storage.count(State), 3)
+        self.assertEqual(storage.check_counts(), {})
+
+    def test_drift(self):
+        """Test that check_counts reports rows written around the session"""
+        storage = self.storage
+        self.assertEqual(storage.count(State), 0)
+        storage._DBStorage__session.execute(text(
+            "INSERT INTO states (id, name, created_at, updated_at) "
+            "VALUES ('outside', 'Outside', '2017-01-01', '2017-01-01')"))
+        storage._DBStorage__session.commit()
+        self.assertEqual(storage.count(State), 0)
+        self.assertEqual(storage.check_counts(repair=False),
+                         {"State": (0, 1)})
+        self.assertEqual(storage.count(State), 0)
+        self.assertEqual(storage.check_counts(), {"State": (0, 1)})
+        self.assertEqual(storage.count(State), 1)
+        self.assertEqual(storage.check_counts(), {})
+
+
+@unittest.skipIf(models.storage_t != 'db', "test for db storage only")
+class TestEagerLoading(unittest.TestCase):
+    """Test that relationships load without one query per object"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Creates 2 states of 3 cities of 2 places with 2 amenities"""
+        storage = models.storage
+        user = User(email="eager@hbnb.io", password="pwd")
+        storage.new(user)
+        amenities = [Amenity(name="Amenity {}".format(i)) for i in range(2)]
+        cls.states = []
+        for i in range(2):
+            state = State(name="State {}".format(i))
+            storage.new(state)
+            cls.states.append(state)
+            for j in range(3):
+                city = City(name="City {}".format(j), state_id=state.id)
+                storage.new(city)
+                for k in range(2):
+                    place = Place(name="Place {}".format(k), city_id=city.id,
+                                  user_id=user.id)
+                    place.amenities.extend(amenities)
+                    storage.new(place)
+                    storage.new(Review(text="Nice", place_id=place.id,
+                                       user_id=user.id))
+        storage.save()
+        cls.ids = [state.id for state in cls.states]
+
+    def setUp(self):
+        """Starts each test with an empty identity map"""
+        models.storage.close()
+
+    @contextlib.contextmanager
+    def assertQueries(self, most):
+        """fails if the block runs more than most SQL statements"""
+        before = models.storage.pool_metrics()["statements"]
+        yield
+        ran = models.storage.pool_metrics()["statements"] - before
+        self.assertLessEqual(ran, most, "{} statements ran, at most {} "
+                             "were expected".format(ran, most))
+
+    def walk(self, states):
+        """reads the amenities of the places of the cities of states"""
+        return [amenity.name for state in states for city in state.cities
+                for place in city.places for amenity in place.amenities]
+
+    def test_lazy_loading_is_detected(self):
+        """Test that the harness catches one query per object"""
+        states = models.storage.get_many(State, self.ids)
+        with self.assertRaises(AssertionError):
+            with self.assertQueries(3):
+                self.walk(states)
+
+    def test_selectin(self):
+        """Test that a nested path loads in one query per relationship"""
+        with self.assertQueries(4):
+            states = models.storage.get_many(
+                State, self.ids, load=("cities.places.amenities",))
+            self.assertEqual(len(self.walk(states)), 24)
+
+    def test_joined(self):
+        """Test that the joined strategy loads a path in one query"""
+        with self.assertQueries(1):
+            state = models.storage.get(State, self.ids[0],
+                                       load=("cities.places",),
+                                       strategy="joined")
+            self.assertEqual(sum(len(city.places)
+                                 for city in state.cities), 6)
+
+    def test_get_loaded(self):
+        """Test that get loads the relationships of an object the session
+        holds already"""
+        state = models.storage.get(State, self.ids[0])
+        with self.assertQueries(3):
+            self.assertIs(models.storage.get(
+                State, self.ids[0], load=("cities.places",)), state)
+            self.assertEqual(sum(len(city.places)
+                                 for city in state.cities), 6)
+
+    def test_all(self):
+        """Test that all loads the relationships of every object"""
+        with self.assertQueries(2):
+            places = models.storage.all(Place, load=("amenities",))
+            amenities = [len(place.amenities) for place in places.values()]
+        self.assertGreaterEqual(amenities.count(2), 12)
+
+    def test_unknown_strategy(self):
+        """Test that an unknown strategy is refused"""
+        with self.assertRaises(ValueError):
+            models.storage.get(State, self.ids[0], load=("cities",),
+                               strategy="lazy")
+
+    def test_places_search(self):
+        """Test that places_search does not query once per object"""
+        from api.v1.app import app
+        amenity = models.storage.all(Amenity, load=()).popitem()[1]
+        models.storage.close()
+        with app.test_client() as client:
+            with self.assertQueries(5):
+                response = client.post("/api/v1/places_search", json={
+                    "states": self.ids, "amenities": [amenity.id]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), 12)
+
+    def test_streamed_lists(self):
+        """Test that lists stream as a JSON array or as NDJSON"""
+        from api.v1.app import app
+        url = "/api/v1/states/{}/cities".format(self.ids[0])
+        with app.test_client() as client:
+            response = client.get(url)
+            self.assertTrue(response.is_streamed)
+            self.assertEqual(response.mimetype, "application/json")
+            self.assertIn("Accept", response.vary)
+            cities = response.get_json()
+            response = client.get(url, headers={
+                "Accept": "application/x-ndjson"})
+            self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = response.get_data().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], cities)
+        self.assertEqual(sorted(city["name"] for city in cities),
+                         ["City 0", "City 1", "City 2"])
+
+    def test_conditional_requests(self):
+        """Test that known ETags and dates get 304 without a query"""
+        from api.v1.app import app
+        state = models.storage.get(State, self.ids[0])
+        with app.test_client() as client:
+            for url in ("/api/v1/states/{}".format(state.id),
+                        "/api/v1/states/{}/cities".format(state.id),
+                        "/api/v1/states?limit=1"):
+                response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.get_json())
+                etag = response.headers["ETag"]
+                response = client.get(url, headers={"If-None-Match": etag})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.get_data(), b"")
+                self.assertEqual(response.headers["ETag"], etag)
+            response = client.get(url, headers={"If-None-Match": etag,
+                                                "Accept":
+                                                "application/x-ndjson"})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.get_data())
+            response = client.get("/api/v1/states/{}".format(state.id))
+            modified = response.headers["Last-Modified"]
+            response = client.get("/api/v1/states/{}".format(state.id),
+                                  headers={"If-Modified-Since": modified})
+            self.assertEqual(response.status_code, 304)
+
+            search = {"states": self.ids}
+            response = client.post("/api/v1/places_search", json=search)
+            self.assertEqual(len(response.get_json()), 12)
+            etag = response.headers["ETag"]
+            with self.assertQueries(4):
+                response = client.post("/api/v1/places_search", json=search,
+                                       headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            response = client.post("/api/v1/places_search", json={},
+                                   headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.get_json())
+            place = models.storage.all(Place).popitem()[1]
+            place.name = "Renamed"
+            place.save()
+            response = client.post("/api/v1/places_search", json=search,
+                                   headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.get_json()), 12)
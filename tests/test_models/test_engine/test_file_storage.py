@@ -4,9 +4,11 @@ Contains the TestFileStorageDocs classes
 """
 
 from datetime import datetime
+import glob
 import inspect
 import models
 from models.engine import file_storage
+from models.engine.snapshot import iso
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -18,6 +20,7 @@ import json
 import os
 import pep8
 import unittest
+from unittest import mock
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -96,7 +99,7 @@ class TestFileStorage(unittest.TestCase):
 
     @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
     def test_save(self):
-        """Test that save properly saves objects to file.json"""
+        """Test that save properly saves objects to the files"""
         storage = FileStorage()
         new_dict = {}
         for key, value in classes.items():
@@ -110,8 +113,9 @@ class TestFileStorage(unittest.TestCase):
         for key, value in new_dict.items():
             new_dict[key] = value.to_dict()
         string = json.dumps(new_dict)
-        with open("file.json", "r") as f:
-            js = f.read()
+        # in the format, layout and journal of the storage
+        js = json.dumps(dict(storage._FileStorage__read(set(classes))),
+                        default=iso)
         self.assertEqual(json.loads(string), json.loads(js))
 
     def test_get(self):
@@ -133,6 +137,181 @@ class TestFileStorage(unittest.TestCase):
         with self.assertRaises(TypeError):
             storage.get()
 
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_places(self):
+        """test that search_places selects and filters through indexes"""
+        storage = models.storage
+        s1, s2 = State(name="S1"), State(name="S2")
+        c1, c2 = City(state_id=s1.id), City(state_id=s1.id)
+        c3 = City(state_id=s2.id)
+        a1, a2 = Amenity(name="A1"), Amenity(name="A2")
+        p1, p2 = Place(city_id=c1.id), Place(city_id=c2.id)
+        p3, p4 = Place(city_id=c3.id), Place(city_id=c3.id)
+        for obj in (s1, s2, c1, c2, c3, a1, a2, p1, p2, p3, p4):
+            storage.new(obj)
+        p1.amenity_ids = [a1.id, a2.id]
+        p2.amenity_ids = [a1.id]
+        p3.amenity_ids = [a2.id]
+
+        def search(**kwargs):
+            """returns the ids of the places found"""
+            return sorted(place.id for place in storage.search_places(
+                **kwargs))
+        self.assertEqual(search(states=[s1.id]), sorted([p1.id, p2.id]))
+        self.assertEqual(search(states=[s1.id], cities=[c1.id, c3.id]),
+                         sorted([p1.id, p2.id, p3.id, p4.id]))
+        self.assertEqual(search(amenities=[a1.id]), sorted([p1.id, p2.id]))
+        self.assertEqual(search(amenities=[a1.id, a2.id]), [p1.id])
+        self.assertEqual(search(states=[s2.id], amenities=[a1.id]), [])
+        self.assertEqual(search(states=["nope"], amenities=[a2.id]),
+                         sorted([p1.id, p3.id]))
+        self.assertEqual(search(amenities=[a1.id, "nope"]), [])
+        self.assertEqual(search(states=["nope"]), [])
+        self.assertEqual(search(states=[s1.id], cities=[c3.id], limit=2),
+                         sorted([p1.id, p2.id]))
+        self.assertLessEqual({p1.id, p2.id, p3.id, p4.id},
+                             set(search(states=[], cities=[])))
+        p1.amenity_ids = [a2.id]
+        self.assertEqual(search(amenities=[a1.id]), [p2.id])
+        p2.delete()
+        self.assertEqual(search(amenities=[a1.id]), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_version(self):
+        """test that version changes with every change to a class"""
+        storage = models.storage
+        state = State(name="Ondo")
+        tags = [storage.version(State)[0]]
+        state.save()
+        tags.append(storage.version(State)[0])
+        state.name = "Osun"
+        tags.append(storage.version(State)[0])
+        storage.save()
+        tags.append(storage.version(State)[0])
+        storage.delete(state)
+        tags.append(storage.version("State")[0])
+        self.assertEqual(len(set(tags)), 4)
+        self.assertEqual(tags[2], tags[3])
+        storage.save()
+        before = storage.version(State)
+        storage.reload()
+        self.assertEqual(storage.version(State), before)
+        before = storage.version(City)
+        Amenity(name="Wifi").save()
+        self.assertEqual(storage.version(City), before)
+        self.assertIsInstance(storage.version(State)[1], datetime)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_bulk_save(self):
+        """test that bulk_save saves objects built from rows at once"""
+        storage = models.storage
+        count = storage.count(State)
+        rows = [{"name": "Bulk {}".format(i)} for i in range(3)]
+        rows[0].update(id="bulk-0", created_at="2017-03-25T02:17:06.000001")
+        with mock.patch.object(storage, "save",
+                               wraps=storage.save) as save:
+            stats = storage.bulk_save(State, iter(rows))
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(stats["rows"], 3)
+        self.assertEqual(storage.count(State), count + 3)
+        self.assertEqual(rows[0]["id"], "bulk-0")
+        self.assertEqual(storage.get(State, rows[2]["id"]).name, "Bulk 2")
+        self.assertEqual(storage.get(State, "bulk-0").created_at,
+                         datetime(2017, 3, 25, 2, 17, 6, 1))
+        storage.bulk_upsert("State", [{"id": "bulk-0", "name": "Renamed"}])
+        self.assertEqual(storage.get(State, "bulk-0").name, "Renamed")
+        self.assertEqual(storage.count(State), count + 3)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_new_many(self):
+        """test that new_many adds every object, saved at once"""
+        storage = models.storage
+        count = storage.count(State)
+        states = [State(name="State {}".format(i)) for i in range(3)]
+        storage.new_many(iter(states))
+        storage.save()
+        self.assertEqual(storage.count(State), count + 3)
+        self.assertEqual(storage.get_many(State, [s.id for s in states]),
+                         states)
+        storage.new_many([])
+        self.assertEqual(storage.count(State), count + 3)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_iter_all(self):
+        """test that iter_all yields the objects all() returns"""
+        storage = models.storage
+        State(name="Kwara").save()
+        for cls in (None, State, "State", City):
+            self.assertEqual(set(storage.iter_all(cls)),
+                             set(storage.all(cls).values()))
+        states = storage.iter_all(State)
+        first = next(states)
+        State(name="Kogi").save()
+        self.assertEqual(len(list(states)) + 1, storage.count(State) - 1)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_iter_filter(self):
+        """test that iter_filter yields the objects with equal attributes"""
+        storage = models.storage
+        state = State(name="Edo")
+        city, other = City(state_id=state.id), City(state_id=state.id)
+        other.name = "Benin"
+        for obj in (state, city, other):
+            storage.new(obj)
+        self.assertEqual(set(storage.iter_filter(City, state_id=state.id)),
+                         {city, other})
+        self.assertEqual(list(storage.iter_filter(City, state_id=state.id,
+                                                  name="Benin")), [other])
+        self.assertEqual(list(storage.iter_filter("State", name="Edo",
+                                                  id=state.id)), [state])
+        self.assertEqual(list(storage.iter_filter(City, state_id="nope")), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_page(self):
+        """test that page returns objects in (created_at, id) order"""
+        storage = models.storage
+        times = ["2001-01-01T00:00:0{}.000000".format(i) for i in range(4)]
+        states = [State(name="S", created_at=times[i % 3]) for i in range(5)]
+        for state in states[::-1]:
+            storage.new(state)
+        order = sorted(states, key=lambda state: (state.created_at,
+                                                  state.id))
+        after = (datetime.fromisoformat(times[0]), "")
+        self.assertEqual(storage.page(State, 5, after)[:5], order)
+        self.assertEqual(storage.page(State, 2, after), order[:2])
+        last = order[1].created_at, order[1].id
+        self.assertEqual(storage.page(State, 2, last), order[2:4])
+        # the order follows new, deleted and changed objects
+        late = State(name="S", created_at=times[3])
+        late.save()
+        states[0].delete()
+        order.remove(states[0])
+        order.append(late)
+        self.assertEqual(storage.page(State, 9, after)[:5], order)
+        order[0].created_at = datetime.fromisoformat(times[3])
+        self.assertEqual(storage.page(State, 9, after)[:5],
+                         sorted(order, key=lambda state: (state.created_at,
+                                                          state.id)))
+        city = City(state_id=order[0].id, created_at=times[1])
+        storage.new(city)
+        self.assertEqual(storage.page(City, 5, state_id=order[0].id), [city])
+        self.assertEqual(storage.page(City, 5, after, name="nope"), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_get_many(self):
+        """test that get_many returns the objects of ids, None if missing"""
+        storage = models.storage
+        first = State(name='Oyo')
+        first.save()
+        second = State(name='Ogun')
+        second.save()
+        self.assertEqual(storage.get_many(State, [second.id, 'nope', first.id,
+                                                  second.id]),
+                         [second, None, first, second])
+        self.assertEqual(storage.get_many(City, [first.id]), [None])
+        self.assertEqual(storage.get_many(None, [first.id]), [None])
+        self.assertEqual(storage.get_many(State, []), [])
+
     def test_count(self):
         """test that count returns the number of objects of a given class."""
         storage = models.storage
@@ -151,3 +330,215 @@ class TestFileStorage(unittest.TestCase):
         self.assertGreater(storage.count(), storage.count(State))
         with self.assertRaises(TypeError):
             storage.count(State, 'op')
+
+    @staticmethod
+    def touch():
+        """changes the stamps of the files, as if another process wrote to
+        them"""
+        for path in glob.glob("file.*"):
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_close_keeps_unchanged(self):
+        """test that close only reads the files again once they changed"""
+        storage = models.storage
+        state = State(name="Imo")
+        state.save()
+        storage.close()
+        self.assertIs(storage.get(State, state.id), state)
+        state.name = "Abia"
+        storage.close()
+        self.assertEqual(storage.get(State, state.id).name, "Imo")
+        state = storage.get(State, state.id)
+        before = storage.version(State)
+        self.touch()
+        storage.close()
+        self.assertIsNot(storage.get(State, state.id), state)
+        self.assertNotEqual(storage.version(State), before)
+
+        city = City(name="Owerri", state_id=state.id)
+        city.save()
+        storage.close()
+        self.assertIs(storage.get(City, city.id), city)
+        self.touch()
+        storage.close()
+        city = storage.get(City, city.id)
+        before = storage.version(City)
+        self.touch()
+        # read after the write, the states leave the cities outdated
+        storage.get(State, state.id)
+        storage.close()
+        self.assertIsNot(storage.get(City, city.id), city)
+        self.assertNotEqual(storage.version(City), before)
+        storage.delete(storage.get(City, city.id))
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_check_counts(self):
+        """test that counts are kept, and recounted when they drift"""
+        storage = models.storage
+        State(name='Borno').save()
+        counts = storage.counts()
+        self.assertEqual(counts, {name: storage.count(name)
+                                  for name in classes})
+        self.assertEqual(storage.check_counts(), {})
+        # written around new(), so not in the class index
+        state = State(name='Yobe')
+        FileStorage._FileStorage__objects["State." + state.id] = state
+        self.assertEqual(storage.counts()["State"], counts["State"])
+        drift = {"State": (counts["State"], counts["State"] + 1)}
+        self.assertEqual(storage.check_counts(repair=False), drift)
+        self.assertEqual(storage.counts()["State"], counts["State"])
+        self.assertEqual(storage.check_counts(), drift)
+        self.assertEqual(storage.counts()["State"], counts["State"] + 1)
+        self.assertIs(storage.get(State, state.id), state)
+        self.assertEqual(storage.check_counts(), {})
+        storage.delete(state)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_cls_matches_scan(self):
+        """test that all(cls) returns exactly the objects of that class"""
+        storage = models.storage
+        State(name='Ogun').save()
+        City(name='Abeokuta').save()
+        scan = {k: v for k, v in storage.all().items()
+                if type(v) is State}
+        self.assertEqual(storage.all(State), scan)
+        self.assertEqual(storage.all("State"), scan)
+        self.assertEqual(storage.count(State), len(scan))
+        self.assertEqual(storage.all(int), {})
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_delete_updates_index(self):
+        """test that delete removes the object from the class index"""
+        storage = models.storage
+        obj = State(name='Kano')
+        obj.save()
+        count = storage.count(State)
+        storage.delete(obj)
+        self.assertIsNone(storage.get(State, obj.id))
+        self.assertNotIn("State." + obj.id, storage.all(State))
+        self.assertEqual(storage.count(State), count - 1)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_related_follows_foreign_keys(self):
+        """test that the reverse indexes track new, updates and delete"""
+        storage = models.storage
+        state = State(name='Oyo')
+        other = State(name='Osun')
+        state.save()
+        other.save()
+        city = City(name='Ibadan', state_id=state.id)
+        city.save()
+        self.assertEqual(state.cities, [city])
+        self.assertEqual(other.cities, [])
+        city.state_id = other.id
+        self.assertEqual(state.cities, [])
+        self.assertEqual(other.cities, [city])
+        storage.delete(city)
+        self.assertEqual(other.cities, [])
+        self.assertEqual(storage.related(City, "name", "Ibadan"), [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_related_after_reload(self):
+        """test that reloaded objects replace the indexed ones"""
+        storage = models.storage
+        place = Place(name='Loft', city_id='c1')
+        place.save()
+        review = Review(text='Great', place_id=place.id)
+        review.save()
+        storage.reload()
+        reviews = storage.get(Place, place.id).reviews
+        self.assertEqual([r.id for r in reviews], [review.id])
+        self.assertIsNot(reviews[0], review)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_lazy_reload(self):
+        """test that lazy reload builds objects only when accessed"""
+        storage = models.storage
+        state = State(name='Benue')
+        state.save()
+        city = City(name='Makurdi', state_id=state.id)
+        city.save()
+        objects = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__lazy = True
+        try:
+            storage.reload()
+            self.assertEqual(storage._FileStorage__objects, {})
+            self.assertEqual(storage.count(), len(objects))
+            self.assertEqual(storage.count(City), len(
+                [v for v in objects.values() if type(v) is City]))
+            got = storage.get(State, state.id)
+            self.assertEqual(got.name, 'Benue')
+            self.assertEqual(list(storage._FileStorage__objects),
+                             ["State." + state.id])
+            self.assertEqual([c.id for c in got.cities], [city.id])
+            storage.save()
+            storage.reload()
+            self.assertEqual(len(storage.all()), len(objects))
+        finally:
+            FileStorage._FileStorage__lazy = False
+            FileStorage._FileStorage__objects = objects
+
+    @unittest.skipIf(models.storage_t == 'db' or
+                     FileStorage._FileStorage__journal is not None,
+                     "journaled saves write no class file")
+    def test_sharded_layout(self):
+        """test that a sharded save only rewrites the dirty class files"""
+        storage = models.storage
+        shard = storage._FileStorage__shard
+        objects = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__sharded = True
+        try:
+            state = State(name='Yobe')
+            state.save()
+            City(name='Damaturu', state_id=state.id).save()
+            storage.compact()
+            inodes = {name: os.stat(shard(name)).st_ino
+                      for name in ("State", "City")}
+            state.name = 'Borno'
+            storage.save()
+            self.assertNotEqual(os.stat(shard("State")).st_ino,
+                                inodes["State"])
+            self.assertEqual(os.stat(shard("City")).st_ino,
+                             inodes["City"])
+            FileStorage._FileStorage__objects = {}
+            storage.reload(State)
+            self.assertEqual(storage.count(City), 0)
+            self.assertEqual(storage.get(State, state.id).name, 'Borno')
+            storage.reload([City, "Amenity"])
+            self.assertEqual(len(state.cities), 1)
+        finally:
+            FileStorage._FileStorage__sharded = False
+            FileStorage._FileStorage__objects = objects
+            for name in classes:
+                if os.path.exists(shard(name)):
+                    os.remove(shard(name))
+
+    @unittest.skipIf(models.storage_t == 'db' or models.compact,
+                     "compact models keep no record")
+    def test_save_serializes_changed_objects_only(self):
+        """test that save only calls to_dict on objects changed since"""
+        storage = models.storage
+        State(name='Jigawa').save()
+        storage.reload()
+        state = State(name='Zamfara')
+        storage.new(state)
+        calls = []
+        to_dict = BaseModel.to_dict
+
+        def counting(obj):
+            """counts the calls to to_dict"""
+            calls.append(obj)
+            return to_dict(obj)
+        with mock.patch.object(BaseModel, "to_dict", counting):
+            storage.save()
+            self.assertEqual(calls, [state])
+            state.name = 'Sokoto'
+            storage.save()
+            self.assertEqual(calls, [state, state])
+        # read back from the snapshot, or from the journal
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).name, 'Sokoto')
@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+"""
+Contains the TestJournalDocs and TestJournal classes
+"""
+
+import inspect
+import models
+from models.engine import journal
+from models.engine.file_storage import FileStorage
+from models.engine.snapshot import formats
+from models.state import State
+import os
+import pep8
+import unittest
+from unittest import mock
+Journal = journal.Journal
+
+
+class TestJournalDocs(unittest.TestCase):
+    """Tests to check the documentation and style of Journal class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.journal_f = inspect.getmembers(Journal, inspect.isfunction)
+
+    def test_pep8_conformance(self):
+        """Test that journal.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/journal.py',
+                                    'tests/test_models/test_engine/\
+test_journal.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_journal_docstrings(self):
+        """Test for the module, class and method docstrings"""
+        self.assertTrue(len(journal.__doc__) >= 1)
+        self.assertTrue(len(Journal.__doc__) >= 1)
+        for func in self.journal_f:
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestJournal(unittest.TestCase):
+    """Test the Journal class"""
+    path = "test_journal.log"
+
+    def tearDown(self):
+        """Remove the log written by a test"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_append_and_replay(self):
+        """Test that replay yields the appended records in order"""
+        log = Journal(self.path)
+        log.append([("State.1", {"id": "1"}), ("State.2", None)])
+        log.append([("State.1", None)])
+        self.assertEqual(log.records, 3)
+        self.assertEqual(list(Journal(self.path).replay()),
+                         [("State.1", {"id": "1"}), ("State.2", None),
+                          ("State.1", None)])
+
+    def test_replay_stops_at_torn_record(self):
+        """Test that a partially written last line is ignored"""
+        log = Journal(self.path)
+        log.append([("State.1", {"id": "1"})])
+        with open(self.path, 'a') as f:
+            f.write('["State.2",{"id"')
+        self.assertEqual(len(list(log.replay())), 1)
+        self.assertEqual(log.records, 1)
+        log.append([("State.3", None)])
+        self.assertEqual([key for key, value in log.replay()],
+                         ["State.1", "State.3"])
+
+    def test_truncate(self):
+        """Test that truncate empties the log"""
+        log = Journal(self.path)
+        log.append([("State.1", None)])
+        log.truncate()
+        self.assertEqual(log.records, 0)
+        self.assertEqual(list(log.replay()), [])
+        self.assertEqual(list(Journal("missing.log").replay()), [])
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageJournal(unittest.TestCase):
+    """Test FileStorage.save and reload with a journal"""
+    path = "test_journal.log"
+
+    def setUp(self):
+        """Enable the journal on FileStorage"""
+        self.objects = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__journal = Journal(self.path)
+        self.storage = FileStorage()
+        self.storage.compact()
+
+    def tearDown(self):
+        """Restore FileStorage without a journal"""
+        FileStorage._FileStorage__journal = None
+        FileStorage._FileStorage__journal_max = 1000
+        FileStorage._FileStorage__objects = self.objects
+        self.storage.compact()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def snapshot(self):
+        """Return the keys of the snapshot of the storage"""
+        fmt = FileStorage._FileStorage__format
+        with open(FileStorage._FileStorage__file_path, 'r' + fmt.mode) as f:
+            return {key for key, value in fmt.load(f)}
+
+    def reloaded(self):
+        """Return the objects of a fresh reload of the storage"""
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        return self.storage.all()
+
+    def test_save_appends_changes_only(self):
+        """Test that save journals changed objects, not the snapshot"""
+        state = State(name="Delta")
+        state.save()
+        self.assertNotIn("State." + state.id, self.snapshot())
+        state.name = "Edo"
+        self.storage.save()
+        self.storage.save()
+        self.assertEqual(self.storage._FileStorage__journal.records, 2)
+        objs = self.reloaded()
+        self.assertEqual(objs["State." + state.id].name, "Edo")
+
+    def test_delete_is_journaled(self):
+        """Test that a journaled delete is replayed by reload"""
+        state = State(name="Imo")
+        state.save()
+        self.storage.delete(state)
+        self.storage.save()
+        self.assertNotIn("State." + state.id, self.reloaded())
+
+    def test_threshold_compacts(self):
+        """Test that reaching __journal_max writes a new snapshot"""
+        FileStorage._FileStorage__journal_max = 2
+        State(name="Kogi").save()
+        state = State(name="Kwara")
+        state.save()
+        self.assertEqual(self.storage._FileStorage__journal.records, 0)
+        self.assertIn("State." + state.id, self.snapshot())
+        self.assertIn("State." + state.id, self.reloaded())
+
+    def test_binary_snapshot(self):
+        """Test that the objects read from a binary snapshot, whose
+        records hold datetimes, are journaled"""
+        path = "test_journal.bin"
+        self.addCleanup(lambda: [os.remove(name) for name in os.listdir()
+                                 if name.startswith("test_journal.") and
+                                 name.endswith(".bin")])
+        with mock.patch.object(FileStorage, "_FileStorage__format",
+                               formats["binary"]), \
+                mock.patch.object(FileStorage, "_FileStorage__file_path",
+                                  path):
+            state = State(name="Osun")
+            state.save()
+            self.storage.compact()
+            obj = self.reloaded()["State." + state.id]
+            self.storage.new(obj)
+            self.storage.save()
+            self.assertEqual(self.storage._FileStorage__journal.records, 1)
+            obj = self.reloaded()["State." + state.id]
+            self.assertEqual((obj.name, obj.created_at),
+                             (state.name, state.created_at))
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""
+Contains the tests for the snapshot readers
+"""
+
+from datetime import datetime
+import io
+import json
+from models.engine import snapshot
+import os
+import pep8
+import pickle
+import unittest
+from unittest import mock
+iter_json = snapshot.iter_json
+formats = snapshot.formats
+
+
+class TestSnapshotDocs(unittest.TestCase):
+    """Tests to check the documentation and style of snapshot.py"""
+    def test_pep8_conformance(self):
+        """Test that snapshot.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/snapshot.py',
+                                    'tests/test_models/test_engine/\
+test_snapshot.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_docstrings(self):
+        """Test for the module, function and class docstrings"""
+        self.assertTrue(len(snapshot.__doc__) >= 1)
+        for obj in (iter_json, snapshot.convert, snapshot.format_of,
+                    snapshot.JSONFormat, snapshot.JSONFormat.dump,
+                    snapshot.JSONFormat.load, snapshot.BinaryFormat,
+                    snapshot.BinaryFormat.dump, snapshot.BinaryFormat.load):
+            self.assertTrue(len(obj.__doc__) >= 1)
+
+
+class TestIterJson(unittest.TestCase):
+    """Test the iter_json function"""
+    doc = {"State.1": {"id": "1", "name": 'A "quoted", {name}'},
+           "Place.2": {"id": "2", "latitude": 12.5, "number_rooms": 10,
+                       "amenity_ids": ["a", "b"], "description": None},
+           "Review.3": {"id": "3", "text": "café : ,}"}}
+
+    def test_matches_json_load(self):
+        """Test that every chunk size yields the same pairs as json.load"""
+        for text in (json.dumps(self.doc), json.dumps(self.doc, indent=4)):
+            for size in (1, 2, 7, 64, 1 << 16):
+                with self.subTest(size=size):
+                    pairs = list(iter_json(io.StringIO(text), size))
+                    self.assertEqual(dict(pairs), self.doc)
+                    self.assertEqual([key for key, value in pairs],
+                                     list(self.doc))
+
+    def test_empty_object(self):
+        """Test that an empty object yields nothing"""
+        self.assertEqual(list(iter_json(io.StringIO(" { } "), 1)), [])
+
+    def test_malformed(self):
+        """Test that truncated or invalid documents raise ValueError"""
+        text = json.dumps(self.doc)
+        for bad in ("", text[:-1], text[:40], "[1, 2]", '{1: 2}',
+                    '{"a": 1 "b": 2}'):
+            with self.subTest(bad=bad):
+                with self.assertRaises(ValueError):
+                    list(iter_json(io.StringIO(bad), 4))
+
+
+class TestFormats(unittest.TestCase):
+    """Test the JSON and binary snapshot formats"""
+    records = [
+        ("State.1", {"id": "1", "name": "Lagos", "__class__": "State",
+                     "created_at": "2017-09-28T21:03:54.052298",
+                     "updated_at": datetime(2017, 9, 28, 21, 3, 54)}),
+        ("State.2", {"id": "2", "name": "Abia", "__class__": "State",
+                     "created_at": "2017-09-28T21:03:54.000000"}),
+        ("Place.3", {"id": "3", "amenity_ids": ["a"], "__class__": "Place",
+                     "latitude": None})]
+
+    def tearDown(self):
+        """Remove the files written by a test"""
+        for path in ("test_snapshot.json", "test_snapshot.bin"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def round_trip(self, fmt):
+        """Return the records dumped then loaded with fmt"""
+        f = io.BytesIO() if fmt.mode == "b" else io.StringIO()
+        fmt.dump(iter(self.records), f)
+        f.seek(0)
+        return list(fmt.load(f))
+
+    def test_json(self):
+        """Test that JSON records keep their keys and datetime strings"""
+        loaded = self.round_trip(formats["json"])
+        self.assertEqual([key for key, value in loaded],
+                         ["State.1", "State.2", "Place.3"])
+        self.assertEqual(loaded[0][1]["updated_at"],
+                         "2017-09-28T21:03:54.000000")
+        self.assertEqual(loaded[2][1], self.records[2][1])
+
+    def test_binary(self):
+        """Test that binary records come back with native datetimes"""
+        loaded = self.round_trip(formats["binary"])
+        self.assertEqual([key for key, value in loaded],
+                         ["State.1", "State.2", "Place.3"])
+        self.assertEqual(loaded[0][1]["created_at"],
+                         datetime(2017, 9, 28, 21, 3, 54, 52298))
+        self.assertEqual(loaded[1][1], {"id": "2", "name": "Abia",
+                                        "__class__": "State",
+                                        "created_at": datetime(
+                                            2017, 9, 28, 21, 3, 54)})
+        self.assertEqual(loaded[2][1], self.records[2][1])
+
+    def test_binary_rejects_other_files(self):
+        """Test that loading a non binary snapshot raises ValueError"""
+        with self.assertRaises(ValueError):
+            list(formats["binary"].load(io.BytesIO(b'{"a": 1}')))
+
+    def test_binary_runs_no_code(self):
+        """Test that a binary snapshot whose pickles call other globals
+        than datetime, or are not blocks, raises ValueError unrun"""
+        run = mock.Mock(return_value=("State", (), []))
+
+        class Block:
+            """pickled as a call of iso, run in its place"""
+            def __reduce__(self):
+                return (snapshot.iso, (None,))
+
+        magic = formats["binary"].magic
+        for block in (Block(), ("State", ["id"], [])):
+            with self.subTest(block=block):
+                f = io.BytesIO(magic + pickle.dumps(block))
+                with mock.patch.object(snapshot, "iso", run), \
+                        self.assertRaises(ValueError):
+                    list(formats["binary"].load(f))
+        run.assert_not_called()
+
+    def test_convert(self):
+        """Test that convert round trips between the formats"""
+        with open("test_snapshot.json", "w") as f:
+            formats["json"].dump(iter(self.records), f)
+        snapshot.convert("test_snapshot.json", "test_snapshot.bin")
+        os.remove("test_snapshot.json")
+        snapshot.convert("test_snapshot.bin", "test_snapshot.json")
+        with open("test_snapshot.json") as f:
+            self.assertEqual(json.load(f)["State.1"]["updated_at"],
+                             "2017-09-28T21:03:54.000000")
+        with self.assertRaises(ValueError):
+            snapshot.convert("test_snapshot.json", "test_snapshot.txt")
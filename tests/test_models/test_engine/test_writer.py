@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+"""
+Contains the tests for atomic_write and GroupCommit
+"""
+
+import inspect
+from models.engine import writer
+import os
+import pep8
+import threading
+import unittest
+GroupCommit = writer.GroupCommit
+atomic_write = writer.atomic_write
+
+
+class TestWriterDocs(unittest.TestCase):
+    """Tests to check the documentation and style of writer.py"""
+    def test_pep8_conformance(self):
+        """Test that writer.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/writer.py',
+                                    'tests/test_models/test_engine/\
+test_writer.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_docstrings(self):
+        """Test for the module, function, class and method docstrings"""
+        self.assertTrue(len(writer.__doc__) >= 1)
+        self.assertTrue(len(atomic_write.__doc__) >= 1)
+        self.assertTrue(len(GroupCommit.__doc__) >= 1)
+        for func in inspect.getmembers(GroupCommit, inspect.isfunction):
+            self.assertTrue(len(func[1].__doc__) >= 1,
+                            "{:s} method needs a docstring".format(func[0]))
+
+
+class TestAtomicWrite(unittest.TestCase):
+    """Test the atomic_write function"""
+    path = "test_writer.json"
+
+    def tearDown(self):
+        """Remove the file written by a test"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def leftovers(self):
+        """Return the temporary files left next to path"""
+        return [name for name in os.listdir(".")
+                if name.startswith(self.path + ".")]
+
+    def test_replaces_file(self):
+        """Test that the file holds exactly the new content"""
+        atomic_write(self.path, lambda f: f.write("old content"))
+        atomic_write(self.path, lambda f: f.write("new"))
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertEqual(self.leftovers(), [])
+
+    def test_failed_write_keeps_old_file(self):
+        """Test that an error while writing leaves the old file intact"""
+        atomic_write(self.path, lambda f: f.write("old"))
+
+        def broken(f):
+            """writes half of the data, then fails"""
+            f.write("ne")
+            raise OSError("disk full")
+        with self.assertRaises(OSError):
+            atomic_write(self.path, broken)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(self.leftovers(), [])
+
+
+class TestGroupCommit(unittest.TestCase):
+    """Test the GroupCommit class"""
+    def test_commit_flushes(self):
+        """Test that a lone commit flushes once"""
+        calls = []
+        group = GroupCommit()
+        group.commit(lambda: calls.append(1))
+        group.commit(lambda: calls.append(2))
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(group.flushes, 2)
+
+    def test_burst_is_grouped(self):
+        """Test that concurrent commits share flushes"""
+        group = GroupCommit(0.05)
+        threads = [threading.Thread(target=group.commit,
+                                    args=(lambda: None,))
+                   for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLess(group.flushes, 20)
+        self.assertGreaterEqual(group.flushes, 1)
+
+    def test_failed_flush_is_retried(self):
+        """Test that an error in flush reaches the caller"""
+        group = GroupCommit()
+
+        def broken():
+            """fails to flush"""
+            raise OSError("disk full")
+        with self.assertRaises(OSError):
+            group.commit(broken)
+        calls = []
+        group.commit(lambda: calls.append(1))
+        self.assertEqual(calls, [1])
@@ -0,0 +1,303 @@
+#!/usr/bin/python3
+"""
+Contains the tests for the migration between storages
+"""
+
+from datetime import datetime
+import json
+import models
+from models.engine.journal import Journal
+from models.engine.snapshot import formats
+from models.tools import migrate
+import os
+import pep8
+import subprocess
+import sys
+import tempfile
+import unittest
+Snapshot = migrate.Snapshot
+
+
+def record(cls, id, **attributes):
+    """returns the key and record of the object of class name cls"""
+    attributes.update(id=id, __class__=cls,
+                      created_at="2017-03-25T02:17:06.000001",
+                      updated_at="2017-03-25T02:17:06.000002")
+    return cls + "." + id, attributes
+
+
+records = [record("State", "s1", name="Lagos"),
+           record("City", "c1", name="Ikeja", state_id="s1"),
+           record("City", "c2", name="Epe", state_id="s1"),
+           record("User", "u1", email="a@hbnb.io"),
+           record("Amenity", "a1", name="Wifi"),
+           record("Amenity", "a2", name="Pool"),
+           record("Place", "p1", name="Flat", city_id="c1", user_id="u1",
+                  number_rooms=2, amenity_ids=["a1", "a2"]),
+           record("Place", "p2", name="Hut", city_id="c2", user_id="u1",
+                  amenity_ids=["a2"]),
+           record("Review", "r1", text="Nice", place_id="p1", user_id="u1")]
+# references to objects the snapshot does not hold, that file storage
+# keeps and a database refuses
+dangling = [record("Place", "p3", name="Orphan", city_id="c1",
+                   user_id="gone", amenity_ids=["a1"]),
+            record("Place", "p4", name="Shed", city_id="c2", user_id="u1",
+                   amenity_ids=["a1", "gone"]),
+            record("Review", "r2", text="Lost", place_id="p3",
+                   user_id="u1")]
+
+
+class TestMigrateDocs(unittest.TestCase):
+    """Tests to check the documentation and style of migrate.py"""
+    def test_pep8_conformance(self):
+        """Test that migrate.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/tools/migrate.py',
+                                    'tools/migrate.py',
+                                    'tests/test_models/test_tools/\
+test_migrate.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_docstrings(self):
+        """Test for the module, function and class docstrings"""
+        self.assertTrue(len(migrate.__doc__) >= 1)
+        for obj in (Snapshot, Snapshot.rows, Snapshot.write, Snapshot.finish,
+                    migrate.Database, migrate.Database.rows,
+                    migrate.Database.write, migrate.Checkpoint,
+                    migrate.endpoint, migrate.report, migrate.migrate):
+            self.assertTrue(len(obj.__doc__) >= 1)
+
+
+class TestSnapshots(unittest.TestCase):
+    """Test the migrations between snapshots"""
+    def setUp(self):
+        """Writes the snapshot records to a temporary directory"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.source = self.path("file.json")
+        with open(self.source, "w") as f:
+            formats["json"].dump(records, f)
+
+    def path(self, name):
+        """returns the path of name in the temporary directory"""
+        return os.path.join(self.directory.name, name)
+
+    def test_rows(self):
+        """Test that the records are read a class at a time, with the
+        changes of the journal"""
+        Journal(self.source + ".log").append([
+            record("City", "c1", name="Renamed", state_id="s1"),
+            ("City.c2", None),
+            record("City", "c3", name="Badagry", state_id="s1")])
+        source = Snapshot(self.source)
+        self.assertEqual([(row["id"], row["name"])
+                          for row in source.rows("City")],
+                         [("c1", "Renamed"), ("c3", "Badagry")])
+        self.assertEqual([row["id"] for row in source.rows("City", 1)],
+                         ["c3"])
+        self.assertEqual(list(source.rows("place_amenity", 1)),
+                         [{"place_id": "p1", "amenity_id": "a2"},
+                          {"place_id": "p2", "amenity_id": "a2"}])
+
+    def test_migrate(self):
+        """Test that every record is copied, in the order of the foreign
+        keys, with the amenity_ids of the places rebuilt"""
+        target = self.path("file.bin")
+        Journal(target + ".log").append([record("State", "old")])
+        reported = []
+        copied, dropped = migrate.migrate(
+            Snapshot(self.source), Snapshot(target), 2,
+            self.path("checkpoint"), lambda *args: reported.append(args))
+        self.assertEqual(set(dropped.values()), {0})
+        self.assertEqual(copied, {"State": 1, "City": 2, "User": 1,
+                                  "Amenity": 2, "Place": 2, "Review": 1,
+                                  "place_amenity": 3})
+        self.assertEqual([(name, rows) for name, rows, seconds, dropped
+                          in reported
+                          if name in ("City", "place_amenity")],
+                         [("City", 2), ("place_amenity", 2),
+                          ("place_amenity", 3)])
+        with open(target, "rb") as f:
+            copy = list(formats["binary"].load(f))
+        self.assertEqual([key.partition(".")[0] for key, value in copy],
+                         ["State", "City", "City", "User", "Amenity",
+                          "Amenity", "Place", "Place", "Review"])
+        # the binary format keeps the datetimes parsed
+        self.assertEqual({key: {attribute: value.isoformat(
+            timespec="microseconds") if isinstance(value, datetime) else
+            value for attribute, value in record.items()}
+            for key, record in copy}, dict(records))
+        self.assertEqual(list(Journal(target + ".log").replay()), [])
+        for name in ("checkpoint", "file.bin.migrate"):
+            self.assertFalse(os.path.exists(self.path(name)))
+
+    def test_resume(self):
+        """Test that an interrupted migration resumes where it stopped"""
+        target = self.path("copy.json")
+        checkpoint = self.path("checkpoint")
+
+        def interrupt(name, rows, seconds, dropped):
+            """stops the migration after the first batch of places"""
+            if name == "Place":
+                raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            migrate.migrate(Snapshot(self.source), Snapshot(target), 1,
+                            checkpoint, interrupt)
+        with open(checkpoint) as f:
+            state = json.load(f)
+        self.assertEqual(state["done"],
+                         ["State", "City", "User", "Amenity"])
+        self.assertEqual(state["rows"]["Place"], 1)
+        # a batch staged but not checkpointed is dropped on resume
+        Snapshot(target).write("Place", [dict(records[7][1])])
+        with self.assertRaises(ValueError):
+            migrate.migrate(Snapshot(self.source),
+                            Snapshot(self.path("other.json")), 1,
+                            checkpoint, None)
+        copied, dropped = migrate.migrate(Snapshot(self.source),
+                                          Snapshot(target), 1, checkpoint,
+                                          None)
+        self.assertEqual(copied, {"Place": 1, "Review": 1,
+                                  "place_amenity": 3})
+        with open(target) as f:
+            self.assertEqual(json.load(f), dict(records))
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_same_endpoints(self):
+        """Test that a storage is not migrated into itself"""
+        with self.assertRaises(ValueError):
+            migrate.migrate(Snapshot(self.source), Snapshot(self.source))
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestDatabase(unittest.TestCase):
+    """Test the migrations from and to a database"""
+    def test_round_trip(self):
+        """Test that a snapshot copied to the database and back keeps its
+        objects and links"""
+        from models.place import Place
+        from models.state import State
+        from models.user import User
+        storage = models.storage
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "file.json")
+            target = os.path.join(directory, "copy.json")
+            with open(source, "w") as f:
+                formats["json"].dump(records, f)
+            database = migrate.Database(storage)
+            migrate.migrate(Snapshot(source), database, 2, None, None)
+            self.addCleanup(self.delete)
+            storage.close()
+            self.assertEqual(storage.get(User, "u1").password, "")
+            self.assertEqual(sorted(amenity.id for amenity in
+                                    storage.get(Place, "p1").amenities),
+                             ["a1", "a2"])
+            # written again, the rows are updated
+            migrate.migrate(Snapshot(source), database, 2, None, None)
+            self.assertEqual(storage.get(State, "s1").name, "Lagos")
+
+            migrate.migrate(database, Snapshot(target), 2, None, None)
+            with open(target) as f:
+                copy = json.load(f)
+        for key, value in records:
+            self.assertEqual({k: v for k, v in copy[key].items()
+                              if k in value}, value)
+
+    def test_dangling(self):
+        """Test that the rows whose references the database lacks are
+        dropped and counted"""
+        from models.place import Place
+        storage = models.storage
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "file.json")
+            with open(source, "w") as f:
+                formats["json"].dump(records + dangling, f)
+            reported = []
+            copied, dropped = migrate.migrate(
+                Snapshot(source), migrate.Database(storage), 2, None,
+                lambda *args: reported.append(args))
+            self.addCleanup(self.delete)
+        self.assertEqual((copied["Place"], dropped["Place"]), (3, 1))
+        self.assertEqual((copied["Review"], dropped["Review"]), (1, 1))
+        self.assertEqual((copied["place_amenity"],
+                          dropped["place_amenity"]), (4, 2))
+        self.assertEqual(reported[-1][0], "place_amenity")
+        self.assertEqual(reported[-1][3], 2)
+        storage.close()
+        self.assertIsNone(storage.get(Place, "p3"))
+        self.assertEqual([amenity.id for amenity in
+                          storage.get(Place, "p4").amenities], ["a1"])
+
+    def delete(self):
+        """deletes the objects of the records, their links first"""
+        storage = models.storage
+        storage.close()
+        for key, value in reversed(records + dangling):
+            obj = storage.get(models.engine.db_storage.classes[
+                value["__class__"]], value["id"])
+            if obj is not None:
+                storage.delete(obj)
+                storage.save()
+        storage.close()
+
+
+class TestCommand(unittest.TestCase):
+    """Test python3 -m tools.migrate"""
+    def test_command(self):
+        """Test that a snapshot is copied to a SQLite database and back"""
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "file.json")
+            target = os.path.join(directory, "copy.json")
+            with open(source, "w") as f:
+                formats["json"].dump(records + dangling, f)
+            env = dict(os.environ, HBNB_TYPE_STORAGE="db",
+                       HBNB_DB_URL="sqlite:///" + os.path.join(
+                           directory, "hbnb.db"),
+                       PYTHONPATH=os.getcwd())
+            env.pop("HBNB_ENV", None)
+            outputs = []
+            for args in ([source, "db", "--batch-size", "2"],
+                         ["db", target, "--quiet"]):
+                result = subprocess.run(
+                    [sys.executable, "-m", "tools.migrate",
+                     "--checkpoint", os.path.join(directory, "checkpoint")] +
+                    args, env=env, cwd=directory, capture_output=True,
+                    text=True)
+                self.assertEqual(result.returncode, 0, result.stderr)
+                outputs.append(result.stderr.splitlines())
+            self.assertIn("Place: 3 rows", outputs[0][5])
+            self.assertTrue(outputs[0][5].endswith(", 1 dropped"))
+            self.assertEqual(len(outputs[0]), 11)
+            self.assertTrue(outputs[0][-1].endswith(", 4 dropped"))
+            self.assertEqual([line.partition(" in ")[0]
+                              for line in outputs[1]], ["total: 14 rows"])
+            with open(target) as f:
+                self.assertEqual(set(json.load(f)),
+                                 set(dict(records)) | {"Place.p4"})
+            # the storage is chosen from the arguments, and the snapshot
+            # of the directory is not read
+            with open(os.path.join(directory, "file.json"), "w") as f:
+                f.write("not a snapshot")
+            result = subprocess.run(
+                [sys.executable, "-m", "tools.migrate", "--quiet", target,
+                 os.path.join(directory, "copy.bin")], env=env,
+                cwd=directory, capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertTrue(result.stderr.startswith("total: 14 rows"))
+
+            # a row the database refuses ends the command cleanly
+            with open(source, "w") as f:
+                formats["json"].dump([record("State", "s9", name=None)], f)
+            result = subprocess.run(
+                [sys.executable, "-m", "tools.migrate", "--restart",
+                 source, "db"], env=env, cwd=directory, capture_output=True,
+                text=True)
+            self.assertEqual(result.returncode, 1)
+            self.assertIn("IntegrityError", result.stderr)
+            self.assertNotIn("Traceback", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
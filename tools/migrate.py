@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+"""
+Copies the objects of a storage into another, with models.tools.migrate
+
+usage: python3 -m tools.migrate [options] <source> <target>
+
+source and target are each the path of a FileStorage snapshot, such as
+file.json or file.bin, or db for the database of DBStorage, set by
+HBNB_DB_URL or the HBNB_MYSQL_* variables. The models package is only
+imported once the arguments are read, for DBStorage if one of them is
+db, else for a lazy FileStorage that reads no file in the directory.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="copies the objects of a storage into another")
+    parser.add_argument("source", help="snapshot path, or db")
+    parser.add_argument("target", help="snapshot path, or db")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="rows read and written at a time")
+    parser.add_argument("--checkpoint", default="migrate.checkpoint",
+                        help="file of the progress to resume from")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore the checkpoint and start over")
+    parser.add_argument("--quiet", action="store_true",
+                        help="report the total only")
+    args = parser.parse_args()
+    # the models are defined for the storage chosen when first imported
+    if "db" in (args.source, args.target):
+        os.environ["HBNB_TYPE_STORAGE"] = "db"
+    else:
+        os.environ.pop("HBNB_TYPE_STORAGE", None)
+        os.environ["HBNB_FILE_LAZY"] = "1"
+    from models.tools.migrate import endpoint, migrate, report
+    from sqlalchemy.exc import SQLAlchemyError
+    try:
+        source, target = endpoint(args.source), endpoint(args.target)
+        if args.restart and os.path.exists(args.checkpoint):
+            os.remove(args.checkpoint)
+        start = time.perf_counter()
+        copied, dropped = migrate(source, target, args.batch_size,
+                                  args.checkpoint,
+                                  None if args.quiet else report)
+    except (ValueError, OSError, SQLAlchemyError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    report("total", sum(copied.values()), time.perf_counter() - start,
+           sum(dropped.values()))
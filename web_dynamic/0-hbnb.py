@@ -22,17 +22,17 @@ def close_db(error):
 @app.route('/0-hbnb', strict_slashes=False)
 def hbnb():
     """ HBNB is alive! """
-    states = storage.all(State).values()
+    states = storage.iter_all(State)
     states = sorted(states, key=lambda k: k.name)
     st_ct = []
 
     for state in states:
         st_ct.append([state, sorted(state.cities, key=lambda k: k.name)])
 
-    amenities = storage.all(Amenity).values()
+    amenities = storage.iter_all(Amenity)
     amenities = sorted(amenities, key=lambda k: k.name)
 
-    places = storage.all(Place).values()
+    places = storage.iter_all(Place)
     places = sorted(places, key=lambda k: k.name)
 
     cache_id = uuid.uuid4()
@@ -34,6 +34,9 @@ function checkAPIStatus() {
 }
 
 
+// ETag of the places shown, sent back so unchanged results are not resent
+let placesETag = null;
+
 function searchPlaces() {
     $.ajax({
     type: 'POST',
@@ -41,8 +44,13 @@ function searchPlaces() {
     data: '{}',
     dataType: 'json',
     contentType: 'application/json',
-    success: function (data) {
-      $('SECTION.places').append(data.map(place => {
+    headers: placesETag ? { 'If-None-Match': placesETag } : {},
+    success: function (data, status, xhr) {
+      if (status === 'notmodified') {
+        return;
+      }
+      placesETag = xhr.getResponseHeader('ETag');
+      $('SECTION.places').empty().append(data.map(place => {
         return `<article>
                   <div class="title_box">
                     <h2>${place.name}</h2>